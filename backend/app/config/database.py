@@ -1,7 +1,130 @@
-from supabase import create_client, Client
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+import httpx
+from fastapi import HTTPException
 from app.config.settings import settings
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.utils.singleflight import SingleFlight
 
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+if TYPE_CHECKING:
+    from supabase import Client
+
+# Responses that mean Supabase (or its gateway) is struggling rather than
+# that the request was wrong
+RETRYABLE_STATUS = {500, 502, 503, 504}
+
+class UpstreamUnavailable(HTTPException):
+    """Supabase is unreachable or the circuit breaker is open (served as 503)"""
+
+    def __init__(self, detail: str, retry_after: float = 1.0):
+        super().__init__(
+            status_code=503,
+            detail=detail,
+            headers={"Retry-After": str(max(1, round(retry_after)))}
+        )
+
+upstream_breaker = CircuitBreaker(
+    failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.BREAKER_RESET_TIMEOUT
+)
+
+class ResilientTransport(httpx.BaseTransport):
+    """Per-call timeouts, jittered retries for reads and the circuit breaker.
+
+    Wraps the PostgREST session's transport, so every ``.execute()`` goes
+    through it. Only GET/HEAD are retried; writes fail after one attempt.
+    Backoff sleeps block the calling thread, so run queries through
+    ``fetch`` or ``asyncio.to_thread``, never directly on the event loop.
+    """
+
+    def __init__(self, inner: httpx.BaseTransport, breaker: CircuitBreaker):
+        self.inner = inner
+        self.breaker = breaker
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        idempotent = request.method in ('GET', 'HEAD')
+        timeout = settings.SUPABASE_TIMEOUT if idempotent else settings.SUPABASE_WRITE_TIMEOUT
+        request.extensions['timeout'] = {'connect': timeout, 'read': timeout, 'write': timeout, 'pool': timeout}
+        attempts = settings.SUPABASE_READ_RETRIES + 1 if idempotent else 1
+
+        for attempt in range(attempts):
+            try:
+                probe = self.breaker.before_call()
+            except CircuitOpenError as e:
+                raise UpstreamUnavailable("Database temporarily unavailable", e.retry_after)
+
+            started = time.monotonic()
+            last_attempt = attempt + 1 >= attempts
+            try:
+                response = self.inner.handle_request(request)
+            except httpx.TransportError as e:
+                self.breaker.record_failure(f"{type(e).__name__}: {e}", time.monotonic() - started)
+                if last_attempt:
+                    raise UpstreamUnavailable(f"Database request failed: {type(e).__name__}")
+            else:
+                latency = time.monotonic() - started
+                if response.status_code not in RETRYABLE_STATUS:
+                    self.breaker.record_success(latency)
+                    return response
+                self.breaker.record_failure(f"HTTP {response.status_code}", latency)
+                if last_attempt:
+                    return response
+                response.close()
+            finally:
+                # An unexpected error must not leave the breaker waiting on this probe forever
+                if probe:
+                    self.breaker.end_probe()
+
+            # Full jitter so retrying workers do not hit Supabase in lockstep
+            backoff = min(settings.SUPABASE_RETRY_MAX_BACKOFF, settings.SUPABASE_RETRY_BACKOFF * 2 ** attempt)
+            time.sleep(random.uniform(0, backoff))
+
+    def close(self):
+        self.inner.close()
+
+class LazySupabaseClient:
+    """Stands in for the Supabase client until it is first used.
+
+    Importing ``supabase`` (httpx, gotrue, realtime, storage) and building the
+    client is deferred to the app lifespan (``init_supabase``) or the first
+    attribute access, so importing route modules stays cheap.
+    """
+
+    def __init__(self, url: str, key: str):
+        self._url = url
+        self._key = key
+        self._client: Optional["Client"] = None
+        self._lock = Lock()
+
+    @property
+    def initialized(self) -> bool:
+        return self._client is not None
+
+    def get(self) -> "Client":
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from supabase import create_client
+                    self._client = create_client(self._url, self._key)
+        # supabase-py rebuilds its PostgREST client on auth events, so check
+        # the session is still wrapped on every use (a couple of attribute reads)
+        session = self._client.postgrest.session
+        if not isinstance(session._transport, ResilientTransport):
+            session._transport = ResilientTransport(session._transport, upstream_breaker)
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+supabase = LazySupabaseClient(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+
+def init_supabase():
+    """Create the Supabase client now (called from the app lifespan)"""
+    supabase.get()
 
 def get_supabase_client():
     return supabase
@@ -9,3 +132,114 @@ def get_supabase_client():
 # For FastAPI dependency injection compatibility
 def get_db():
     return supabase
+
+# Identical concurrent reads share one upstream call
+read_coalescer = SingleFlight()
+
+def query_key(query) -> tuple:
+    """Identity of a PostgREST read: table, filters, ordering and projection"""
+    return (
+        query.http_method,
+        query.path,
+        str(query.params),
+        query.headers.get('range'),
+        query.headers.get('prefer'),
+    )
+
+# Last good response per jobs/profiles read, served while Supabase is down
+STALE_TABLES = ('jobs', 'profiles')
+_stale_responses: "OrderedDict[tuple, object]" = OrderedDict()
+_stale_lock = Lock()
+
+async def _read_with_fallback(key: tuple, path: str, call: Callable):
+    if not path.endswith(STALE_TABLES):
+        return await read_coalescer.do(key, call)
+
+    try:
+        result = await read_coalescer.do(key, call)
+    except UpstreamUnavailable:
+        with _stale_lock:
+            stale = _stale_responses.get(key)
+        if stale is None:
+            raise
+        print(f"⚠️ Serving stale {path} data while the database is unavailable")
+        return stale
+
+    with _stale_lock:
+        _stale_responses[key] = result
+        _stale_responses.move_to_end(key)
+        while len(_stale_responses) > settings.STALE_CACHE_SIZE:
+            _stale_responses.popitem(last=False)
+    return result
+
+async def fetch(query):
+    """Execute a read off the event loop, coalescing identical concurrent reads.
+
+    Reads of jobs and profiles fall back to the last good response for the
+    same query when the database is unavailable. The returned response may be
+    shared with other callers; do not mutate it.
+    """
+    return await _read_with_fallback(
+        ('json',) + query_key(query),
+        query.path,
+        lambda: asyncio.to_thread(query.execute)
+    )
+
+async def fetch_raw(query) -> Tuple[bytes, Optional[int]]:
+    """``execute_raw`` counterpart of ``fetch``"""
+    return await _read_with_fallback(
+        ('raw',) + query_key(query),
+        query.path,
+        lambda: asyncio.to_thread(execute_raw, query)
+    )
+
+def upstream_health() -> dict:
+    """Breaker state and recent Supabase latency for /health"""
+    return {
+        "breaker": upstream_breaker.metrics(),
+        "stale_entries": len(_stale_responses)
+    }
+
+def fetch_all_rows(build_query: Callable, page_size: int = 1000) -> List[dict]:
+    """Page through a select that may exceed PostgREST's max-rows limit.
+
+    ``build_query`` returns a fresh filtered query each time; it should have a
+    stable ordering so pages do not overlap.
+    """
+    rows = []
+    start = 0
+    while True:
+        page = build_query().limit(page_size).offset(start).execute().data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        start += page_size
+
+def execute_raw(query) -> Tuple[bytes, Optional[int]]:
+    """Run a PostgREST query and return its undecoded JSON body and row count.
+
+    Skips the JSON decode and pydantic validation done by ``execute()`` for
+    endpoints that pass the rows through to the client unchanged.
+    """
+    response = query.session.request(
+        query.http_method,
+        query.path,
+        json=query.json,
+        params=query.params,
+        headers=query.headers,
+    )
+    if not 200 <= response.status_code <= 299:
+        from postgrest.exceptions import APIError
+        raise APIError(response.json())
+
+    # Content-Range looks like "0-24/*" (or "*/*" when empty)
+    count = None
+    content_range = response.headers.get('content-range', '')
+    rows = content_range.split('/')[0]
+    if rows == '*':
+        count = 0
+    elif '-' in rows:
+        first, last = rows.split('-', 1)
+        count = int(last) - int(first) + 1
+
+    return response.content, count
@@ -0,0 +1,91 @@
+"""
+Server launchers for development and production.
+
+Development keeps the single auto-reloading uvicorn process. Production
+starts several worker processes: under gunicorn (Linux/macOS) the app is
+preloaded in the master so workers share its memory copy-on-write, and on
+platforms without gunicorn (Windows) it falls back to uvicorn's own
+multi-process supervisor.
+"""
+import multiprocessing
+
+from app.config.settings import settings
+
+APP_PATH = "app.main:app"
+
+
+def default_workers() -> int:
+    """One worker per CPU core unless WEB_CONCURRENCY says otherwise"""
+    return settings.WEB_CONCURRENCY or multiprocessing.cpu_count()
+
+
+def run_development(host: str, port: int):
+    import uvicorn
+
+    uvicorn.run(
+        APP_PATH,
+        host=host,
+        port=port,
+        reload=settings.DEBUG
+    )
+
+
+def run_production(host: str, port: int, workers: int):
+    try:
+        from gunicorn.app.base import BaseApplication
+        from uvicorn.workers import UvicornWorker
+    except ImportError:
+        # gunicorn is not available on Windows
+        print("⚠️ gunicorn not available, using uvicorn workers (no preload)")
+        _run_uvicorn_workers(host, port, workers)
+        return
+
+    class TunedUvicornWorker(UvicornWorker):
+        CONFIG_KWARGS = {"loop": settings.UVICORN_LOOP, "http": settings.UVICORN_HTTP}
+
+    class ProductionApplication(BaseApplication):
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+            return app
+
+    options = {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "worker_class": TunedUvicornWorker,
+        "preload_app": settings.SERVER_PRELOAD,
+        "keepalive": settings.SERVER_KEEPALIVE,
+        "backlog": settings.SERVER_BACKLOG,
+        "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT,
+        "timeout": settings.SERVER_TIMEOUT,
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS_JITTER,
+    }
+
+    print(f"🚀 Starting {workers} gunicorn/uvicorn workers on {host}:{port} (loop={settings.UVICORN_LOOP}, http={settings.UVICORN_HTTP})")
+    ProductionApplication(options).run()
+
+
+def _run_uvicorn_workers(host: str, port: int, workers: int):
+    import uvicorn
+
+    print(f"🚀 Starting {workers} uvicorn workers on {host}:{port} (loop={settings.UVICORN_LOOP}, http={settings.UVICORN_HTTP})")
+    uvicorn.run(
+        APP_PATH,
+        host=host,
+        port=port,
+        workers=workers,
+        loop=settings.UVICORN_LOOP,
+        http=settings.UVICORN_HTTP,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT,
+        limit_max_requests=settings.SERVER_MAX_REQUESTS or None
+    )
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,4 +12,125 @@ class Settings:
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
     ALLOWED_ORIGINS: list = os.getenv("ALLOWED_ORIGINS", "").split(",")
 
+    # Placement statistics
+    STATS_RECONCILE_INTERVAL: int = int(os.getenv("STATS_RECONCILE_INTERVAL", 300))
+
+    # Response compression
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "True").lower() == "true"
+    COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+
+    # Server launcher (run.py --production)
+    SERVER_MODE: str = os.getenv("SERVER_MODE", "development").lower()
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", 0))  # 0 = one worker per CPU core
+    SERVER_PRELOAD: bool = os.getenv("SERVER_PRELOAD", "True").lower() == "true"
+    SERVER_KEEPALIVE: int = int(os.getenv("SERVER_KEEPALIVE", 5))
+    SERVER_BACKLOG: int = int(os.getenv("SERVER_BACKLOG", 2048))
+    SERVER_GRACEFUL_TIMEOUT: int = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", 30))
+    SERVER_TIMEOUT: int = int(os.getenv("SERVER_TIMEOUT", 120))
+    SERVER_MAX_REQUESTS: int = int(os.getenv("SERVER_MAX_REQUESTS", 0))
+    SERVER_MAX_REQUESTS_JITTER: int = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", 0))
+    UVICORN_LOOP: str = os.getenv("UVICORN_LOOP", "auto")  # auto, uvloop or asyncio
+    UVICORN_HTTP: str = os.getenv("UVICORN_HTTP", "auto")  # auto, httptools or h11
+
+    # Process pool for CPU-heavy work (shortlist parsing, export building)
+    CPU_POOL_WORKERS: int = int(os.getenv("CPU_POOL_WORKERS", 0))  # 0 = min(4, CPU cores)
+    CPU_POOL_MAX_PENDING: int = int(os.getenv("CPU_POOL_MAX_PENDING", 8))
+    CPU_POOL_START_METHOD: str = os.getenv("CPU_POOL_START_METHOD", "spawn")
+
+    # Student profile snapshot (shortlist matching and other bulk lookups)
+    PROFILE_SNAPSHOT_TTL: int = int(os.getenv("PROFILE_SNAPSHOT_TTL", 300))
+    SHORTLIST_PROFILE_MAX_AGE: int = int(os.getenv("SHORTLIST_PROFILE_MAX_AGE", 60))
+
+    # Job catalog (reloaded periodically to pick up jobs written outside the API)
+    JOB_CATALOG_REFRESH_INTERVAL: int = int(os.getenv("JOB_CATALOG_REFRESH_INTERVAL", 300))
+
+    # Realtime events (Server-Sent Events)
+    EVENTS_QUEUE_SIZE: int = int(os.getenv("EVENTS_QUEUE_SIZE", 100))
+    EVENTS_MAX_CONNECTIONS: int = int(os.getenv("EVENTS_MAX_CONNECTIONS", 2000))
+    EVENTS_HEARTBEAT_INTERVAL: int = int(os.getenv("EVENTS_HEARTBEAT_INTERVAL", 15))
+
+    # Per-student applications view cache
+    STUDENT_VIEW_CACHE_SIZE: int = int(os.getenv("STUDENT_VIEW_CACHE_SIZE", 5000))
+    STUDENT_VIEW_CACHE_TTL: int = int(os.getenv("STUDENT_VIEW_CACHE_TTL", 60))
+
+    # Rate limiting and admission control
+    ADMISSION_CONTROL_ENABLED: bool = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() == "true"
+    # Per-client buckets (per worker, keyed on an unauthenticated user id or the client address)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
+    RATE_LIMIT_USER_RATE: float = float(os.getenv("RATE_LIMIT_USER_RATE", 10))  # requests/second per user
+    RATE_LIMIT_USER_BURST: float = float(os.getenv("RATE_LIMIT_USER_BURST", 40))
+    RATE_LIMIT_IP_RATE: float = float(os.getenv("RATE_LIMIT_IP_RATE", 100))  # requests/second per anonymous address
+    RATE_LIMIT_IP_BURST: float = float(os.getenv("RATE_LIMIT_IP_BURST", 400))
+    # Header a trusted reverse proxy sets to the client address (e.g. X-Forwarded-For); empty uses the socket peer
+    RATE_LIMIT_CLIENT_IP_HEADER: str = os.getenv("RATE_LIMIT_CLIENT_IP_HEADER", "")
+    # Shared budgets per route prefix: "prefix=rate:burst,..."
+    RATE_LIMIT_ROUTES: str = os.getenv(
+        "RATE_LIMIT_ROUTES",
+        "/api/all=5:20,/api/applications/export=1:4,/api/shortlist/upload=1:4"
+    )
+    # Concurrent requests per expensive route prefix: "prefix=limit,..."
+    CONCURRENCY_LIMITS: str = os.getenv(
+        "CONCURRENCY_LIMITS",
+        "/api/all=8,/api/applications/export=2,/api/shortlist/upload=2"
+    )
+    ADMISSION_QUEUE_TIMEOUT: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 5))  # seconds waiting for a slot
+    LOAD_SHED_LAG_MS: float = float(os.getenv("LOAD_SHED_LAG_MS", 250))  # 0 disables load shedding
+
+    # Audit log of application status transitions
+    AUDIT_LOG_DIR: str = os.getenv("AUDIT_LOG_DIR", "audit_log")
+    AUDIT_FLUSH_INTERVAL: float = float(os.getenv("AUDIT_FLUSH_INTERVAL", 2))
+    AUDIT_BATCH_SIZE: int = int(os.getenv("AUDIT_BATCH_SIZE", 500))
+
+    # Search indexes over jobs and applicants (full rebuild interval, seconds)
+    SEARCH_INDEX_TTL: int = int(os.getenv("SEARCH_INDEX_TTL", 900))
+
+    # Supabase resilience: timeouts (seconds), read retries and circuit breaker
+    SUPABASE_TIMEOUT: float = float(os.getenv("SUPABASE_TIMEOUT", 5))
+    SUPABASE_WRITE_TIMEOUT: float = float(os.getenv("SUPABASE_WRITE_TIMEOUT", 10))
+    SUPABASE_READ_RETRIES: int = int(os.getenv("SUPABASE_READ_RETRIES", 2))
+    SUPABASE_RETRY_BACKOFF: float = float(os.getenv("SUPABASE_RETRY_BACKOFF", 0.1))
+    SUPABASE_RETRY_MAX_BACKOFF: float = float(os.getenv("SUPABASE_RETRY_MAX_BACKOFF", 1.0))
+    BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("BREAKER_FAILURE_THRESHOLD", 5))
+    BREAKER_RESET_TIMEOUT: float = float(os.getenv("BREAKER_RESET_TIMEOUT", 30))
+    STALE_CACHE_SIZE: int = int(os.getenv("STALE_CACHE_SIZE", 500))
+
+    # Password hashing and bulk student onboarding
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))  # log2 cost; each +1 doubles hashing time
+    ONBOARDING_CHUNK_SIZE: int = int(os.getenv("ONBOARDING_CHUNK_SIZE", 500))  # rows per multi-row upsert
+    ONBOARDING_AUTH_CONCURRENCY: int = int(os.getenv("ONBOARDING_AUTH_CONCURRENCY", 8))  # Supabase Auth admin calls at once
+
+    # Bulk job import: rows per multi-row insert
+    JOB_IMPORT_CHUNK_SIZE: int = int(os.getenv("JOB_IMPORT_CHUNK_SIZE", 100))
+
+    # Season archive of old applications (zstd Parquet, needs pyarrow)
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "archive")
+    ARCHIVE_COMPRESSION_LEVEL: int = int(os.getenv("ARCHIVE_COMPRESSION_LEVEL", 9))
+    ARCHIVE_RETENTION_DAYS: int = int(os.getenv("ARCHIVE_RETENTION_DAYS", 365))  # default cutoff age
+
+    # Job catalog and profile snapshot shared by all workers on a host (memory-mapped files)
+    SHARED_CACHE_ENABLED: bool = os.getenv("SHARED_CACHE_ENABLED", "false").lower() == "true"
+    SHARED_CACHE_DIR: str = os.getenv("SHARED_CACHE_DIR", os.path.join(tempfile.gettempdir(), "levelhub-shared-cache"))
+
+    # On-demand request profiling and allocation tracing (off unless a token is set)
+    PROFILING_TOKEN: str = os.getenv("PROFILING_TOKEN", "")
+    PROFILING_SAMPLE_INTERVAL_MS: float = float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", 5))
+    PROFILING_MAX_SECONDS: float = float(os.getenv("PROFILING_MAX_SECONDS", 60))  # sampling stops after this
+    PROFILING_KEEP: int = int(os.getenv("PROFILING_KEEP", 20))  # profiles kept per worker
+    PROFILING_DIR: str = os.getenv("PROFILING_DIR", "debug_profiles")  # shared by all workers
+
+    # Local SQLite replica of jobs and profiles, synced by updated_at cursor
+    REPLICA_ENABLED: bool = os.getenv("REPLICA_ENABLED", "false").lower() == "true"
+    REPLICA_PATH: str = os.getenv("REPLICA_PATH", os.path.join("replica", "levelhub.sqlite3"))
+    REPLICA_SYNC_INTERVAL: float = float(os.getenv("REPLICA_SYNC_INTERVAL", 30))
+    REPLICA_FULL_SYNC_INTERVAL: float = float(os.getenv("REPLICA_FULL_SYNC_INTERVAL", 3600))  # also drops deleted rows
+    REPLICA_SYNC_OVERLAP: float = float(os.getenv("REPLICA_SYNC_OVERLAP", 5))  # seconds re-read behind the cursor
+
+    # Background resume text extraction and keyword index (PDF needs pypdf)
+    RESUME_INDEX_PATH: str = os.getenv("RESUME_INDEX_PATH", os.path.join("resume_index", "resumes.sqlite3"))
+    RESUME_QUEUE_SIZE: int = int(os.getenv("RESUME_QUEUE_SIZE", 1000))
+    RESUME_MAX_PAGES: int = int(os.getenv("RESUME_MAX_PAGES", 20))
+    RESUME_MAX_TEXT_CHARS: int = int(os.getenv("RESUME_MAX_TEXT_CHARS", 100000))
+
 settings = Settings()
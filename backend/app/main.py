@@ -1,15 +1,81 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from app.config.database import init_supabase, read_coalescer, upstream_health
 from app.config.settings import settings
-from app.routes import users, applications, jobs
+from app.middleware.admission import AdmissionControlMiddleware, admission_metrics
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.routes import users, applications, jobs, stats, events, audit, search, dashboard, onboarding, archive, debug
+from app.services.audit_log import audit_log
+from app.services.job_catalog import job_catalog
+from app.services.offload import cpu_pool
+from app.services.profiles import profile_directory
+from app.services.replica import local_replica
+from app.services.resumes import resume_pipeline
+from app.services.scheduler import deadline_scheduler
+from app.services.stats import placement_stats
 from fastapi.staticfiles import StaticFiles
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the Supabase client here rather than at import time
+    await asyncio.to_thread(init_supabase)
+    # Keep the dashboard counters in sync with the database
+    reconcile_task = asyncio.create_task(
+        placement_stats.run_reconciliation(settings.STATS_RECONCILE_INTERVAL)
+    )
+    # Keep the local jobs/profiles replica current before the catalog reads from it
+    replica_task = None
+    if settings.REPLICA_ENABLED:
+        await asyncio.to_thread(local_replica.open)
+        replica_task = asyncio.create_task(
+            local_replica.run_sync(settings.REPLICA_SYNC_INTERVAL, settings.REPLICA_FULL_SYNC_INTERVAL)
+        )
+    # Load the job catalog and close jobs as their deadlines pass
+    scheduler_task = asyncio.create_task(deadline_scheduler.run())
+    # Preload the profile snapshot that eligibility masks are computed over
+    asyncio.create_task(profile_directory.warm())
+    # Write status transitions to the audit log in batches
+    audit_task = asyncio.create_task(audit_log.run_flusher(settings.AUDIT_FLUSH_INTERVAL))
+    # Extract and index uploaded resumes off the request path
+    resume_pipeline.start()
+    yield
+    resume_pipeline.stop()
+    audit_task.cancel()
+    audit_log.flush()
+    scheduler_task.cancel()
+    if replica_task is not None:
+        replica_task.cancel()
+    reconcile_task.cancel()
+    cpu_pool.shutdown()
+
 app = FastAPI(
     title="Placement Management API",
     description="Backend API for placement management system",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Throttle bursts before they reach Supabase (inside CORS so rejections carry CORS headers)
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        client_limits=settings.RATE_LIMIT_ENABLED,
+        user_rate=settings.RATE_LIMIT_USER_RATE,
+        user_burst=settings.RATE_LIMIT_USER_BURST,
+        ip_rate=settings.RATE_LIMIT_IP_RATE,
+        ip_burst=settings.RATE_LIMIT_IP_BURST,
+        client_ip_header=settings.RATE_LIMIT_CLIENT_IP_HEADER,
+        route_rates=settings.RATE_LIMIT_ROUTES,
+        concurrency_limits=settings.CONCURRENCY_LIMITS,
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+        shed_lag_ms=settings.LOAD_SHED_LAG_MS,
+    )
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -19,9 +85,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON/CSV responses (added last so it wraps everything else)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+# Admin-requested CPU profiles (outermost, so they include every other layer)
+if settings.PROFILING_TOKEN:
+    app.add_middleware(
+        ProfilingMiddleware,
+        token=settings.PROFILING_TOKEN,
+        sample_interval_ms=settings.PROFILING_SAMPLE_INTERVAL_MS,
+        max_seconds=settings.PROFILING_MAX_SECONDS,
+    )
+
 # Include routers
 app.include_router(users.router, prefix="/api")
 app.include_router(applications.router, prefix="/api")
+app.include_router(stats.router, prefix="/api")
+app.include_router(events.router, prefix="/api")
+app.include_router(audit.router, prefix="/api")
+app.include_router(search.router, prefix="/api")
+app.include_router(dashboard.router, prefix="/api")
+app.include_router(onboarding.router, prefix="/api")
+app.include_router(archive.router, prefix="/api")
+app.include_router(debug.router, prefix="/api")
 app.include_router(jobs.router, prefix="/api")
 
 # Mount static files for uploaded resumes
@@ -33,4 +125,16 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "read_coalescing": read_coalescer.metrics(),
+        "admission": admission_metrics(),
+        "upstream": upstream_health(),
+        "replica": local_replica.metrics() if settings.REPLICA_ENABLED else None,
+        "resumes": resume_pipeline.metrics(),
+        "shared_cache": {
+            "jobs": job_catalog.shared_metrics(),
+            "profiles": profile_directory.shared_metrics(),
+            "placements": profile_directory.placement_metrics()
+        }
+    }
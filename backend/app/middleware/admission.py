@@ -0,0 +1,237 @@
+"""
+Rate limiting and admission control.
+
+Three layers protect Supabase when a drive opens and every student is
+online at once:
+
+* token buckets: one shared bucket per configured route prefix and,
+  when per-client limits are on, one per caller; an empty bucket answers
+  429 with Retry-After
+* concurrency caps on expensive endpoints (export, shortlist upload,
+  ``/all``): requests queue for a slot and get a 503 if they wait too long
+* load shedding: when event-loop lag (how long ready work waits to run)
+  crosses a threshold, new requests get a 503 with Retry-After instead of
+  making the backlog worse
+
+Callers are identified by the ``X-User-Id`` header, a ``user_id`` /
+``student_id`` query parameter or the student id in per-student paths.
+Anonymous requests are keyed on the client address, taken from a trusted
+proxy header when one is configured, and get a larger budget since a
+campus NAT or reverse proxy puts many students behind one address.
+
+Buckets live in each worker's memory, so the effective limit is the
+configured one times the number of workers. The user id is not
+authenticated: per-client limits spread load fairly between well-behaved
+clients and are not a security boundary against a client that lies.
+"""
+import asyncio
+import math
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+
+EXEMPT_PATHS = ("/health", "/docs", "/redoc", "/openapi.json")
+
+# Per-student paths whose last segment identifies the caller
+_STUDENT_PATHS = re.compile(r"^/api/(?:applications|jobs/eligible|test|dashboard/student)/([0-9a-fA-F-]{36})$")
+
+
+def parse_route_rates(value: str) -> List[Tuple[str, float, float]]:
+    """``"/api/all=2:5,/api/x=0.5:2"`` -> ``[("/api/all", 2.0, 5.0), ...]``"""
+    limits = []
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        prefix, _, spec = item.partition("=")
+        rate, _, burst = spec.partition(":")
+        limits.append((prefix.strip(), float(rate), float(burst or rate)))
+    return limits
+
+
+def parse_route_caps(value: str) -> List[Tuple[str, int]]:
+    """``"/api/all=4,/api/x=2"`` -> ``[("/api/all", 4), ...]``"""
+    caps = []
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        prefix, _, limit = item.partition("=")
+        caps.append((prefix.strip(), int(limit)))
+    return caps
+
+
+def _matches(path: str, prefix: str) -> bool:
+    return path == prefix or path.startswith(prefix.rstrip("/") + "/")
+
+
+class TokenBuckets:
+    """Token buckets keyed by arbitrary strings, with idle buckets evicted LRU"""
+
+    def __init__(self, max_buckets: int = 100_000):
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, rate: float, burst: float) -> float:
+        """Consume one token; returns 0 if allowed, else seconds until one is available"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            wait = 0.0
+        else:
+            self._buckets[key] = (tokens, now)
+            wait = (1 - tokens) / rate if rate > 0 else 60.0
+
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class LoopLagMonitor:
+    """Tracks an EWMA of how late the event loop wakes a periodic timer"""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def ensure_started(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - started - self.interval)
+            self.lag = 0.8 * self.lag + 0.2 * lag
+
+
+lag_monitor = LoopLagMonitor()
+rejections = {"rate_limited": 0, "queue_timeout": 0, "shed": 0}
+
+
+def admission_metrics() -> dict:
+    return {
+        "event_loop_lag_ms": round(lag_monitor.lag * 1000, 2),
+        "rejected": dict(rejections),
+    }
+
+
+class AdmissionControlMiddleware:
+    def __init__(
+        self,
+        app,
+        client_limits: bool = False,
+        user_rate: float = 10.0,
+        user_burst: float = 40.0,
+        ip_rate: float = 100.0,
+        ip_burst: float = 400.0,
+        client_ip_header: str = "",
+        route_rates: str = "",
+        concurrency_limits: str = "",
+        queue_timeout: float = 2.0,
+        shed_lag_ms: float = 250.0,
+    ):
+        self.app = app
+        self.client_limits = client_limits
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.ip_rate = ip_rate
+        self.ip_burst = ip_burst
+        self.client_ip_header = client_ip_header.strip().lower().encode("latin-1")
+        self.route_rates = parse_route_rates(route_rates)
+        self.concurrency_limits = parse_route_caps(concurrency_limits)
+        self.queue_timeout = queue_timeout
+        self.shed_lag = shed_lag_ms / 1000
+        self.buckets = TokenBuckets()
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _client_address(self, scope) -> str:
+        if self.client_ip_header:
+            for name, value in scope["headers"]:
+                if name == self.client_ip_header:
+                    # The trusted proxy appends the address it saw last
+                    address = value.decode("latin-1").rsplit(",", 1)[-1].strip()
+                    if address:
+                        return address
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def _client_bucket(self, scope) -> Tuple[str, float, float]:
+        """Bucket key, rate and burst for the caller"""
+        user = self._user_id(scope)
+        if user is not None:
+            return "user:" + user, self.user_rate, self.user_burst
+        return "ip:" + self._client_address(scope), self.ip_rate, self.ip_burst
+
+    def _user_id(self, scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == b"x-user-id" and value:
+                return value.decode("latin-1")
+
+        query = scope.get("query_string", b"").decode("latin-1")
+        for pair in query.split("&"):
+            name, _, value = pair.partition("=")
+            if name in ("user_id", "student_id") and value:
+                return value
+
+        match = _STUDENT_PATHS.match(scope["path"])
+        return match.group(1) if match else None
+
+    async def _reject(self, send, status_code: int, detail: str, retry_after: float):
+        body = orjson.dumps({"detail": detail})
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or scope.get("method") == "OPTIONS" or path.startswith(EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        lag_monitor.ensure_started()
+        if self.shed_lag and lag_monitor.lag > self.shed_lag:
+            rejections["shed"] += 1
+            await self._reject(send, 503, "Server is overloaded, please retry shortly", lag_monitor.lag * 4)
+            return
+
+        wait = self.buckets.take(*self._client_bucket(scope)) if self.client_limits else 0.0
+        for prefix, rate, burst in self.route_rates:
+            if _matches(path, prefix):
+                wait = max(wait, self.buckets.take("route:" + prefix, rate, burst))
+                break
+        if wait > 0:
+            rejections["rate_limited"] += 1
+            await self._reject(send, 429, "Rate limit exceeded", wait)
+            return
+
+        cap = next(((prefix, limit) for prefix, limit in self.concurrency_limits if _matches(path, prefix)), None)
+        if cap is None:
+            await self.app(scope, receive, send)
+            return
+
+        semaphore = self._semaphores.get(cap[0])
+        if semaphore is None:
+            semaphore = self._semaphores[cap[0]] = asyncio.Semaphore(cap[1])
+
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            rejections["queue_timeout"] += 1
+            await self._reject(send, 503, "Too many concurrent requests for this endpoint", self.queue_timeout)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            semaphore.release()
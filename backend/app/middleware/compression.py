@@ -0,0 +1,195 @@
+"""
+Response compression middleware.
+
+Negotiates Brotli (when the ``brotli`` package is installed) or gzip from
+the request's ``Accept-Encoding`` header. Small bodies and media types that
+are already compressed (PDF/DOCX resumes, images, archives) are sent as-is.
+Streaming responses such as the CSV export are compressed chunk by chunk
+and flushed as they go, so nothing is buffered in memory.
+"""
+import zlib
+from typing import Iterable, Optional
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; fall back to gzip only
+    brotli = None
+
+# Media types that are already compressed or must reach the client unbuffered
+DEFAULT_EXCLUDED_MEDIA_TYPES = (
+    "application/pdf",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/x-7z-compressed",
+    "application/x-rar-compressed",
+    "application/msword",
+    "application/vnd.openxmlformats-officedocument",
+    "image/",
+    "audio/",
+    "video/",
+    "font/woff",
+    "text/event-stream",
+)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick ``br`` or ``gzip`` from an Accept-Encoding header, or None"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    br_quality = accepted.get("br", wildcard)
+    gzip_quality = accepted.get("gzip", wildcard)
+
+    if brotli is not None and br_quality > 0 and br_quality >= gzip_quality:
+        return "br"
+    if gzip_quality > 0:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Incremental gzip/Brotli encoder with a common interface"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it so the client can decode it right away"""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing eligible HTTP responses"""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        excluded_media_types: Iterable[str] = DEFAULT_EXCLUDED_MEDIA_TYPES,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.excluded_media_types = tuple(excluded_media_types)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+
+        encoding = negotiate_encoding(accept_encoding) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-request state machine wrapping the downstream ``send``"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream_send = send
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+
+    def _should_skip(self, headers) -> bool:
+        if headers.get(b"content-encoding"):
+            return True
+        content_type = headers.get(b"content-type", b"").decode("latin-1").lower()
+        if content_type.startswith(self.middleware.excluded_media_types):
+            return True
+        content_length = headers.get(b"content-length")
+        if content_length is not None and int(content_length) < self.middleware.minimum_size:
+            return True
+        return False
+
+    def _compressed_headers(self, content_length: Optional[int]):
+        headers = [
+            (name, value) for name, value in self.start_message["headers"]
+            if name.lower() != b"content-length"
+        ]
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        headers.append((b"vary", b"Accept-Encoding"))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode("latin-1")))
+        return headers
+
+    async def send(self, message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            self.start_message = message
+            headers = {name.lower(): value for name, value in message.get("headers", [])}
+            self.passthrough = self._should_skip(headers)
+            if self.passthrough:
+                await self.downstream_send(message)
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self.downstream_send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body:
+                # Whole body in one message: we know its size up front
+                if len(body) < self.middleware.minimum_size:
+                    await self.downstream_send(self.start_message)
+                    await self.downstream_send(message)
+                    return
+                compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+                compressed = compressor.compress(body) + compressor.finish()
+                await self.downstream_send({**self.start_message, "headers": self._compressed_headers(len(compressed))})
+                await self.downstream_send({"type": "http.response.body", "body": compressed})
+                return
+
+            # Streaming response: compress incrementally without a content-length
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            await self.downstream_send({**self.start_message, "headers": self._compressed_headers(None)})
+
+        chunk = self.compressor.compress(body) if body else b""
+        if not more_body:
+            chunk += self.compressor.finish()
+        if chunk or not more_body:
+            await self.downstream_send({"type": "http.response.body", "body": chunk, "more_body": more_body})
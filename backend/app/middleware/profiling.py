@@ -0,0 +1,80 @@
+"""
+Per-request CPU profiling middleware.
+
+A request carrying the admin ``X-Profile-Token`` header together with
+``X-Profile: cpu`` (or the ``_profile=cpu`` query flag) is sampled from
+the moment it arrives until its last body chunk is sent. The profile is
+stored in ``profile_store`` and its id returned in the ``X-Profile-Id``
+response header (with the worker's pid in ``X-Profile-Pid``); fetch it from
+``/api/debug/profiles/{id}`` on any worker.
+
+The middleware is only installed when ``PROFILING_TOKEN`` is set, so with
+profiling disabled requests do not pass through it at all.
+"""
+import asyncio
+import os
+import secrets
+import uuid
+
+from app.services.profiling import SamplingProfiler, profile_store
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, token: str, sample_interval_ms: float = 5.0, max_seconds: float = 60.0):
+        self.app = app
+        self.token = token.encode("latin-1")
+        self.interval = sample_interval_ms / 1000
+        self.max_seconds = max_seconds
+
+    def _requested(self, scope) -> bool:
+        token = flag = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile-token":
+                token = value
+            elif name == b"x-profile":
+                flag = value.lower()
+        if token is None or not secrets.compare_digest(token, self.token):
+            return False
+        if flag is None:
+            for pair in scope.get("query_string", b"").split(b"&"):
+                name, _, value = pair.partition(b"=")
+                if name == b"_profile":
+                    flag = value.lower()
+                    break
+        return flag in (b"cpu", b"1", b"true")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope) or not profile_store.active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+        profiler = SamplingProfiler(self.interval, self.max_seconds)
+        state = {"status": None, "done": False}
+
+        async def finish():
+            if state["done"]:
+                return
+            state["done"] = True
+            profiler.stop()
+            profile_store.active.release()
+            await asyncio.to_thread(profile_store.add, profile_id, scope.get("method", ""), scope["path"], state["status"], profiler)
+            print(f"🔬 Profiled {scope.get('method', '')} {scope['path']}: {profiler.sample_count} samples (profile {profile_id})")
+
+        async def profiled_send(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                message = {**message, "headers": [
+                    *message.get("headers", []),
+                    (b"x-profile-id", profile_id.encode()),
+                    (b"x-profile-pid", str(os.getpid()).encode())
+                ]}
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                await finish()
+            await send(message)
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, profiled_send)
+        finally:
+            await finish()
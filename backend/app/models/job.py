@@ -0,0 +1,190 @@
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, field_validator
+from typing import List, Optional, Union
+from datetime import date, datetime, time, timezone
+import re
+
+from app.services.eligibility import RuleSyntaxError, normalize_rule
+
+# Branch codes used by the sign-up and job posting forms
+BRANCHES = ["CSE", "ISE", "AIML", "CSE DS", "CSE CY", "ECE", "EEE", "ME", "CE", "CHE", "AE", "IE", "EIE", "ETE"]
+
+BRANCH_ALIASES = {
+    "CS": "CSE", "COMPUTER SCIENCE": "CSE", "COMPUTER SCIENCE AND ENGINEERING": "CSE",
+    "IS": "ISE", "INFORMATION SCIENCE": "ISE", "INFORMATION SCIENCE AND ENGINEERING": "ISE",
+    "AI ML": "AIML", "AI&ML": "AIML", "AI AND ML": "AIML",
+    "CSEDS": "CSE DS", "CS DS": "CSE DS", "DATA SCIENCE": "CSE DS",
+    "CSECY": "CSE CY", "CS CY": "CSE CY", "CYBER SECURITY": "CSE CY",
+    "EC": "ECE", "ELECTRONICS AND COMMUNICATION": "ECE",
+    "EE": "EEE", "ELECTRICAL AND ELECTRONICS": "EEE",
+    "MECH": "ME", "MECHANICAL": "ME",
+    "CV": "CE", "CIVIL": "CE",
+    "CH": "CHE", "CHEMICAL": "CHE",
+    "AERO": "AE", "AEROSPACE": "AE",
+    "IEM": "IE", "INDUSTRIAL ENGINEERING AND MANAGEMENT": "IE",
+    "EI": "EIE", "ET": "ETE", "TELECOM": "ETE"
+}
+
+JOB_STATUSES = ["active", "closed"]
+
+_BRANCH_SEPARATORS = re.compile(r"[,;/|\n]+")
+_DATE_FORMATS = ("%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y")
+
+
+def normalize_branch(value: str) -> str:
+    """Canonical branch code for ``value`` ("cse-ds", "Data Science" -> "CSE DS")"""
+    key = re.sub(r"[\s_\-]+", " ", str(value)).strip().upper()
+    branch = BRANCH_ALIASES.get(key, key)
+    if branch not in BRANCHES:
+        raise ValueError(f"Unknown branch '{value}' (expected one of {', '.join(BRANCHES)})")
+    return branch
+
+
+def normalize_timestamp(value, end_of_day: bool = False) -> Optional[str]:
+    """ISO 8601 UTC timestamp from a datetime, date or common date string.
+
+    Date-only deadlines mean "until the end of that day".
+    """
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, date):
+        parsed = datetime.combine(value, time.max if end_of_day else time.min)
+    else:
+        text = str(value).strip()
+        parsed = None
+        for pattern in _DATE_FORMATS:
+            try:
+                parsed = datetime.combine(datetime.strptime(text, pattern).date(), time.max if end_of_day else time.min)
+                break
+            except ValueError:
+                continue
+        if parsed is None:
+            try:
+                parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+            except ValueError:
+                raise ValueError(f"Invalid date '{text}' (use YYYY-MM-DD, DD/MM/YYYY or an ISO timestamp)")
+            if len(text) == 10 and end_of_day:
+                parsed = datetime.combine(parsed.date(), time.max)
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).replace(microsecond=0).isoformat()
+
+
+class JobCreate(BaseModel):
+    """A job posting as written to the ``jobs`` table, normalized once on write"""
+    model_config = ConfigDict(str_strip_whitespace=True, extra='ignore')
+
+    company_name: str = Field(min_length=1)
+    role: str = Field(min_length=1)
+    job_type: str = Field(min_length=1)
+    location: Optional[str] = None
+    ctc: Optional[float] = Field(None, ge=0)
+    stipend: Optional[float] = Field(None, ge=0)
+    joining_bonus: Optional[float] = Field(None, ge=0)
+    retention_bonus: Optional[float] = Field(None, ge=0)
+    min_cgpa: float = Field(0.0, ge=0, le=10)
+    max_active_backlogs: int = Field(0, ge=0)
+    eligible_branches: List[str] = []
+    eligibility_rule: Optional[str] = None
+    gender_preference: Optional[str] = None
+    job_description: Optional[str] = None
+    process_details: Optional[str] = None
+    deadline: str
+    drive_date: Optional[str] = None
+    assessment_date: Optional[str] = None
+    status: str = "active"
+    created_by: Optional[str] = None
+
+    @field_validator('location', 'gender_preference', 'job_description', 'process_details', 'created_by', mode='before')
+    @classmethod
+    def blank_to_none(cls, value):
+        return None if isinstance(value, str) and not value.strip() else value
+
+    @field_validator('ctc', 'stipend', 'joining_bonus', 'retention_bonus', mode='before')
+    @classmethod
+    def parse_amount(cls, value):
+        if isinstance(value, str):
+            value = value.replace(',', '').strip()
+            return value or None
+        return value
+
+    @field_validator('min_cgpa', 'max_active_backlogs', mode='before')
+    @classmethod
+    def blank_to_default(cls, value):
+        return 0 if value is None or (isinstance(value, str) and not value.strip()) else value
+
+    @field_validator('eligible_branches', mode='before')
+    @classmethod
+    def parse_branches(cls, value: Union[str, List[str], None]):
+        if value is None:
+            return []
+        if isinstance(value, str):
+            value = _BRANCH_SEPARATORS.split(value)
+        branches = []
+        for item in value:
+            if item is not None and str(item).strip():
+                branch = normalize_branch(item)
+                if branch not in branches:
+                    branches.append(branch)
+        return branches
+
+    @field_validator('eligibility_rule', mode='before')
+    @classmethod
+    def parse_rule(cls, value):
+        try:
+            return normalize_rule(value)
+        except RuleSyntaxError as e:
+            raise ValueError(f"Invalid eligibility rule: {str(e)}")
+
+    @field_validator('deadline', mode='before')
+    @classmethod
+    def parse_deadline(cls, value):
+        deadline = normalize_timestamp(value, end_of_day=True)
+        if deadline is None:
+            raise ValueError("Deadline is required")
+        return deadline
+
+    @field_validator('drive_date', 'assessment_date', mode='before')
+    @classmethod
+    def parse_date(cls, value):
+        return normalize_timestamp(value)
+
+    @field_validator('status', mode='before')
+    @classmethod
+    def parse_status(cls, value):
+        status = str(value or 'active').strip().lower()
+        if status not in JOB_STATUSES:
+            raise ValueError(f"Status must be one of: {', '.join(JOB_STATUSES)}")
+        return status
+
+
+# Validates a whole import in one pydantic-core call
+JobCreateList = TypeAdapter(List[JobCreate])
+
+
+def validate_jobs(rows: List[dict], row_numbers: Optional[List[int]] = None):
+    """Validate import rows in batch; returns (valid jobs, per-row errors).
+
+    Errors name the row by ``row_numbers`` (spreadsheet lines) or, without
+    them, by 1-based position in ``rows``.
+    """
+    try:
+        return JobCreateList.validate_python(rows), []
+    except ValidationError as e:
+        failures = e.errors(include_url=False)
+
+    errors, bad_rows = [], set()
+    for failure in failures:
+        position, *field = failure['loc']
+        bad_rows.add(position)
+        errors.append({
+            "row": (row_numbers[position] if row_numbers else position + 1) if isinstance(position, int) else None,
+            "field": '.'.join(str(part) for part in field) or None,
+            "error": failure['msg'].removeprefix('Value error, ')
+        })
+    # Everything else passed; validate it again as one batch to get the models
+    valid = JobCreateList.validate_python([row for position, row in enumerate(rows) if position not in bad_rows])
+    return valid, errors
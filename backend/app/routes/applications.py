@@ -1,19 +1,31 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query
-from fastapi.responses import StreamingResponse
-import csv
-import io
+from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from datetime import datetime
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from typing import Optional
+import asyncio
 import os
 import shutil
 from datetime import datetime
 import uuid
-import pandas as pd
-from io import BytesIO
 
-from app.config.database import get_supabase_client
+from app.config.database import get_supabase_client, fetch
 from app.config.settings import settings
+from app.services.event_bus import event_bus
+from app.services.job_catalog import job_catalog
+from app.services.matching import get_profile_index
+from app.services.offload import cpu_pool
+from app.services.profiles import profile_directory
+from app.services.replica import read_job, read_profile, read_profiles_by_id
+from app.services.resumes import parse_terms, resume_index, resume_pipeline
+from app.services.spreadsheets import SpreadsheetError, build_export, parse_shortlist
+from app.services.stats import placement_stats
+from app.services.applicants import applicant_page_query, encode_cursor
+from app.services.archive import ArchiveUnavailable, application_archive, as_application
+from app.services.audit_log import audit_log
+from app.services.search import search_catalog
+from app.services.student_views import student_views
+from app.utils.responses import RawJSONResponse, etag_matches
 
 supabase = get_supabase_client()
 
@@ -23,14 +35,27 @@ router = APIRouter()
 UPLOAD_DIR = "uploads/resumes"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Export columns, formats and the chunk size used when streaming the file
+EXPORT_HEADER = (
+    'Application ID', 'Applied Date', 'Status',
+    'Student Name', 'USN', 'Branch', 'CGPA', 'Email',
+    'Company', 'Role', 'Location', 'CTC', 'Deadline',
+    'Cover Letter'
+)
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+}
+EXPORT_CHUNK_SIZE = 64 * 1024
+
 @router.get("/all")
 async def get_all_applications():
     """Get all applications with job and student details"""
     try:
         print("🔍 Getting all applications")
 
-        # Get applications from Supabase with job details
-        response = supabase.table('applications').select('''
+        # Get applications from Supabase with job details (off the event loop, retries may back off)
+        query = supabase.table('applications').select('''
             *,
             jobs (
                 id,
@@ -40,10 +65,11 @@ async def get_all_applications():
                 ctc,
                 deadline
             )
-        ''').order('applied_at.desc').execute()
+        ''').order('applied_at.desc')
+        response = await asyncio.to_thread(query.execute)
 
         if not response.data or len(response.data) == 0:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=200,
                 content={
                     "success": True,
@@ -55,24 +81,17 @@ async def get_all_applications():
         # Get student IDs from applications
         student_ids = [app['student_id'] for app in response.data]
 
-        # Fetch student profiles
-        profiles_query = supabase.table('profiles').select('id, full_name, usn, branch, cgpa, email')
-        profiles_response = profiles_query.in_('id', student_ids).execute()
-        profiles_data = profiles_response.data or []
+        # Student profiles keyed by id (from the local replica when enabled)
+        profiles_dict = await read_profiles_by_id(student_ids)
 
-        # Create a dictionary for quick profile lookup
-        profiles_dict = {profile['id']: profile for profile in profiles_data}
-
-        # Merge applications with profiles
-        applications_data = []
-        for app in response.data:
-            app_copy = app.copy()
-            app_copy['profiles'] = profiles_dict.get(app['student_id'], {})
-            applications_data.append(app_copy)
+        # Merge applications with profiles (rows are freshly decoded, so mutate in place)
+        applications_data = response.data
+        for app in applications_data:
+            app['profiles'] = profiles_dict.get(app['student_id'], {})
 
         print(f"✅ Retrieved {len(applications_data)} applications")
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "success": True,
@@ -81,6 +100,8 @@ async def get_all_applications():
             }
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error in get_all_applications: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -140,7 +161,7 @@ async def create_application(
 
         # Insert into Supabase
         print(f"🔄 Inserting application data: {application_data}")
-        response = supabase.table('applications').insert([application_data]).execute()
+        response = await asyncio.to_thread(supabase.table('applications').insert([application_data]).execute)
 
         print(f"🔍 Supabase response: {response}")
         print(f"🔍 Response data: {response.data}")
@@ -158,7 +179,15 @@ async def create_application(
 
         print(f"✅ Application created successfully: {response.data[0]['id']}")
 
-        return JSONResponse(
+        branch = await placement_stats.resolve_branch(student_id)
+        placement_stats.record_application(application_data, branch=branch)
+        audit_log.record(application_data['id'], job_id, student_id, 'applied', source='application')
+        search_catalog.add_application(application_data)
+        student_views.bump(student_id)
+        # Text extraction happens in the background
+        resume_pipeline.submit(application_data["resume_url"])
+
+        return ORJSONResponse(
             status_code=201,
             content={
                 "success": True,
@@ -167,6 +196,8 @@ async def create_application(
             }
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         # Clean up uploaded file if something goes wrong
         if 'file_path' in locals() and os.path.exists(file_path):
@@ -174,40 +205,18 @@ async def create_application(
 
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/applications/{student_id}")
-async def get_student_applications(student_id: str):
-    """Get all applications for a student"""
-    try:
-        # Get applications from Supabase with job details
-        response = supabase.table('applications').select('''
-            *,
-            jobs (
-                id,
-                company_name,
-                role,
-                location,
-                ctc,
-                deadline
-            )
-        ''').eq('student_id', student_id).order('applied_at.desc').execute()
-
-        return JSONResponse(
-            status_code=200,
-            content={
-                "success": True,
-                "data": response.data or []
-            }
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
 @router.get("/applications/export")
 async def export_applications(
     status_filter: str = Query("all", description="Filter by status: all, applied, shortlisted, selected, rejected"),
-    job_id: str = Query(None, description="Filter by specific job ID")
+    job_id: str = Query(None, description="Filter by specific job ID"),
+    export_format: str = Query("csv", alias="format", description="Export format: csv or xlsx"),
+    include_archived: bool = Query(False, description="Also export applications moved to the season archive")
 ):
-    """Export applications data as CSV"""
+    """Export applications data as CSV or XLSX"""
     try:
+        if export_format not in EXPORT_MEDIA_TYPES:
+            raise HTTPException(status_code=400, detail=f"Invalid format. Must be one of: {', '.join(EXPORT_MEDIA_TYPES)}")
+
         # Build query based on filters - get applications with jobs first
         query = supabase.table('applications').select('''
             *,
@@ -229,92 +238,124 @@ async def export_applications(
             query = query.eq('job_id', job_id)
 
         # Execute query
-        response = query.order('applied_at.desc').execute()
+        response = await asyncio.to_thread(query.order('applied_at.desc').execute)
+        applications_data = response.data or []
 
-        if not response.data:
-            return JSONResponse(
+        if applications_data:
+            # Get student IDs and fetch profiles separately
+            student_ids = [app['student_id'] for app in applications_data]
+
+            # Student profiles keyed by id (from the local replica when enabled)
+            profiles_dict = await read_profiles_by_id(student_ids)
+
+            # Merge applications with profiles (rows are freshly decoded, so mutate in place)
+            for app in applications_data:
+                app['profiles'] = profiles_dict.get(app['student_id'], {})
+
+        if include_archived:
+            applications_data = await _with_archived(
+                applications_data, job_id=job_id, status=None if status_filter == "all" else status_filter
+            )
+
+        if not applications_data:
+            return ORJSONResponse(
                 status_code=200,
                 content={"message": "No applications found for export"}
             )
 
-        # Get student IDs and fetch profiles separately
-        student_ids = [app['student_id'] for app in response.data]
-
-        # Fetch student profiles
-        profiles_query = supabase.table('profiles').select('id, full_name, usn, branch, cgpa, email')
-        profiles_response = profiles_query.in_('id', student_ids).execute()
-        profiles_data = profiles_response.data or []
-
-        # Create a dictionary for quick profile lookup
-        profiles_dict = {profile['id']: profile for profile in profiles_data}
-
-        # Merge applications with profiles
-        applications_data = []
-        for app in response.data:
-            app_copy = app.copy()
-            app_copy['profiles'] = profiles_dict.get(app['student_id'], {})
-            applications_data.append(app_copy)
-
-        # Create CSV content
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # Write header
-        writer.writerow([
-            'Application ID', 'Applied Date', 'Status',
-            'Student Name', 'USN', 'Branch', 'CGPA', 'Email',
-            'Company', 'Role', 'Location', 'CTC', 'Deadline',
-            'Cover Letter'
-        ])
-
-        # Write data
+        # Project the rows here and let the process pool encode the file
+        rows = []
         for app in applications_data:
-            writer.writerow([
+            profile = app.get('profiles') or {}
+            job = app.get('jobs') or {}
+            cover_letter = app.get('cover_letter') or ''
+            rows.append((
                 app.get('id', ''),
                 app.get('applied_at', ''),
                 app.get('status', ''),
-                app.get('profiles', {}).get('full_name', ''),
-                app.get('profiles', {}).get('usn', ''),
-                app.get('profiles', {}).get('branch', ''),
-                app.get('profiles', {}).get('cgpa', ''),
-                app.get('profiles', {}).get('email', ''),
-                app.get('jobs', {}).get('company_name', ''),
-                app.get('jobs', {}).get('role', ''),
-                app.get('jobs', {}).get('location', ''),
-                app.get('jobs', {}).get('ctc', ''),
-                app.get('jobs', {}).get('deadline', ''),
-                app.get('cover_letter', '')[:100] + ('...' if app.get('cover_letter', '') and len(app.get('cover_letter', '')) > 100 else '')
-            ])
-
-        output.seek(0)
-        csv_content = output.getvalue()
-        output.close()
-
-        # Create streaming response
+                profile.get('full_name', ''),
+                profile.get('usn', ''),
+                profile.get('branch', ''),
+                profile.get('cgpa', ''),
+                profile.get('email', ''),
+                job.get('company_name', ''),
+                job.get('role', ''),
+                job.get('location', ''),
+                job.get('ctc', ''),
+                job.get('deadline', ''),
+                cover_letter[:100] + ('...' if len(cover_letter) > 100 else '')
+            ))
+
+        content = await cpu_pool.run(build_export, EXPORT_HEADER, rows, export_format)
+
+        # Stream the encoded file in chunks (compressed incrementally by the middleware)
         def generate():
-            yield csv_content
+            view = memoryview(content)
+            for offset in range(0, len(view), EXPORT_CHUNK_SIZE):
+                yield bytes(view[offset:offset + EXPORT_CHUNK_SIZE])
 
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        filename = f"applications_{status_filter}_{timestamp}.csv"
+        filename = f"applications_{status_filter}_{timestamp}.{export_format}"
 
         return StreamingResponse(
-            io.StringIO(csv_content),
-            media_type="text/csv",
+            generate(),
+            media_type=EXPORT_MEDIA_TYPES[export_format],
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
+@router.get("/applications/{student_id}")
+async def get_student_applications(student_id: str, if_none_match: Optional[str] = Header(None)):
+    """Get all applications for a student (cached per student, supports conditional GET)"""
+    try:
+        view = await student_views.load(student_id)
+
+        headers = {
+            "ETag": view.etag,
+            "Last-Modified": view.last_modified,
+            "Cache-Control": "private, no-cache"
+        }
+
+        if etag_matches(if_none_match, view.etag):
+            return Response(status_code=304, headers=headers)
+
+        return RawJSONResponse(content=view.payload, headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _with_archived(applications: list, job_id: Optional[str] = None, status: Optional[str] = None) -> list:
+    """Append matching archived applications (already joined with job and profile) and re-sort"""
+    try:
+        archived = await asyncio.to_thread(application_archive.query, job_id, None, status)
+    except ArchiveUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if not archived:
+        return applications
+    combined = applications + [as_application(row) for row in archived]
+    combined.sort(key=lambda app: app.get('applied_at') or '', reverse=True)
+    return combined
+
 @router.get("/jobs/{job_id}/applications")
-async def get_job_applications(job_id: str):
+async def get_job_applications(
+    job_id: str,
+    include_archived: bool = Query(False, description="Also return applications moved to the season archive"),
+    skills: Optional[str] = Query(None, description="Comma-separated skills or keywords to look for in resumes"),
+    match: str = Query("all", pattern="^(all|any)$", description="Require all skills or any of them")
+):
     """Get all applications for a job"""
     try:
         # Get applications from Supabase
-        response = supabase.table('applications').select('*').eq('job_id', job_id).order('applied_at.desc').execute()
+        query = supabase.table('applications').select('*').eq('job_id', job_id).order('applied_at.desc')
+        response = await asyncio.to_thread(query.execute)
 
-        if not response.data or len(response.data) == 0:
-            return JSONResponse(
+        if (not response.data or len(response.data) == 0) and not include_archived:
+            return ORJSONResponse(
                 status_code=200,
                 content={
                     "success": True,
@@ -322,32 +363,98 @@ async def get_job_applications(job_id: str):
                 }
             )
 
-        # Get student IDs from applications
-        student_ids = [app['student_id'] for app in response.data]
+        applications_data = response.data or []
+
+        if applications_data:
+            # Get student IDs from applications
+            student_ids = [app['student_id'] for app in applications_data]
+
+            # Student profiles keyed by id (from the local replica when enabled)
+            profiles_dict = await read_profiles_by_id(student_ids)
+
+            # Merge applications with profiles (rows are freshly decoded, so mutate in place)
+            for app in applications_data:
+                app['profiles'] = profiles_dict.get(app['student_id'], {})
 
-        # Fetch student profiles
-        profiles_query = supabase.table('profiles').select('id, full_name, usn, branch, cgpa, email')
-        profiles_response = profiles_query.in_('id', student_ids).execute()
-        profiles_data = profiles_response.data or []
+        if include_archived:
+            applications_data = await _with_archived(applications_data, job_id=job_id)
 
-        # Create a dictionary for quick profile lookup
-        profiles_dict = {profile['id']: profile for profile in profiles_data}
+        terms = parse_terms(skills)
+        if terms:
+            # Only applicants whose resume text contains the skills
+            matches, pending = await asyncio.to_thread(
+                resume_index.matching_urls, [app.get('resume_url') for app in applications_data], terms, match == "all"
+            )
+            applications_data = [app for app in applications_data if app.get('resume_url') in matches]
+            for app in applications_data:
+                app['matched_skills'] = matches[app['resume_url']]
 
-        # Merge applications with profiles
-        applications_data = []
-        for app in response.data:
-            app_copy = app.copy()
-            app_copy['profiles'] = profiles_dict.get(app['student_id'], {})
-            applications_data.append(app_copy)
+            return ORJSONResponse(
+                status_code=200,
+                content={
+                    "success": True,
+                    "data": applications_data,
+                    "skills": terms,
+                    "match": match,
+                    "resumes_pending": len(pending)
+                }
+            )
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "success": True,
                 "data": applications_data
             }
         )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/jobs/{job_id}/applicants")
+async def get_job_applicants(
+    job_id: str,
+    status: Optional[str] = Query(None, description="Comma-separated statuses to include"),
+    branch: Optional[str] = Query(None, description="Comma-separated branches to include"),
+    min_cgpa: Optional[float] = Query(None, ge=0, le=10),
+    max_cgpa: Optional[float] = Query(None, ge=0, le=10),
+    q: Optional[str] = Query(None, description="Search name, USN or email"),
+    sort: str = Query("applied_at", description="applied_at, cgpa, full_name, usn, status or branch"),
+    order: Optional[str] = Query(None, pattern="^(asc|desc)$", description="Defaults to the column's natural order"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
+    """One page of a job's applicant table, filtered, sorted and paged by the database"""
+    try:
+        try:
+            query, order = applicant_page_query(
+                job_id, status=status, branch=branch, min_cgpa=min_cgpa, max_cgpa=max_cgpa,
+                search=q, sort=sort, order=order, limit=limit, cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        response = await fetch(query)
+        rows = response.data or []
+        next_cursor = encode_cursor(sort, order, rows[limit - 1]) if len(rows) > limit else None
+
+        return ORJSONResponse(
+            status_code=200,
+            content={
+                "success": True,
+                "data": rows[:limit],
+                "count": response.count,
+                "next_cursor": next_cursor,
+                "sort": sort,
+                "order": order
+            }
+        )
+
+    except HTTPException:
+        raise
     except Exception as e:
+        print(f"❌ Error getting applicants for job {job_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/applications/{application_id}/status")
@@ -364,10 +471,11 @@ async def update_application_status(
 
         # Update application status in Supabase
         print(f"🔄 Updating application {application_id} to status: {status}")
-        update_result = supabase.table('applications').update({
+        previous_status = placement_stats.status_of(application_id)
+        update_result = await asyncio.to_thread(supabase.table('applications').update({
             'status': status,
             'updated_at': datetime.utcnow().isoformat()
-        }).eq('id', application_id).execute()
+        }).eq('id', application_id).execute)
 
         print(f"🔍 Update result: {update_result}")
         print(f"🔍 Update data: {getattr(update_result, 'data', 'No data attribute')}")
@@ -383,9 +491,30 @@ async def update_application_status(
 
         print(f"✅ Application {application_id} updated to status: {status}")
 
+        placement_stats.record_status_change(application_id, status, update_result.data[0])
+
+        application = update_result.data[0]
+        if status == 'selected':
+            # Keep placed_ctc current for "not already placed above X" rules
+            job = job_catalog.get(application.get('job_id'))
+            if job is None:
+                job = await read_job(application.get('job_id')) or {}
+            await asyncio.to_thread(profile_directory.record_placement, application.get('student_id'), job.get('ctc'))
+        audit_log.record(
+            application_id, application.get('job_id'), application.get('student_id'),
+            status, from_status=previous_status, source='status_update'
+        )
+        search_catalog.set_application_status(application_id, status)
+        student_views.bump(application.get('student_id'))
+        event_bus.publish(
+            "application_status_changed",
+            {"application_id": application_id, "job_id": application.get('job_id'), "status": status},
+            student_ids=[application.get('student_id')]
+        )
+
         print(f"✅ Successfully updated application {application_id} to status: {status}")
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "success": True,
@@ -403,71 +532,27 @@ async def get_eligible_jobs(student_id: str):
     try:
         print(f"🔍 Getting eligible jobs for student: {student_id}")
 
-        # Add CORS headers explicitly for this endpoint
-        from fastapi.responses import JSONResponse
+        # Get student profile (local replica when enabled, else Supabase)
+        profile = await read_profile(student_id)
 
-        # Get student profile from Supabase
-        response = supabase.table('profiles').select('*').eq('id', student_id).execute()
-
-        if not response.data or len(response.data) == 0:
+        if profile is None:
             print("❌ Student profile not found")
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=404,
                 content={"success": False, "message": "Student profile not found"}
             )
 
-        student_profile = response.data[0]
+        student_profile = profile_directory.with_derived(profile)
         print(f"👤 Student profile: {student_profile}")
 
-        # Get all active jobs
-        jobs_response = supabase.table('jobs').select('*').eq('status', 'active').execute()
-        all_jobs = jobs_response.data or []
-        print(f"💼 All active jobs: {len(all_jobs)}")
-
-        eligible_jobs = []
-
-        for job in all_jobs:
-            # Check CGPA eligibility
-            student_cgpa = float(student_profile.get('cgpa', 0))
-            job_min_cgpa = float(job.get('min_cgpa', 0))
-
-            if student_cgpa < job_min_cgpa:
-                print(f"❌ CGPA too low for {job['company_name']}: {student_cgpa} < {job_min_cgpa}")
-                continue
-
-            # Check branch eligibility
-            student_branch = student_profile.get('branch', '')
-            eligible_branches = job.get('eligible_branches', [])
-
-            if eligible_branches and len(eligible_branches) > 0:
-                if student_branch not in eligible_branches:
-                    print(f"❌ Branch not eligible for {job['company_name']}: {student_branch} not in {eligible_branches}")
-                    continue
-
-            # Check active backlogs
-            student_backlogs = student_profile.get('active_backlog', False)
-            job_max_backlogs = job.get('max_active_backlogs', 0)
-
-            if student_backlogs and student_backlogs > job_max_backlogs:
-                print(f"❌ Too many backlogs for {job['company_name']}: {student_backlogs} > {job_max_backlogs}")
-                continue
-
-            # Check deadline (jobs should not be expired)
-            job_deadline = job.get('deadline')
-            if job_deadline:
-                from datetime import datetime
-                deadline_date = datetime.fromisoformat(job_deadline.replace('Z', '+00:00'))
-                if deadline_date < datetime.now(deadline_date.tzinfo):
-                    print(f"❌ Job expired for {job['company_name']}: {job_deadline}")
-                    continue
-
-            # If all checks pass, add to eligible jobs
-            eligible_jobs.append(job)
-            print(f"✅ Eligible: {job['company_name']} - {job['role']}")
+        # Open jobs (expired ones are already closed by the deadline scheduler)
+        # with their eligibility criteria parsed once, from the catalog
+        await asyncio.to_thread(job_catalog.ensure_loaded)
+        eligible_jobs = job_catalog.eligible_jobs(student_profile)
 
         print(f"✅ Final eligible jobs: {len(eligible_jobs)}")
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "success": True,
@@ -476,6 +561,8 @@ async def get_eligible_jobs(student_id: str):
             }
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error in get_eligible_jobs: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -506,69 +593,29 @@ async def upload_shortlist(
         # Read file content
         content = await shortlist_file.read()
 
-        # Process file based on type
-        if file_extension == '.csv':
-            # Process CSV
-            content_str = content.decode('utf-8')
-            df = pd.read_csv(io.StringIO(content_str))
-        else:
-            # Process Excel
-            df = pd.read_excel(BytesIO(content))
-
-        if df.empty:
-            raise HTTPException(status_code=400, detail="The uploaded file is empty")
-
-        # Check for required columns (email or usn)
-        has_email = any(col.lower() in ['email', 'e-mail', 'mail'] for col in df.columns)
-        has_usn = any(col.lower() in ['usn', 'roll_no', 'roll_number', 'roll no', 'student_id'] for col in df.columns)
-
-        if not has_email and not has_usn:
-            raise HTTPException(
-                status_code=400,
-                detail="File must contain either 'email' or 'usn' column for student identification"
-            )
-
-        # Extract identifiers
-        identifiers = []
-        for _, row in df.iterrows():
-            identifier = {}
-
-            # Find email column
-            email_col = next((col for col in df.columns if col.lower() in ['email', 'e-mail', 'mail']), None)
-            if email_col and pd.notna(row[email_col]):
-                identifier['email'] = str(row[email_col]).strip().lower()
-
-            # Find USN column
-            usn_col = next((col for col in df.columns if col.lower() in ['usn', 'roll_no', 'roll_number', 'roll no', 'student_id']), None)
-            if usn_col and pd.notna(row[usn_col]):
-                identifier['usn'] = str(row[usn_col]).strip()
-
-            if identifier:
-                identifiers.append(identifier)
+        # Parse and normalize in the process pool so the event loop stays free
+        try:
+            lines, identifiers = await cpu_pool.run(parse_shortlist, content, file_extension)
+        except SpreadsheetError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
         if not identifiers:
             raise HTTPException(status_code=400, detail="No valid identifiers found in the file")
 
-        # Get all profiles that match the identifiers
-        matched_students = []
-
-        for identifier in identifiers:
-            query = supabase.table('profiles').select('id, email, usn, full_name')
-
-            if 'email' in identifier:
-                query = query.eq('email', identifier['email'])
-            elif 'usn' in identifier:
-                query = query.eq('usn', identifier['usn'])
-
-            profile_result = query.execute()
-
-            if profile_result.data and len(profile_result.data) > 0:
-                matched_students.extend(profile_result.data)
-            else:
-                print(f"⚠️ No match found for identifier: {identifier}")
+        # Resolve rows against the in-memory profile index (exact, normalized
+        # and fuzzy matching) instead of querying Supabase once per row
+        index = await asyncio.to_thread(get_profile_index, settings.SHORTLIST_PROFILE_MAX_AGE)
+        report = index.match(identifiers, lines)
+        matched_students = report['students']
+        match_report = {
+            "match_methods": report['match_methods'],
+            "ambiguous": report['ambiguous'],
+            "unmatched": report['unmatched']
+        }
+        print(f"🔎 Shortlist matching: {len(matched_students)} students, {len(report['ambiguous'])} ambiguous, {len(report['unmatched'])} unmatched rows")
 
         if not matched_students:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=200,
                 content={
                     "success": False,
@@ -576,7 +623,8 @@ async def upload_shortlist(
                     "data": {
                         "total_processed": len(identifiers),
                         "matched_students": 0,
-                        "updated_applications": 0
+                        "updated_applications": 0,
+                        **match_report
                     }
                 }
             )
@@ -587,22 +635,30 @@ async def upload_shortlist(
         # Get existing applications for this job and matched students
         student_ids = [student['id'] for student in unique_students]
 
-        existing_applications = supabase.table('applications').select('*').eq('job_id', job_id).in_('student_id', student_ids).execute()
+        existing_applications = await asyncio.to_thread(
+            supabase.table('applications').select('*').eq('job_id', job_id).in_('student_id', student_ids).execute
+        )
 
         # Update application statuses
         updated_count = 0
 
         if existing_applications.data:
             for application in existing_applications.data:
-                update_result = supabase.table('applications').update({
+                update_result = await asyncio.to_thread(supabase.table('applications').update({
                     'status': status,
                     'updated_at': datetime.utcnow().isoformat()
-                }).eq('id', application['id']).execute()
+                }).eq('id', application['id']).execute)
 
-                if update_result.error:
+                if getattr(update_result, 'error', None):
                     print(f"❌ Error updating application {application['id']}: {update_result.error.message}")
                 else:
                     updated_count += 1
+                    placement_stats.record_status_change(application['id'], status, application)
+                    audit_log.record(
+                        application['id'], job_id, application['student_id'],
+                        status, from_status=application.get('status'), source='shortlist_upload'
+                    )
+                    search_catalog.set_application_status(application['id'], status)
 
         # Create applications for students who don't have one yet
         existing_student_ids = {app['student_id'] for app in existing_applications.data or []}
@@ -620,14 +676,38 @@ async def upload_shortlist(
                     "updated_at": datetime.utcnow().isoformat()
                 }
 
-                create_result = supabase.table('applications').insert([application_data]).execute()
+                create_result = await asyncio.to_thread(supabase.table('applications').insert([application_data]).execute)
 
-                if create_result.error:
+                if getattr(create_result, 'error', None):
                     print(f"❌ Error creating application for student {student['id']}: {create_result.error.message}")
                 else:
                     new_applications_count += 1
+                    placement_stats.record_application(application_data, branch=student.get('branch'))
+                    audit_log.record(application_data['id'], job_id, student['id'], status, source='shortlist_upload')
+                    search_catalog.add_application(application_data, profile=student)
+
+        # Each affected student learns their own result; admins get the summary
+        affected_students = [student['id'] for student in unique_students]
+        student_views.bump(*affected_students)
+        event_bus.publish(
+            "shortlist_processed",
+            {"job_id": job_id, "status": status},
+            student_ids=affected_students,
+            admins=False
+        )
+        event_bus.publish(
+            "shortlist_processed",
+            {
+                "job_id": job_id,
+                "status": status,
+                "matched_students": len(unique_students),
+                "updated_applications": updated_count,
+                "created_applications": new_applications_count
+            },
+            student_ids=[]
+        )
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "success": True,
@@ -638,7 +718,8 @@ async def upload_shortlist(
                     "updated_applications": updated_count,
                     "created_applications": new_applications_count,
                     "job_id": job_id,
-                    "status_applied": status
+                    "status_applied": status,
+                    **match_report
                 }
             }
         )
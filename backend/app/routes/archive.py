@@ -0,0 +1,89 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+import asyncio
+
+from app.services.archive import ArchiveBusy, ArchiveUnavailable, application_archive, default_cutoff
+
+router = APIRouter(prefix="/archive", tags=["archive"])
+
+@router.post("/applications/run")
+async def run_archival(
+    cutoff: Optional[date] = Query(None, description="Archive applications submitted before this day (defaults to ARCHIVE_RETENTION_DAYS ago)"),
+    dry_run: bool = Query(False, description="Only report what would be archived")
+):
+    """Move closed jobs' old applications into the Parquet archive"""
+    try:
+        cutoff_day = cutoff.isoformat() if cutoff else default_cutoff()
+        if cutoff_day > date.today().isoformat():
+            raise HTTPException(status_code=400, detail="Cutoff cannot be in the future")
+
+        report = await asyncio.to_thread(application_archive.run, cutoff_day, dry_run)
+
+        return ORJSONResponse(
+            status_code=200,
+            content={
+                "success": True,
+                "data": report
+            }
+        )
+
+    except HTTPException:
+        raise
+    except ArchiveBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ArchiveUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        print(f"❌ Error archiving applications: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/applications")
+async def get_archived_applications(
+    job_id: Optional[str] = Query(None),
+    student_id: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    since: Optional[date] = Query(None, description="First day (UTC) applied, YYYY-MM-DD"),
+    until: Optional[date] = Query(None, description="Last day (UTC) applied, YYYY-MM-DD"),
+    limit: int = Query(500, ge=1, le=5000),
+    offset: int = Query(0, ge=0)
+):
+    """Archived applications for historical reports, newest first"""
+    try:
+        rows = await asyncio.to_thread(
+            application_archive.query,
+            job_id, student_id, status,
+            since.isoformat() if since else None,
+            until.isoformat() if until else None
+        )
+
+        return ORJSONResponse(
+            status_code=200,
+            content={
+                "success": True,
+                "data": rows[offset:offset + limit],
+                "count": len(rows)
+            }
+        )
+
+    except HTTPException:
+        raise
+    except ArchiveUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        print(f"❌ Error reading the application archive: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/summary")
+async def get_archive_summary():
+    """Archived rows and bytes per month"""
+    try:
+        summary = await asyncio.to_thread(application_archive.summary)
+        return {"success": True, "data": summary}
+    except ArchiveUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        print(f"❌ Error summarizing the application archive: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,64 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import asyncio
+import orjson
+
+from app.services.audit_log import audit_log
+
+router = APIRouter(prefix="/audit", tags=["audit"])
+
+def _ndjson(rows):
+    for row in rows:
+        yield orjson.dumps(row) + b"\n"
+
+@router.get("/jobs/{job_id}/funnel")
+async def get_job_funnel(
+    job_id: str,
+    since: Optional[date] = Query(None, description="First day (UTC) to include, YYYY-MM-DD"),
+    until: Optional[date] = Query(None, description="Last day (UTC) to include, YYYY-MM-DD")
+):
+    """How many applications reached each status for a job"""
+    try:
+        funnel = await asyncio.to_thread(audit_log.funnel, job_id, since, until)
+
+        return ORJSONResponse(
+            status_code=200,
+            content={
+                "success": True,
+                "data": {"job_id": job_id, **funnel}
+            }
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error building funnel for job {job_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/jobs/{job_id}/events")
+async def get_job_events(
+    job_id: str,
+    since: Optional[date] = Query(None, description="First day (UTC) to include, YYYY-MM-DD"),
+    until: Optional[date] = Query(None, description="Last day (UTC) to include, YYYY-MM-DD")
+):
+    """Stream a job's status transitions as newline-delimited JSON"""
+    return StreamingResponse(
+        _ndjson(audit_log.events(job_id, since, until)),
+        media_type="application/x-ndjson"
+    )
+
+@router.get("/funnels/stream")
+async def stream_funnels():
+    """Stream the funnel of every job as newline-delimited JSON"""
+    try:
+        await asyncio.to_thread(audit_log.catch_up)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error reading audit log: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return StreamingResponse(_ndjson(audit_log.funnels()), media_type="application/x-ndjson")
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
+import asyncio
+import orjson
+
+from app.services.job_catalog import job_catalog
+from app.services.profiles import profile_directory
+from app.services.replica import read_profile
+from app.services.student_views import student_views
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+@router.get("/student/{student_id}")
+async def get_student_dashboard(student_id: str):
+    """Profile, eligible jobs and applications for the student dashboard in one call"""
+    try:
+        # The three reads are independent, so run them together
+        profile, _, applications_view = await asyncio.gather(
+            read_profile(student_id),
+            asyncio.to_thread(job_catalog.ensure_loaded),
+            student_views.load(student_id)
+        )
+
+        if profile is None:
+            raise HTTPException(status_code=404, detail="Student profile not found")
+
+        applications = orjson.loads(applications_view.payload)['data']
+
+        # Eligibility reuses the profile fetched above
+        applied = {application['job_id']: application.get('status') for application in applications}
+        eligible_jobs = [
+            {**job, "already_applied": job['id'] in applied, "application_status": applied.get(job['id'])}
+            for job in job_catalog.eligible_jobs(profile_directory.with_derived(profile))
+        ]
+
+        return ORJSONResponse(
+            status_code=200,
+            content={
+                "success": True,
+                "data": {
+                    "profile": profile,
+                    "eligible_jobs": eligible_jobs,
+                    "applications": applications,
+                    "counts": {
+                        "eligible_jobs": len(eligible_jobs),
+                        "not_applied": sum(1 for job in eligible_jobs if not job['already_applied']),
+                        "applications": len(applications)
+                    }
+                }
+            }
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error building dashboard for student {student_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
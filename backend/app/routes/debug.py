@@ -0,0 +1,108 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+import asyncio
+import os
+import secrets
+
+from app.config.settings import settings
+from app.services.profiling import memory_tracer, profile_store
+
+
+def require_profiling_token(x_profile_token: Optional[str] = Header(None)):
+    """Admin gate: hidden entirely unless PROFILING_TOKEN is configured"""
+    if not settings.PROFILING_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_profile_token or not secrets.compare_digest(x_profile_token, settings.PROFILING_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+
+router = APIRouter(prefix="/debug", tags=["debug"], dependencies=[Depends(require_profiling_token)])
+
+@router.get("/profiles")
+async def list_profiles():
+    """Recently captured request profiles of every worker, newest first"""
+    profiles = await asyncio.to_thread(profile_store.summaries)
+    return ORJSONResponse(
+        status_code=200,
+        content={
+            "success": True,
+            "data": profiles
+        }
+    )
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """A request's CPU profile as collapsed stacks (feed to flamegraph.pl or speedscope)"""
+    profile = await asyncio.to_thread(profile_store.get, profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found (each worker keeps only its most recent)")
+    return PlainTextResponse(
+        profile["stacks"],
+        headers={
+            "Content-Disposition": f'inline; filename="profile-{profile_id}.folded"',
+            "X-Profile-Pid": str(profile["pid"])
+        }
+    )
+
+# Allocation tracing is per worker process: with several workers each call
+# below reaches whichever worker accepted the connection, so every response
+# names its pid. Run a single worker (WEB_CONCURRENCY=1) while tracing.
+
+@router.post("/memory/start")
+async def start_memory_tracing(
+    frames: int = Query(1, ge=1, le=50, description="Stack frames recorded per allocation")
+):
+    """Start tracing allocations in this worker (slows it until stopped)"""
+    memory_tracer.start(frames)
+    return ORJSONResponse(
+        status_code=200,
+        content={
+            "success": True,
+            "data": {"tracing": memory_tracer.tracing, "pid": os.getpid()}
+        }
+    )
+
+@router.post("/memory/stop")
+async def stop_memory_tracing():
+    """Stop tracing allocations in this worker"""
+    memory_tracer.stop()
+    return ORJSONResponse(
+        status_code=200,
+        content={
+            "success": True,
+            "data": {"tracing": memory_tracer.tracing, "pid": os.getpid()}
+        }
+    )
+
+@router.get("/memory")
+async def memory_snapshot(
+    top: int = Query(25, ge=1, le=500),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    compare: bool = Query(False, description="Report growth since the previous snapshot")
+):
+    """Top allocation sites of this worker"""
+    try:
+        if not memory_tracer.tracing:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Allocation tracing is off in worker {os.getpid()}; POST /api/debug/memory/start first "
+                       "(with several workers, run one while tracing)"
+            )
+
+        snapshot = await asyncio.to_thread(memory_tracer.snapshot, top, group_by, compare)
+
+        return ORJSONResponse(
+            status_code=200,
+            content={
+                "success": True,
+                "data": snapshot
+            }
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error taking allocation snapshot: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to take allocation snapshot: {str(e)}")
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+import asyncio
+
+from app.config.database import get_supabase_client
+from app.config.settings import settings
+from app.services.event_bus import event_bus
+
+supabase = get_supabase_client()
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+@router.get("/stream")
+async def stream_events(request: Request, user_id: str = Query(..., description="Profile ID of the connecting student or admin")):
+    """Server-Sent Events stream of job and application updates for one user"""
+    try:
+        profile_response = await asyncio.to_thread(
+            supabase.table('profiles').select('id, role').eq('id', user_id).execute
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error looking up event subscriber {user_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not profile_response.data:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    is_admin = profile_response.data[0].get('role') == 'admin'
+    subscription = event_bus.subscribe(user_id, is_admin)
+    if subscription is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many realtime connections, fall back to polling",
+            headers={"Retry-After": str(settings.EVENTS_HEARTBEAT_INTERVAL)}
+        )
+
+    async def generate():
+        try:
+            # Tell the browser how long to wait before reconnecting
+            yield b"retry: 5000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.queue.get(), timeout=settings.EVENTS_HEARTBEAT_INTERVAL)
+                    yield message
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield b": keepalive\n\n"
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
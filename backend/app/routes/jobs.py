@@ -1,22 +1,58 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional
 from datetime import datetime
-
-from app.config.database import get_supabase_client
+import asyncio
+import orjson
+import os
+
+from app.config.database import get_supabase_client, fetch_raw
+from app.config.settings import settings
+from app.models.job import JobCreate, validate_jobs
+from app.services.eligibility import RuleSyntaxError, build_job_rule, profile_frames
+from app.services.event_bus import event_bus
+from app.services.job_catalog import job_catalog
+from app.services.offload import cpu_pool
+from app.services.profiles import profile_directory
+from app.services.replica import local_replica, read_job, read_profile, replica_ready
+from app.services.search import search_catalog
+from app.services.spreadsheets import SpreadsheetError, parse_job_sheet
+from app.utils.responses import raw_json_response
 
 supabase = get_supabase_client()
 
 router = APIRouter()
 
+JOB_IMPORT_EXTENSIONS = ['.csv', '.xlsx', '.xls', '.json']
+
+
+async def _publish_jobs(jobs: List[dict]):
+    """Make new jobs visible to listings, eligibility and search, and notify students"""
+    # One catalog rebuild for the whole batch; it also schedules the deadlines.
+    # It waits on the cross-worker catalog lock, so not on the event loop
+    await asyncio.to_thread(job_catalog.add_many, jobs)
+    for job in jobs:
+        search_catalog.add_job(job)
+    if replica_ready():
+        local_replica.upsert('jobs', jobs)
+
+    for job in jobs:
+        # Push to connected students who are eligible (unknown profiles get it too)
+        def is_eligible(student_id, job_id=job['id']):
+            profile = profile_directory.get(student_id)
+            return profile is None or job_catalog.is_eligible(profile, job_id)
+
+        event_bus.publish("job_created", {"job": job}, student_filter=is_eligible)
+
+
 @router.post("/")
-async def create_job(job_data: dict):
+async def create_job(job_data: JobCreate):
     """Create a new job posting"""
     try:
-        print(f"📝 Creating job: {job_data}")
+        print(f"📝 Creating job: {job_data.company_name} - {job_data.role}")
 
-        # Insert job into Supabase
-        response = supabase.table('jobs').insert(job_data).execute()
+        # Insert job into Supabase (branches, CGPA, deadline and rule already normalized)
+        response = await asyncio.to_thread(supabase.table('jobs').insert(job_data.model_dump()).execute)
 
         if not response.data:
             raise HTTPException(status_code=400, detail="Failed to create job")
@@ -24,7 +60,9 @@ async def create_job(job_data: dict):
         job = response.data[0]
         print(f"✅ Job created successfully: {job['company_name']} - {job['role']}")
 
-        return JSONResponse(
+        await _publish_jobs([job])
+
+        return ORJSONResponse(
             status_code=201,
             content={
                 "success": True,
@@ -33,20 +71,122 @@ async def create_job(job_data: dict):
             }
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error creating job: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _insert_jobs(rows: List[dict], chunk_size: int):
+    """Multi-row inserts of ``chunk_size``; returns (inserted jobs, error or None)"""
+    inserted = []
+    for start in range(0, len(rows), chunk_size):
+        try:
+            response = supabase.table('jobs').insert(rows[start:start + chunk_size]).execute()
+        except Exception as e:
+            return inserted, f"Rows {start + 1}-{min(start + chunk_size, len(rows))}: {str(e)}"
+        inserted.extend(response.data or [])
+    return inserted, None
+
+
+@router.post("/jobs/import")
+async def import_jobs(
+    jobs_file: UploadFile = File(...),
+    skip_invalid: bool = Form(False),
+    dry_run: bool = Form(False)
+):
+    """Create many job postings from a CSV/XLSX sheet or a JSON array"""
+    try:
+        file_extension = os.path.splitext(jobs_file.filename or '')[1].lower()
+        if file_extension not in JOB_IMPORT_EXTENSIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid file type. Only {', '.join(JOB_IMPORT_EXTENSIONS)} files are allowed"
+            )
+
+        content = await jobs_file.read()
+
+        if file_extension == '.json':
+            try:
+                rows = orjson.loads(content)
+            except orjson.JSONDecodeError as e:
+                raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
+            if not isinstance(rows, list):
+                raise HTTPException(status_code=400, detail="JSON file must contain an array of jobs")
+            row_numbers = None
+        else:
+            try:
+                row_numbers, rows = await cpu_pool.run(parse_job_sheet, content, file_extension)
+            except SpreadsheetError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        if not rows:
+            raise HTTPException(status_code=400, detail="No jobs found in the file")
+
+        # One batch validation for the whole file
+        jobs, errors = await asyncio.to_thread(validate_jobs, rows, row_numbers)
+        print(f"📥 Job import {jobs_file.filename}: {len(jobs)} valid, {len(rows) - len(jobs)} invalid rows")
+
+        summary = {"total_rows": len(rows), "valid_rows": len(jobs), "errors": errors}
+
+        if errors and not skip_invalid:
+            return ORJSONResponse(
+                status_code=400,
+                content={
+                    "success": False,
+                    "message": "Some rows are invalid; nothing was imported (pass skip_invalid to import the valid rows)",
+                    "data": {**summary, "created": 0}
+                }
+            )
+
+        if dry_run or not jobs:
+            return ORJSONResponse(
+                status_code=200,
+                content={"success": True, "message": "Validation finished", "data": {**summary, "created": 0}}
+            )
+
+        created, insert_error = await asyncio.to_thread(
+            _insert_jobs, [job.model_dump() for job in jobs], settings.JOB_IMPORT_CHUNK_SIZE
+        )
+        # Refresh listings, eligibility and search once for the whole import
+        await _publish_jobs(created)
+        print(f"✅ Imported {len(created)} jobs from {jobs_file.filename}")
+
+        if insert_error:
+            print(f"❌ Job import stopped: {insert_error}")
+            return ORJSONResponse(
+                status_code=500,
+                content={
+                    "success": False,
+                    "message": f"Import stopped after {len(created)} jobs: {insert_error}",
+                    "data": {**summary, "created": len(created), "jobs": created}
+                }
+            )
+
+        return ORJSONResponse(
+            status_code=201,
+            content={
+                "success": True,
+                "message": f"Imported {len(created)} jobs",
+                "data": {**summary, "created": len(created), "jobs": created}
+            }
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error importing jobs: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/")
 async def get_all_jobs():
     """Get all active jobs"""
     try:
-        response = supabase.table('jobs').select('*').eq('status', 'active').execute()
+        # Served from the catalog, which only holds jobs whose deadline is still open
+        await asyncio.to_thread(job_catalog.ensure_loaded)
+        jobs = job_catalog.active_jobs()
 
-        jobs = response.data or []
-        print(f"📋 Retrieved {len(jobs)} active jobs")
-
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "success": True,
@@ -55,6 +195,8 @@ async def get_all_jobs():
             }
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error getting jobs: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -66,10 +208,10 @@ async def test_eligibility(student_id: str):
         print(f"🧪 Testing eligibility for student: {student_id}")
 
         # Get student profile
-        profile_response = supabase.table('profiles').select('*').eq('id', student_id).execute()
+        profile = await read_profile(student_id)
 
-        if not profile_response.data or len(profile_response.data) == 0:
-            return JSONResponse(
+        if profile is None:
+            return ORJSONResponse(
                 status_code=200,
                 content={
                     "success": True,
@@ -81,48 +223,26 @@ async def test_eligibility(student_id: str):
                 }
             )
 
-        student_profile = profile_response.data[0]
+        student_profile = profile_directory.with_derived(profile)
         print(f"👤 Found student profile: {student_profile}")
 
-        # Get all active jobs
-        jobs_response = supabase.table('jobs').select('*').eq('status', 'active').execute()
-        all_jobs = jobs_response.data or []
+        # Open jobs with their eligibility criteria come from the catalog
+        await asyncio.to_thread(job_catalog.ensure_loaded)
+        all_jobs = job_catalog.active_jobs()
         print(f"💼 Found {len(all_jobs)} active jobs")
 
         eligible_jobs = []
 
-        for job in all_jobs:
-            print(f"🔍 Checking job: {job['company_name']} - {job['role']}")
-
-            # Check CGPA
-            student_cgpa = float(student_profile.get('cgpa', 0))
-            job_min_cgpa = float(job.get('min_cgpa', 0))
-
-            if student_cgpa < job_min_cgpa:
-                print(f"❌ CGPA too low: {student_cgpa} < {job_min_cgpa}")
-                continue
-
-            # Check branch
-            student_branch = student_profile.get('branch', '')
-            eligible_branches = job.get('eligible_branches', [])
-
-            if eligible_branches and len(eligible_branches) > 0:
-                if student_branch not in eligible_branches:
-                    print(f"❌ Branch not eligible: {student_branch} not in {eligible_branches}")
-                    continue
-
-            # Check active backlogs
-            student_backlogs = student_profile.get('active_backlog', False)
-            job_max_backlogs = job.get('max_active_backlogs', 0)
-
-            if student_backlogs and student_backlogs > job_max_backlogs:
-                print(f"❌ Too many backlogs: {student_backlogs} > {job_max_backlogs}")
+        for result in job_catalog.explain(student_profile):
+            job = result['job']
+            if result['reason']:
+                print(f"❌ {job['company_name']} - {job['role']}: {result['reason']}")
                 continue
 
             print(f"✅ Eligible: {job['company_name']} - {job['role']}")
             eligible_jobs.append(job)
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "success": True,
@@ -141,23 +261,78 @@ async def test_eligibility(student_id: str):
             }
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error in test endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/jobs/{job_id}/eligible-students")
+async def get_eligible_students(
+    job_id: str,
+    limit: int = Query(500, ge=1, le=5000),
+    offset: int = Query(0, ge=0)
+):
+    """Students who satisfy a job's eligibility rule (from the profile snapshot)"""
+    try:
+        await asyncio.to_thread(job_catalog.ensure_loaded)
+        await asyncio.to_thread(profile_directory.ensure_fresh)
+
+        frame = profile_frames.current()
+        if job_catalog.rule(job_id) is not None:
+            mask = job_catalog.mask(job_id, frame)
+        else:
+            # Closed or inactive jobs are not in the catalog; compile their rule here
+            job = await read_job(job_id)
+            if job is None:
+                raise HTTPException(status_code=404, detail="Job not found")
+            try:
+                mask = build_job_rule(job).mask(frame)
+            except RuleSyntaxError as e:
+                raise HTTPException(status_code=422, detail=f"Job has an invalid eligibility rule: {str(e)}")
+
+        positions = mask.nonzero()[0]
+        students = []
+        for position in positions[offset:offset + limit]:
+            profile = profile_directory.get(frame.ids[position]) or {}
+            students.append({
+                "id": frame.ids[position],
+                "full_name": profile.get('full_name'),
+                "usn": profile.get('usn'),
+                "email": profile.get('email'),
+                "branch": profile.get('branch'),
+                "cgpa": profile.get('cgpa')
+            })
+
+        return ORJSONResponse(
+            status_code=200,
+            content={
+                "success": True,
+                "data": students,
+                "count": int(len(positions)),
+                "total_students": len(frame)
+            }
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error getting eligible students for job {job_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/{job_id}")
 async def get_job(job_id: str):
     """Get a specific job by ID"""
     try:
-        response = supabase.table('jobs').select('*').eq('id', job_id).execute()
+        # Open jobs are cached; closed or inactive ones come from the replica or the database
+        job = job_catalog.get(job_id) or await read_job(job_id)
 
-        if not response.data or len(response.data) == 0:
+        if job is None:
             raise HTTPException(status_code=404, detail="Job not found")
 
-        job = response.data[0]
         print(f"📋 Retrieved job: {job['company_name']} - {job['role']}")
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "success": True,
@@ -175,20 +350,17 @@ async def get_job(job_id: str):
 async def get_all_jobs_admin():
     """Get all jobs for admin (including inactive)"""
     try:
-        response = supabase.table('jobs').select('*').order('created_at', desc=True).execute()
+        if replica_ready():
+            # Stored rows are already JSON, so they are sent without decoding
+            raw_jobs, count = local_replica.jobs_raw()
+        else:
+            raw_jobs, count = await fetch_raw(supabase.table('jobs').select('*').order('created_at', desc=True))
+        print(f"📋 Admin retrieved {count} total jobs")
 
-        jobs = response.data or []
-        print(f"📋 Admin retrieved {len(jobs)} total jobs")
-
-        return JSONResponse(
-            status_code=200,
-            content={
-                "success": True,
-                "data": jobs,
-                "count": len(jobs)
-            }
-        )
+        return raw_json_response(raw_jobs, count=count)
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error getting admin jobs: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
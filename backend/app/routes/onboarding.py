@@ -0,0 +1,82 @@
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import ORJSONResponse
+from typing import Optional
+import asyncio
+import os
+import shutil
+import tempfile
+
+from app.services.onboarding import ALLOWED_EXTENSIONS, onboarding, read_students
+from app.services.spreadsheets import SpreadsheetError
+
+router = APIRouter(prefix="/onboarding", tags=["onboarding"])
+
+
+def _spool(upload: UploadFile, file_extension: str) -> str:
+    """Copy the upload to a temp file the background import can stream from"""
+    handle, path = tempfile.mkstemp(prefix="onboarding-", suffix=file_extension)
+    with os.fdopen(handle, 'wb') as target:
+        upload.file.seek(0)
+        shutil.copyfileobj(upload.file, target, 1024 * 1024)
+    return path
+
+
+def _check_header(path: str, file_extension: str):
+    rows = read_students(path, file_extension)
+    try:
+        next(rows, None)
+    finally:
+        rows.close()
+
+
+@router.post("/students/import", status_code=202)
+async def import_students(
+    students_file: UploadFile = File(...),
+    default_password: Optional[str] = Form(None),
+    reset_passwords: bool = Form(False),
+    invite: bool = Form(False)
+):
+    """Start a bulk student import from the registrar's CSV/XLSX export"""
+    try:
+        file_extension = os.path.splitext(students_file.filename or '')[1].lower()
+        if file_extension not in ALLOWED_EXTENSIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid file type. Only {', '.join(ALLOWED_EXTENSIONS)} files are allowed"
+            )
+
+        path = await asyncio.to_thread(_spool, students_file, file_extension)
+        try:
+            await asyncio.to_thread(_check_header, path, file_extension)
+        except Exception as e:
+            os.remove(path)
+            if isinstance(e, SpreadsheetError):
+                raise HTTPException(status_code=400, detail=str(e))
+            raise HTTPException(status_code=400, detail=f"Could not read {students_file.filename}: {str(e)}")
+
+        job = onboarding.start(path, students_file.filename, file_extension, default_password, reset_passwords, invite)
+        print(f"🎓 Started onboarding import {job.id} from {students_file.filename}")
+
+        return ORJSONResponse(
+            status_code=202,
+            content={
+                "success": True,
+                "message": "Import started",
+                "data": job.to_dict()
+            }
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error starting onboarding import: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to start import: {str(e)}")
+
+
+@router.get("/students/import/{import_id}")
+async def get_import_progress(import_id: str):
+    """Progress and per-row errors of a bulk student import"""
+    job = onboarding.get(import_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return {"success": True, "data": job.to_dict()}
@@ -0,0 +1,82 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from typing import Optional
+import asyncio
+
+from app.services.search import search_catalog
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+@router.get("/jobs")
+async def search_jobs(
+    q: str = Query("", description="Words to match in company, role, location, type or description"),
+    ctc_min: Optional[float] = Query(None, ge=0, description="Minimum CTC in ₹/year, as stored on jobs (10 LPA = 1000000)"),
+    ctc_max: Optional[float] = Query(None, ge=0, description="Maximum CTC in ₹/year"),
+    status: Optional[str] = Query(None, description="Job status, e.g. active or closed"),
+    job_type: Optional[str] = Query(None),
+    location: Optional[str] = Query(None, description="Exact location"),
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0)
+):
+    """Full-text job search with a CTC range facet"""
+    try:
+        await asyncio.to_thread(search_catalog.ensure_jobs)
+        result = search_catalog.jobs.search(
+            query=q,
+            ranges={"ctc": (ctc_min, ctc_max)},
+            filters={"status": status, "job_type": job_type, "location": location},
+            limit=limit,
+            offset=offset,
+            facet_fields=("status", "job_type", "location", "ctc")
+        )
+
+        return ORJSONResponse(
+            status_code=200,
+            content={
+                "success": True,
+                "data": result
+            }
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error searching jobs: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/applicants")
+async def search_applicants(
+    q: str = Query("", description="Words to match in student name, USN, email or branch"),
+    job_id: Optional[str] = Query(None),
+    branch: Optional[str] = Query(None),
+    status: Optional[str] = Query(None, description="Application status"),
+    cgpa_min: Optional[float] = Query(None),
+    cgpa_max: Optional[float] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0)
+):
+    """Search applications by applicant profile with a CGPA range facet"""
+    try:
+        await asyncio.to_thread(search_catalog.ensure_applicants)
+        result = search_catalog.applicants.search(
+            query=q,
+            ranges={"cgpa": (cgpa_min, cgpa_max)},
+            filters={"job_id": job_id, "branch": branch, "status": status},
+            limit=limit,
+            offset=offset,
+            facet_fields=("branch", "status", "cgpa")
+        )
+
+        return ORJSONResponse(
+            status_code=200,
+            content={
+                "success": True,
+                "data": result
+            }
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error searching applicants: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+import asyncio
+
+from app.services.stats import placement_stats
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+@router.get("/placements")
+async def get_placement_stats(refresh: bool = Query(False, description="Reconcile with the database before answering")):
+    """Applications per job, status and branch plus the placement rate"""
+    try:
+        if refresh:
+            await asyncio.to_thread(placement_stats.reconcile)
+
+        return ORJSONResponse(
+            status_code=200,
+            content={
+                "success": True,
+                "data": placement_stats.snapshot()
+            }
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error getting placement stats: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
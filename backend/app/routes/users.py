@@ -1,19 +1,26 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List
+import asyncio
 from app.models.user import UserCreate, UserResponse, UserUpdate
 from app.config.database import get_supabase_client
+from app.config.settings import settings
+from app.services.offload import cpu_pool
+from app.services.passwords import hash_password
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.post("/", response_model=UserResponse)
 async def create_user(user: UserCreate, supabase=Depends(get_supabase_client)):
     try:
+        # bcrypt is slow on purpose; hash off the event loop
+        password_hash = await cpu_pool.run(hash_password, user.password, settings.BCRYPT_ROUNDS)
+
         # Insert user into Supabase
-        result = supabase.table("users").insert({
+        result = await asyncio.to_thread(supabase.table("users").insert({
             "email": user.email,
             "name": user.name,
-            "password": user.password  # In production, hash this password
-        }).execute()
+            "password": password_hash
+        }).execute)
         
         if result.data:
             return result.data[0]
@@ -25,7 +32,7 @@ async def create_user(user: UserCreate, supabase=Depends(get_supabase_client)):
 @router.get("/", response_model=List[UserResponse])
 async def get_users(supabase=Depends(get_supabase_client)):
     try:
-        result = supabase.table("users").select("*").execute()
+        result = await asyncio.to_thread(supabase.table("users").select("*").execute)
         return result.data
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -33,7 +40,7 @@ async def get_users(supabase=Depends(get_supabase_client)):
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(user_id: int, supabase=Depends(get_supabase_client)):
     try:
-        result = supabase.table("users").select("*").eq("id", user_id).execute()
+        result = await asyncio.to_thread(supabase.table("users").select("*").eq("id", user_id).execute)
         if result.data:
             return result.data[0]
         else:
@@ -45,7 +52,7 @@ async def get_user(user_id: int, supabase=Depends(get_supabase_client)):
 async def update_user(user_id: int, user: UserUpdate, supabase=Depends(get_supabase_client)):
     try:
         update_data = {k: v for k, v in user.dict().items() if v is not None}
-        result = supabase.table("users").update(update_data).eq("id", user_id).execute()
+        result = await asyncio.to_thread(supabase.table("users").update(update_data).eq("id", user_id).execute)
         
         if result.data:
             return result.data[0]
@@ -57,7 +64,7 @@ async def update_user(user_id: int, user: UserUpdate, supabase=Depends(get_supab
 @router.delete("/{user_id}")
 async def delete_user(user_id: int, supabase=Depends(get_supabase_client)):
     try:
-        result = supabase.table("users").delete().eq("id", user_id).execute()
+        result = await asyncio.to_thread(supabase.table("users").delete().eq("id", user_id).execute)
         if result.data:
             return {"message": "User deleted successfully"}
         else:
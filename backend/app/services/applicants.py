@@ -0,0 +1,134 @@
+"""
+Server-side applicant table for a job.
+
+Reads the ``job_applicants`` view (applications joined with the profile
+fields the admin table shows, cover letters left out) with filtering,
+sorting and keyset pagination done by PostgREST, so a page of the table is
+one small query however many students applied.
+
+Pages are ordered by the chosen column and then by application id, and the
+opaque cursor carries the last row's ``(value, id)``. The next page is
+"rows after that pair", which stays stable while applications are added or
+change status, unlike offsets. NULLs (students without a CGPA) sort last
+in both directions.
+"""
+import base64
+from typing import List, Optional, Tuple
+
+import orjson
+
+from app.config.database import get_supabase_client
+
+VIEW = 'job_applicants'
+
+APPLICANT_COLUMNS = (
+    'id, job_id, student_id, status, applied_at, updated_at, resume_url, '
+    'full_name, usn, email, branch, cgpa, active_backlog, graduation_year'
+)
+
+APPLICATION_STATUSES = ['applied', 'shortlisted', 'selected', 'rejected']
+
+# Sortable columns and their default direction
+APPLICANT_SORTS = {
+    'applied_at': 'desc',
+    'cgpa': 'desc',
+    'full_name': 'asc',
+    'usn': 'asc',
+    'status': 'asc',
+    'branch': 'asc'
+}
+
+
+class CursorError(ValueError):
+    """A cursor that is malformed or belongs to a different sort"""
+
+
+def _quote(value) -> str:
+    """A value inside a PostgREST logic tree (``or=(...)``)"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    text = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{text}"'
+
+
+def encode_cursor(sort: str, order: str, row: dict) -> str:
+    payload = orjson.dumps([sort, order, row.get(sort), row['id']])
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, sort: str, order: str) -> Tuple[object, str]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, cursor_order, value, last_id = orjson.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise CursorError("Invalid cursor")
+    if (cursor_sort, cursor_order) != (sort, order):
+        raise CursorError("Cursor was issued for a different sort order; start again without a cursor")
+    return value, last_id
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+def applicant_page_query(
+    job_id: str,
+    status: Optional[str] = None,
+    branch: Optional[str] = None,
+    min_cgpa: Optional[float] = None,
+    max_cgpa: Optional[float] = None,
+    search: Optional[str] = None,
+    sort: str = 'applied_at',
+    order: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None
+):
+    """PostgREST query for one page (plus one row to detect the next page)"""
+    if sort not in APPLICANT_SORTS:
+        raise ValueError(f"Sort must be one of: {', '.join(APPLICANT_SORTS)}")
+    order = order or APPLICANT_SORTS[sort]
+    statuses = _split(status)
+    invalid = [item for item in statuses if item not in APPLICATION_STATUSES]
+    if invalid:
+        raise ValueError(f"Status must be one of: {', '.join(APPLICATION_STATUSES)}")
+
+    # The total is only worth counting once, for the first page
+    query = get_supabase_client().table(VIEW).select(APPLICANT_COLUMNS, count='exact' if cursor is None else None)
+    query = query.eq('job_id', job_id)
+    if statuses:
+        query = query.in_('status', statuses)
+    branches = _split(branch)
+    if branches:
+        query = query.in_('branch', branches)
+    if min_cgpa is not None:
+        query = query.gte('cgpa', min_cgpa)
+    if max_cgpa is not None:
+        query = query.lte('cgpa', max_cgpa)
+
+    trees = []
+    if search and search.strip():
+        pattern = _quote(f"*{search.strip()}*")
+        trees.append(f"full_name.ilike.{pattern},usn.ilike.{pattern},email.ilike.{pattern}")
+
+    if cursor is not None:
+        value, last_id = decode_cursor(cursor, sort, order)
+        after = 'gt' if order == 'asc' else 'lt'
+        if value is None:
+            # Already in the NULL tail: only ids further along remain
+            query = query.is_(sort, 'null').filter('id', after, last_id)
+        else:
+            trees.append(
+                f"{sort}.{after}.{_quote(value)},"
+                f"and({sort}.eq.{_quote(value)},id.{after}.{_quote(last_id)}),"
+                f"{sort}.is.null"
+            )
+
+    # Each tree is a list of alternatives; postgrest-py has no or_() in this version
+    if len(trees) == 1:
+        query.params = query.params.add('or', f"({trees[0]})")
+    elif trees:
+        query.params = query.params.add('and', f"({','.join(f'or({tree})' for tree in trees)})")
+
+    return query.order(f"{sort}.{order}.nullslast,id.{order}").limit(limit + 1), order
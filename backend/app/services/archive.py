@@ -0,0 +1,364 @@
+"""
+Season archive of old applications.
+
+Applications of closed jobs that were submitted before a cutoff are copied,
+together with the job and student details reports need, into
+zstd-compressed Parquet files partitioned by the month they were submitted::
+
+    ARCHIVE_DIR/applications/applied_month=2025-08/part-<run id>.parquet
+
+and then deleted from the hot ``applications`` table. Files are written
+under a temporary name and renamed into place, and each one is checked
+against its row count before anything is deleted, so an interrupted run
+never loses rows; ids already in the archive are skipped on the next run.
+
+Reads use ``pyarrow.dataset``, which skips month partitions outside the
+requested range and pushes the other filters down to the Parquet reader.
+pyarrow is an optional dependency imported on first use; without it the
+archive reports itself unavailable.
+
+Runs hold an ``flock`` on ``ARCHIVE_DIR/applications/.run.lock`` so only
+one worker process archives at a time.
+"""
+import os
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from threading import Lock
+from typing import Dict, Iterable, List, Optional
+
+from app.config.database import fetch_all_rows, get_supabase_client
+from app.config.settings import settings
+from app.services.search import search_catalog
+from app.services.stats import placement_stats
+from app.services.student_views import student_views
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+PARTITION = 'applied_month'
+
+# (column, pyarrow type name)
+ARCHIVE_COLUMNS = [
+    ('id', 'string'),
+    ('job_id', 'string'),
+    ('student_id', 'string'),
+    ('status', 'string'),
+    ('applied_at', 'string'),
+    ('updated_at', 'string'),
+    ('cover_letter', 'string'),
+    ('resume_url', 'string'),
+    ('company_name', 'string'),
+    ('role', 'string'),
+    ('location', 'string'),
+    ('ctc', 'float64'),
+    ('deadline', 'string'),
+    ('full_name', 'string'),
+    ('usn', 'string'),
+    ('email', 'string'),
+    ('branch', 'string'),
+    ('cgpa', 'float64'),
+    ('archived_at', 'string')
+]
+
+JOB_CHUNK = 50
+DELETE_CHUNK = 200
+
+
+class ArchiveUnavailable(RuntimeError):
+    """pyarrow is not installed"""
+
+
+class ArchiveBusy(RuntimeError):
+    """Another archival run is in progress"""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise ArchiveUnavailable("Application archive needs pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def _float(value) -> Optional[float]:
+    try:
+        return float(value) if value is not None and value != '' else None
+    except (TypeError, ValueError):
+        return None
+
+
+def archive_row(application: dict, job: dict, profile: Optional[dict], archived_at: str) -> dict:
+    """Flatten an application with the job and student details it is reported with"""
+    profile = profile or {}
+    return {
+        'id': application['id'],
+        'job_id': application.get('job_id'),
+        'student_id': application.get('student_id'),
+        'status': application.get('status') or 'applied',
+        'applied_at': application.get('applied_at'),
+        'updated_at': application.get('updated_at'),
+        'cover_letter': application.get('cover_letter'),
+        'resume_url': application.get('resume_url'),
+        'company_name': job.get('company_name'),
+        'role': job.get('role'),
+        'location': job.get('location'),
+        'ctc': _float(job.get('ctc')),
+        'deadline': job.get('deadline'),
+        'full_name': profile.get('full_name'),
+        'usn': profile.get('usn'),
+        'email': profile.get('email'),
+        'branch': profile.get('branch'),
+        'cgpa': _float(profile.get('cgpa')),
+        'archived_at': archived_at
+    }
+
+
+def as_application(row: dict) -> dict:
+    """An archived row in the shape the live application endpoints return"""
+    return {
+        'id': row['id'],
+        'job_id': row['job_id'],
+        'student_id': row['student_id'],
+        'status': row['status'],
+        'applied_at': row['applied_at'],
+        'updated_at': row['updated_at'],
+        'cover_letter': row['cover_letter'],
+        'resume_url': row['resume_url'],
+        'jobs': {
+            'company_name': row['company_name'],
+            'role': row['role'],
+            'location': row['location'],
+            'ctc': row['ctc'],
+            'deadline': row['deadline']
+        },
+        'profiles': {
+            'id': row['student_id'],
+            'full_name': row['full_name'],
+            'usn': row['usn'],
+            'branch': row['branch'],
+            'cgpa': row['cgpa'],
+            'email': row['email']
+        },
+        'archived': True
+    }
+
+
+def default_cutoff() -> str:
+    """Cutoff date ``ARCHIVE_RETENTION_DAYS`` before today"""
+    return (date.today() - timedelta(days=settings.ARCHIVE_RETENTION_DAYS)).isoformat()
+
+
+class ApplicationArchive:
+    def __init__(self, directory: str, compression_level: int = 9):
+        self.directory = os.path.join(directory, 'applications')
+        self.compression_level = compression_level
+        # Only used where flock is unavailable; then runs are exclusive per process
+        self._run_lock = Lock()
+
+    @contextmanager
+    def _exclusive_run(self):
+        """Hold the cross-process archive lock, or raise ``ArchiveBusy``"""
+        if fcntl is None:
+            if not self._run_lock.acquire(blocking=False):
+                raise ArchiveBusy("An archival run is already in progress")
+            try:
+                yield
+            finally:
+                self._run_lock.release()
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        # A fresh descriptor per run, so concurrent runs in one process also conflict
+        fd = os.open(os.path.join(self.directory, '.run.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise ArchiveBusy("An archival run is already in progress")
+            yield
+        finally:
+            # Closing the descriptor releases the lock
+            os.close(fd)
+
+    def _schema(self):
+        pa = _pyarrow()
+        return pa.schema([(name, getattr(pa, kind)()) for name, kind in ARCHIVE_COLUMNS])
+
+    def _dataset(self):
+        pa = _pyarrow()
+        if not os.path.isdir(self.directory):
+            return None
+        partitioning = pa.dataset.partitioning(pa.schema([(PARTITION, pa.string())]), flavor='hive')
+        return pa.dataset.dataset(self.directory, format='parquet', partitioning=partitioning, schema=self._schema().append(
+            pa.field(PARTITION, pa.string())
+        ))
+
+    def archived_ids(self) -> set:
+        dataset = self._dataset()
+        if dataset is None:
+            return set()
+        return set(dataset.to_table(columns=['id']).column('id').to_pylist())
+
+    def _candidates(self, cutoff: str) -> List[dict]:
+        """Closed jobs' applications submitted before ``cutoff``, flattened"""
+        supabase = get_supabase_client()
+        jobs = fetch_all_rows(
+            lambda: supabase.table('jobs').select('id, company_name, role, location, ctc, deadline').eq('status', 'closed').order('id')
+        )
+        jobs_by_id = {job['id']: job for job in jobs}
+        job_ids = list(jobs_by_id)
+
+        applications = []
+        for start in range(0, len(job_ids), JOB_CHUNK):
+            chunk = job_ids[start:start + JOB_CHUNK]
+            applications.extend(fetch_all_rows(
+                lambda: supabase.table('applications').select('*').in_('job_id', chunk).lt('applied_at', cutoff).order('id')
+            ))
+
+        student_ids = list({application['student_id'] for application in applications})
+        profiles = {}
+        for start in range(0, len(student_ids), DELETE_CHUNK):
+            response = supabase.table('profiles').select('id, full_name, usn, email, branch, cgpa').in_(
+                'id', student_ids[start:start + DELETE_CHUNK]
+            ).execute()
+            profiles.update({profile['id']: profile for profile in response.data or []})
+
+        archived_at = datetime.utcnow().isoformat()
+        return [
+            archive_row(application, jobs_by_id[application['job_id']], profiles.get(application['student_id']), archived_at)
+            for application in applications
+        ]
+
+    def _write_partition(self, month: str, rows: List[dict], run_id: str) -> int:
+        pa = _pyarrow()
+        partition = os.path.join(self.directory, f"{PARTITION}={month}")
+        os.makedirs(partition, exist_ok=True)
+        path = os.path.join(partition, f"part-{run_id}.parquet")
+        # Dot-prefixed, so dataset discovery never picks up a half-written file
+        temporary = os.path.join(partition, f".part-{run_id}.parquet.tmp")
+
+        table = pa.Table.from_pylist(rows, schema=self._schema())
+        pa.parquet.write_table(table, temporary, compression='zstd', compression_level=self.compression_level)
+        if pa.parquet.read_metadata(temporary).num_rows != len(rows):
+            os.remove(temporary)
+            raise IOError(f"Archive file for {month} is incomplete")
+        os.replace(temporary, path)
+        return os.path.getsize(path)
+
+    def run(self, cutoff: str, dry_run: bool = False) -> dict:
+        """Archive and delete closed jobs' applications submitted before ``cutoff``"""
+        _pyarrow()
+        with self._exclusive_run():
+            started = time.monotonic()
+            rows = self._candidates(cutoff)
+            already = self.archived_ids()
+            new_rows = [row for row in rows if row['id'] not in already]
+
+            by_month: Dict[str, List[dict]] = defaultdict(list)
+            for row in new_rows:
+                by_month[(row['applied_at'] or '')[:7] or 'unknown'].append(row)
+
+            report = {
+                "cutoff": cutoff,
+                "dry_run": dry_run,
+                "applications": len(rows),
+                "already_archived": len(rows) - len(new_rows),
+                "partitions": {month: len(items) for month, items in sorted(by_month.items())},
+                "bytes_written": 0,
+                "deleted": 0
+            }
+            if dry_run or not rows:
+                return report
+
+            run_id = datetime.utcnow().strftime('%Y%m%dT%H%M%S') + '-' + uuid.uuid4().hex[:8]
+            for month, items in sorted(by_month.items()):
+                report["bytes_written"] += self._write_partition(month, items, run_id)
+
+            # Only rows that are safely on disk reach this point
+            supabase = get_supabase_client()
+            ids = [row['id'] for row in rows]
+            for start in range(0, len(ids), DELETE_CHUNK):
+                response = supabase.table('applications').delete().in_('id', ids[start:start + DELETE_CHUNK]).execute()
+                # Rows already gone (or hidden by RLS) are not in the response
+                report["deleted"] += len(response.data or [])
+
+            report["seconds"] = round(time.monotonic() - started, 2)
+            print(f"🗄️ Archived {len(new_rows)} applications into {len(by_month)} partitions, deleted {report['deleted']} from the hot table")
+
+            # Drop the moved rows from this process's caches
+            search_catalog.remove_applications(ids)
+            student_views.bump(*{row['student_id'] for row in rows})
+            placement_stats.reconcile()
+            return report
+
+    def query(
+        self,
+        job_id: Optional[str] = None,
+        student_id: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        columns: Optional[Iterable[str]] = None
+    ) -> List[dict]:
+        """Archived rows matching the filters, newest first; ``since``/``until`` are ISO dates"""
+        pa = _pyarrow()
+        dataset = self._dataset()
+        if dataset is None:
+            return []
+
+        field = pa.dataset.field
+        conditions = []
+        if since:
+            conditions += [field(PARTITION) >= since[:7], field('applied_at') >= since]
+        if until:
+            # The whole ``until`` day is included
+            day_after = (date.fromisoformat(until[:10]) + timedelta(days=1)).isoformat()
+            conditions += [field(PARTITION) <= until[:7], field('applied_at') < day_after]
+        if job_id:
+            conditions.append(field('job_id') == job_id)
+        if student_id:
+            conditions.append(field('student_id') == student_id)
+        if status:
+            conditions.append(field('status') == status)
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+
+        selected = list(columns) if columns else [name for name, _ in ARCHIVE_COLUMNS]
+        table = dataset.to_table(columns=selected, filter=expression)
+        if 'applied_at' in selected and table.num_rows:
+            table = table.sort_by([('applied_at', 'descending')])
+        return table.to_pylist()
+
+    def summary(self) -> dict:
+        """Rows and bytes per month partition, from the Parquet footers only"""
+        pa = _pyarrow()
+        partitions = {}
+        if os.path.isdir(self.directory):
+            for name in sorted(os.listdir(self.directory)):
+                if not name.startswith(PARTITION + '='):
+                    continue
+                directory = os.path.join(self.directory, name)
+                files = [os.path.join(directory, file) for file in os.listdir(directory) if file.endswith('.parquet')]
+                partitions[name.split('=', 1)[1]] = {
+                    "files": len(files),
+                    "rows": sum(pa.parquet.read_metadata(path).num_rows for path in files),
+                    "bytes": sum(os.path.getsize(path) for path in files)
+                }
+        return {
+            "directory": self.directory,
+            "partitions": partitions,
+            "rows": sum(partition["rows"] for partition in partitions.values()),
+            "bytes": sum(partition["bytes"] for partition in partitions.values())
+        }
+
+
+application_archive = ApplicationArchive(settings.ARCHIVE_DIR, settings.ARCHIVE_COMPRESSION_LEVEL)
@@ -0,0 +1,235 @@
+"""
+Append-only log of application status transitions.
+
+Every status change (new application, admin update, shortlist upload) is
+recorded as a small event. Events are buffered in memory and flushed in
+batches to day-partitioned segment files::
+
+    AUDIT_LOG_DIR/2026-10-19/events-<pid>.jsonl.gz
+
+Each flush appends one gzip member of newline-delimited JSON to the
+worker's own segment, so segments are never rewritten and workers never
+interleave writes. A gzip file made of several members is still a valid
+gzip file, so segments can be read with any gzip tool.
+
+Per-job funnels (how many applications ever reached each status) are kept
+in memory and caught up by reading only the bytes appended to each segment
+since the last read, which also picks up events flushed by other workers.
+Time-ranged queries read only the day partitions inside the range.
+"""
+import asyncio
+import gzip
+import os
+import zlib
+from collections import defaultdict
+from datetime import date, datetime
+from threading import Lock
+from typing import Dict, Iterator, List, Optional, Set
+
+import orjson
+
+from app.config.settings import settings
+
+FUNNEL_STAGES = ['applied', 'shortlisted', 'selected', 'rejected']
+
+
+def _read_members(data: bytes):
+    """Decode complete gzip members; returns (lines, bytes consumed)"""
+    lines = []
+    consumed = 0
+    while data:
+        decompressor = zlib.decompressobj(wbits=31)
+        try:
+            chunk = decompressor.decompress(data)
+        except zlib.error:
+            break
+        if not decompressor.eof:
+            # Member still being written by another process
+            break
+        lines.extend(chunk.splitlines())
+        used = len(data) - len(decompressor.unused_data)
+        consumed += used
+        data = data[used:]
+    return lines, consumed
+
+
+def build_funnel(reached: Dict[str, Set[str]]) -> dict:
+    """Stage counts and stage-to-stage conversion for one job"""
+    counts = {stage: len(reached.get(stage, ())) for stage in FUNNEL_STAGES}
+    applied = counts['applied'] or sum(counts.values())
+
+    def rate(numerator, denominator):
+        return round(numerator / denominator, 4) if denominator else 0.0
+
+    return {
+        "reached": counts,
+        "conversion": {
+            "applied_to_shortlisted": rate(counts['shortlisted'], applied),
+            "shortlisted_to_selected": rate(counts['selected'], counts['shortlisted']),
+            "applied_to_selected": rate(counts['selected'], applied)
+        }
+    }
+
+
+class AuditLog:
+    def __init__(self, directory: str, batch_size: int = 500):
+        self.directory = directory
+        self.batch_size = batch_size
+        self._buffer: List[dict] = []
+        self._buffer_lock = Lock()
+        self._write_lock = Lock()
+        self._read_lock = Lock()
+        self._flush_needed = asyncio.Event()
+        # segment path -> bytes already applied to the funnels
+        self._offsets: Dict[str, int] = {}
+        # job id -> status -> application ids that reached it
+        self._funnels = defaultdict(lambda: defaultdict(set))
+        self.written = 0
+
+    def record(
+        self,
+        application_id: str,
+        job_id: str,
+        student_id: str,
+        to_status: str,
+        from_status: Optional[str] = None,
+        source: str = "api"
+    ):
+        """Queue a status transition for the next batch"""
+        event = {
+            "ts": datetime.utcnow().isoformat(),
+            "a": application_id,
+            "j": job_id,
+            "s": student_id,
+            "f": from_status,
+            "t": to_status,
+            "src": source
+        }
+        with self._buffer_lock:
+            self._buffer.append(event)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._flush_needed.set()
+
+    def _segment_path(self, day: str) -> str:
+        return os.path.join(self.directory, day, f"events-{os.getpid()}.jsonl.gz")
+
+    def flush(self) -> int:
+        """Append buffered events to today's segment as one gzip member"""
+        with self._buffer_lock:
+            events, self._buffer = self._buffer, []
+        if not events:
+            return 0
+
+        by_day = defaultdict(list)
+        for event in events:
+            by_day[event['ts'][:10]].append(orjson.dumps(event))
+
+        with self._write_lock:
+            for day, lines in by_day.items():
+                path = self._segment_path(day)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                member = gzip.compress(b"\n".join(lines) + b"\n", compresslevel=6)
+                with open(path, 'ab') as segment:
+                    segment.write(member)
+            self.written += len(events)
+        return len(events)
+
+    async def run_flusher(self, interval: float):
+        """Flush every ``interval`` seconds, or sooner when a batch fills up"""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_needed.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_needed.clear()
+            try:
+                count = await asyncio.to_thread(self.flush)
+                if count:
+                    print(f"🧾 Flushed {count} audit events")
+            except Exception as e:
+                print(f"❌ Error flushing audit events: {str(e)}")
+
+    def _partitions(self, since: Optional[date] = None, until: Optional[date] = None) -> List[str]:
+        """Day partition directories inside [since, until], oldest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        days = []
+        for name in sorted(os.listdir(self.directory)):
+            try:
+                day = date.fromisoformat(name)
+            except ValueError:
+                continue
+            if (since and day < since) or (until and day > until):
+                continue
+            days.append(os.path.join(self.directory, name))
+        return days
+
+    def _segments(self, since: Optional[date] = None, until: Optional[date] = None) -> List[str]:
+        return [
+            os.path.join(partition, name)
+            for partition in self._partitions(since, until)
+            for name in sorted(os.listdir(partition))
+            if name.endswith('.jsonl.gz')
+        ]
+
+    def catch_up(self):
+        """Apply bytes appended to any segment since the last call"""
+        with self._read_lock:
+            for path in self._segments():
+                offset = self._offsets.get(path, 0)
+                if os.path.getsize(path) <= offset:
+                    continue
+                with open(path, 'rb') as segment:
+                    segment.seek(offset)
+                    lines, consumed = _read_members(segment.read())
+                for line in lines:
+                    if line:
+                        event = orjson.loads(line)
+                        self._funnels[event['j']][event['t']].add(event['a'])
+                self._offsets[path] = offset + consumed
+
+    def events(
+        self,
+        job_id: Optional[str] = None,
+        since: Optional[date] = None,
+        until: Optional[date] = None
+    ) -> Iterator[dict]:
+        """Stream events from the partitions in range, optionally for one job"""
+        needle = orjson.dumps(job_id) if job_id else None
+        for path in self._segments(since, until):
+            with open(path, 'rb') as segment:
+                lines, _ = _read_members(segment.read())
+            for line in lines:
+                # Cheap byte filter before decoding
+                if not line or (needle and needle not in line):
+                    continue
+                event = orjson.loads(line)
+                if job_id is None or event['j'] == job_id:
+                    yield event
+
+    def funnel(self, job_id: str, since: Optional[date] = None, until: Optional[date] = None) -> dict:
+        """Funnel for one job, from the live aggregate or a time-ranged scan"""
+        if since is None and until is None:
+            self.catch_up()
+            with self._read_lock:
+                reached = {status: set(ids) for status, ids in self._funnels.get(job_id, {}).items()}
+        else:
+            reached = defaultdict(set)
+            for event in self.events(job_id, since, until):
+                reached[event['t']].add(event['a'])
+        return build_funnel(reached)
+
+    def funnels(self) -> Iterator[dict]:
+        """Funnel for every job seen in the log (call ``catch_up`` first)"""
+        with self._read_lock:
+            job_ids = list(self._funnels)
+        for job_id in job_ids:
+            yield {"job_id": job_id, **self.funnel_snapshot(job_id)}
+
+    def funnel_snapshot(self, job_id: str) -> dict:
+        with self._read_lock:
+            return build_funnel(self._funnels.get(job_id, {}))
+
+
+audit_log = AuditLog(settings.AUDIT_LOG_DIR, settings.AUDIT_BATCH_SIZE)
@@ -0,0 +1,449 @@
+"""
+Declarative eligibility rules.
+
+Jobs may carry an ``eligibility_rule`` expression on top of the classic
+``min_cgpa`` / ``eligible_branches`` / ``max_active_backlogs`` columns::
+
+    tenth >= 60 and twelfth >= 60 and graduation_year == 2025
+    and (gender == 'F' or branch in ['ECE', 'EEE'])
+    and not placed_ctc > 1200000
+
+Grammar: comparisons (``== != > >= < <=``) between a profile field and a
+literal, ``field in [...]`` / ``field not in [...]``, combined with
+``and``, ``or``, ``not`` and parentheses. Field names are checked against
+``FIELDS`` when the rule is parsed, so a typo is rejected on job creation.
+
+A parsed rule is compiled once per job into two forms:
+
+* a scalar predicate over a profile dict (for a student who is not in the
+  profile snapshot yet, or whose profile changed since it was taken)
+* a vectorized predicate over a ``ProfileFrame`` (one numpy column per
+  field for every student) that yields a boolean mask
+
+The job catalog caches each job's mask per frame generation, so
+student->jobs is a row lookup per job and job->students is the mask itself;
+no rule is re-evaluated per request.
+"""
+import re
+from threading import Lock
+from typing import Callable, List, NamedTuple, Optional, Tuple, Union
+
+from app.services.profiles import profile_directory
+
+# Profile fields a rule may reference: name -> 'number' or 'text'
+FIELDS = {
+    'cgpa': 'number',
+    'tenth': 'number',
+    'twelfth': 'number',
+    'graduation_year': 'number',
+    'active_backlog': 'number',
+    # Highest CTC among jobs the student has been selected for, in ₹/year like jobs.ctc (0 if none)
+    'placed_ctc': 'number',
+    'branch': 'text',
+    'gender': 'text',
+}
+
+# Missing values count as 0 for these, matching how the classic criteria
+# have always treated them; other missing numbers never satisfy a comparison
+ZERO_DEFAULT_FIELDS = ('cgpa', 'active_backlog', 'placed_ctc')
+
+Literal = Union[float, str, bool]
+
+
+class RuleSyntaxError(ValueError):
+    pass
+
+
+class Compare(NamedTuple):
+    field: str
+    op: str
+    value: Literal
+
+
+class Membership(NamedTuple):
+    field: str
+    values: Tuple[Literal, ...]
+    negate: bool
+
+
+class Not(NamedTuple):
+    item: object
+
+
+class All(NamedTuple):
+    items: Tuple[object, ...]
+
+
+class AnyOf(NamedTuple):
+    items: Tuple[object, ...]
+
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+      | (?P<string>'[^']*'|"[^"]*")
+      | (?P<op>==|!=|>=|<=|>|<|\(|\)|\[|\]|,)
+      | (?P<word>[A-Za-z_][A-Za-z0-9_]*)
+    )""", re.VERBOSE)
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    tokens = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if not match or match.end() == position:
+            raise RuleSyntaxError(f"Unexpected character at position {position}: {text[position:position + 10]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'word' and value.lower() in ('and', 'or', 'not', 'in', 'true', 'false'):
+            kind, value = 'keyword', value.lower()
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.position = 0
+
+    def peek(self, offset: int = 0) -> Tuple[Optional[str], Optional[str]]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def take(self, kind: str = None, value: str = None) -> str:
+        token_kind, token_value = self.peek()
+        if token_kind is None or (kind and token_kind != kind) or (value and token_value != value):
+            expected = value or kind or 'more input'
+            found = token_value if token_kind else 'end of rule'
+            raise RuleSyntaxError(f"Expected {expected}, found {found!r}")
+        self.position += 1
+        return token_value
+
+    def parse(self):
+        if not self.tokens:
+            raise RuleSyntaxError("Rule is empty")
+        node = self.parse_or()
+        if self.position != len(self.tokens):
+            raise RuleSyntaxError(f"Unexpected {self.peek()[1]!r}")
+        return node
+
+    def parse_or(self):
+        items = [self.parse_and()]
+        while self.peek() == ('keyword', 'or'):
+            self.take()
+            items.append(self.parse_and())
+        return items[0] if len(items) == 1 else AnyOf(tuple(items))
+
+    def parse_and(self):
+        items = [self.parse_not()]
+        while self.peek() == ('keyword', 'and'):
+            self.take()
+            items.append(self.parse_not())
+        return items[0] if len(items) == 1 else All(tuple(items))
+
+    def parse_not(self):
+        if self.peek() == ('keyword', 'not'):
+            self.take()
+            return Not(self.parse_not())
+        if self.peek() == ('op', '('):
+            self.take()
+            node = self.parse_or()
+            self.take('op', ')')
+            return node
+        return self.parse_condition()
+
+    def literal(self, field: str) -> Literal:
+        kind, value = self.peek()
+        if kind == 'number':
+            literal = float(self.take())
+        elif kind == 'string':
+            literal = self.take()[1:-1]
+        elif kind == 'keyword' and value in ('true', 'false'):
+            literal = self.take() == 'true'
+        else:
+            raise RuleSyntaxError(f"Expected a value for {field}, found {value!r}")
+
+        expected = FIELDS[field]
+        if expected == 'number' and isinstance(literal, str):
+            raise RuleSyntaxError(f"{field} is numeric, got {literal!r}")
+        if expected == 'text' and not isinstance(literal, str):
+            raise RuleSyntaxError(f"{field} is text; quote the value")
+        if isinstance(literal, bool):
+            literal = float(literal)
+        return literal
+
+    def parse_condition(self):
+        field = self.take('word')
+        if field not in FIELDS:
+            raise RuleSyntaxError(f"Unknown field {field!r}. Allowed: {', '.join(sorted(FIELDS))}")
+
+        negate = False
+        if self.peek() == ('keyword', 'not') and self.peek(1) == ('keyword', 'in'):
+            self.take()
+            negate = True
+        if self.peek() == ('keyword', 'in'):
+            self.take()
+            self.take('op', '[')
+            values = [self.literal(field)]
+            while self.peek() == ('op', ','):
+                self.take()
+                values.append(self.literal(field))
+            self.take('op', ']')
+            return Membership(field, tuple(values), negate)
+
+        op = self.take('op')
+        if op not in ('==', '!=', '>', '>=', '<', '<='):
+            raise RuleSyntaxError(f"Expected a comparison after {field}, found {op!r}")
+        if FIELDS[field] == 'text' and op not in ('==', '!='):
+            raise RuleSyntaxError(f"{field} only supports ==, != and in")
+        return Compare(field, op, self.literal(field))
+
+
+def parse_rule(text: str):
+    return _Parser(text).parse()
+
+
+def _describe_literal(value: Literal) -> str:
+    """A literal as rule text that parses back to the same value"""
+    if isinstance(value, str):
+        return repr(value)
+    if float(value).is_integer():
+        # 1200000.0 -> 1200000, never 1.2e+06
+        return str(int(value))
+    return repr(float(value))
+
+
+def describe(node) -> str:
+    """Canonical source text for a node"""
+    if isinstance(node, Compare):
+        return f"{node.field} {node.op} {_describe_literal(node.value)}"
+    if isinstance(node, Membership):
+        values = ', '.join(_describe_literal(value) for value in node.values)
+        return f"{node.field} {'not in' if node.negate else 'in'} [{values}]"
+    if isinstance(node, Not):
+        return f"not {describe(node.item)}" if isinstance(node.item, (Compare, Membership)) else f"not ({describe(node.item)})"
+    joiner = ' and ' if isinstance(node, All) else ' or '
+    return joiner.join(
+        f"({describe(item)})" if isinstance(item, (All, AnyOf)) else describe(item)
+        for item in node.items
+    )
+
+
+def _scalar_value(profile: dict, field: str):
+    value = profile.get(field)
+    if value is None or value == '':
+        return 0.0 if field in ZERO_DEFAULT_FIELDS else None
+    if FIELDS[field] == 'number':
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    return str(value)
+
+
+_SCALAR_OPS = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+}
+
+
+def compile_scalar(node) -> Callable[[dict], bool]:
+    """Compile a node into a closure over a profile dict"""
+    if isinstance(node, Compare):
+        field, compare, value = node.field, _SCALAR_OPS[node.op], node.value
+
+        def check(profile):
+            actual = _scalar_value(profile, field)
+            return actual is not None and compare(actual, value)
+        return check
+
+    if isinstance(node, Membership):
+        field, values, negate = node.field, frozenset(node.values), node.negate
+
+        def check(profile):
+            actual = _scalar_value(profile, field)
+            return actual is not None and ((actual in values) != negate)
+        return check
+
+    if isinstance(node, Not):
+        inner = compile_scalar(node.item)
+        return lambda profile: not inner(profile)
+
+    items = tuple(compile_scalar(item) for item in node.items)
+    if isinstance(node, All):
+        return lambda profile: all(check(profile) for check in items)
+    return lambda profile: any(check(profile) for check in items)
+
+
+class ProfileFrame:
+    """Column-oriented copy of the profile snapshot (numpy imported on first use)"""
+
+    def __init__(self, rows: List[dict], generation: int):
+        import numpy as np
+
+        self.generation = generation
+        self.ids = [row['id'] for row in rows]
+        self.positions = {student_id: position for position, student_id in enumerate(self.ids)}
+        self.versions = [(row.get('updated_at'), row.get('placed_ctc')) for row in rows]
+        self.columns = {}
+        for field, kind in FIELDS.items():
+            values = [_scalar_value(row, field) for row in rows]
+            if kind == 'number':
+                self.columns[field] = np.array([np.nan if value is None else value for value in values], dtype=float)
+            else:
+                self.columns[field] = np.array(values, dtype=object)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def position(self, profile: dict) -> Optional[int]:
+        """Row of ``profile`` if the frame's copy is still current, else None"""
+        position = self.positions.get(profile.get('id'))
+        if position is None:
+            return None
+        if self.versions[position] != (profile.get('updated_at'), profile.get('placed_ctc')):
+            return None
+        return position
+
+
+def evaluate_frame(node, frame: ProfileFrame):
+    """Boolean mask of the students in ``frame`` that satisfy ``node``"""
+    import numpy as np
+
+    if isinstance(node, Compare):
+        column = frame.columns[node.field]
+        if FIELDS[node.field] == 'number':
+            with np.errstate(invalid='ignore'):
+                mask = {
+                    '==': np.equal, '!=': np.not_equal, '>': np.greater,
+                    '>=': np.greater_equal, '<': np.less, '<=': np.less_equal
+                }[node.op](column, node.value)
+            return mask & ~np.isnan(column)
+        present = column != None  # noqa: E711 (elementwise on an object array)
+        mask = column == node.value
+        return (mask if node.op == '==' else ~mask) & present
+
+    if isinstance(node, Membership):
+        column = frame.columns[node.field]
+        mask = np.isin(column, list(node.values))
+        if FIELDS[node.field] == 'number':
+            present = ~np.isnan(column)
+        else:
+            present = column != None  # noqa: E711
+        return (~mask if node.negate else mask) & present
+
+    if isinstance(node, Not):
+        return ~evaluate_frame(node.item, frame)
+
+    masks = [evaluate_frame(item, frame) for item in node.items]
+    return np.logical_and.reduce(masks) if isinstance(node, All) else np.logical_or.reduce(masks)
+
+
+class Clause(NamedTuple):
+    node: object
+    check: Callable[[dict], bool]
+    reason: Callable[[dict], str]
+
+
+class EligibilityRule:
+    """A job's full eligibility (classic criteria plus its rule), compiled once"""
+
+    def __init__(self, clauses: List[Clause], source: Optional[str] = None):
+        self.clauses = clauses
+        self.source = source
+        self.node = All(tuple(clause.node for clause in clauses)) if clauses else None
+
+    def matches(self, profile: dict) -> bool:
+        return all(clause.check(profile) for clause in self.clauses)
+
+    def failure(self, profile: dict) -> Optional[str]:
+        """Why ``profile`` does not qualify, or None"""
+        for clause in self.clauses:
+            if not clause.check(profile):
+                return clause.reason(profile)
+        return None
+
+    def mask(self, frame: ProfileFrame):
+        import numpy as np
+
+        if self.node is None:
+            return np.ones(len(frame), dtype=bool)
+        return evaluate_frame(self.node, frame)
+
+
+def _clause(node, reason: Callable[[dict], str] = None) -> Clause:
+    text = describe(node)
+    return Clause(node, compile_scalar(node), reason or (lambda profile: f"Rule not met: {text}"))
+
+
+def build_job_rule(job: dict) -> EligibilityRule:
+    """Compile a job's classic criteria and its ``eligibility_rule`` into one rule"""
+    clauses = []
+
+    min_cgpa = float(job.get('min_cgpa') or 0)
+    if min_cgpa:
+        clauses.append(_clause(
+            Compare('cgpa', '>=', min_cgpa),
+            lambda profile: f"CGPA too low: {float(profile.get('cgpa') or 0)} < {min_cgpa}"
+        ))
+
+    branches = job.get('eligible_branches') or []
+    if branches:
+        branch_set = sorted(set(branches))
+        clauses.append(_clause(
+            Membership('branch', tuple(branch_set), False),
+            lambda profile: f"Branch not eligible: {profile.get('branch', '')} not in {branch_set}"
+        ))
+
+    max_backlogs = int(job.get('max_active_backlogs') or 0)
+    clauses.append(_clause(
+        Compare('active_backlog', '<=', float(max_backlogs)),
+        lambda profile: f"Too many backlogs: {int(profile.get('active_backlog') or 0)} > {max_backlogs}"
+    ))
+
+    source = job.get('eligibility_rule')
+    if source:
+        node = parse_rule(source)
+        # Top-level conjuncts are reported individually
+        for item in (node.items if isinstance(node, All) else (node,)):
+            clauses.append(_clause(item))
+
+    return EligibilityRule(clauses, source)
+
+
+def normalize_rule(source: Optional[str]) -> Optional[str]:
+    """Validate a rule and return its canonical text (None for an empty rule)"""
+    if source is None or not str(source).strip():
+        return None
+    return describe(parse_rule(str(source)))
+
+
+class ProfileFrames:
+    """Builds a ``ProfileFrame`` from the profile snapshot once per generation"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._frame: Optional[ProfileFrame] = None
+
+    def current(self) -> Optional[ProfileFrame]:
+        """Frame for the loaded snapshot, or None if no snapshot is loaded"""
+        generation = profile_directory.generation
+        if generation == 0:
+            return None
+        frame = self._frame
+        if frame is None or frame.generation != generation:
+            with self._lock:
+                if self._frame is None or self._frame.generation != generation:
+                    self._frame = ProfileFrame(profile_directory.rows(), generation)
+                frame = self._frame
+        return frame
+
+
+profile_frames = ProfileFrames()
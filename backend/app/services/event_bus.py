@@ -0,0 +1,101 @@
+"""
+In-process publish/subscribe for realtime updates.
+
+Write paths publish ``job_created``, ``application_status_changed`` and
+``shortlist_processed`` events; each Server-Sent Events connection owns a
+bounded queue that receives only the events meant for it (admins see
+everything, students see their own applications and the jobs they are
+eligible for). A slow client never blocks publishers: when its queue is
+full the oldest event is dropped.
+
+Events reach the connections held by the worker process that handled the
+write, so with several workers a client still refreshes on reconnect.
+"""
+import asyncio
+import itertools
+from datetime import datetime
+from typing import Callable, Iterable, Optional, Set
+
+import orjson
+
+from app.config.settings import settings
+
+
+class Subscription:
+    def __init__(self, user_id: str, is_admin: bool, maxsize: int):
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, message: bytes):
+        if self.queue.full():
+            # Drop the oldest event rather than block the publisher
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+
+class EventBus:
+    def __init__(self, queue_size: int, max_subscribers: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: Set[Subscription] = set()
+        self._ids = itertools.count(1)
+        self.published = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, user_id: str, is_admin: bool) -> Optional[Subscription]:
+        """Register a connection, or return None when at capacity"""
+        if len(self._subscribers) >= self.max_subscribers:
+            return None
+        subscription = Subscription(user_id, is_admin, self.queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    def publish(
+        self,
+        event_type: str,
+        data: dict,
+        student_ids: Optional[Iterable[str]] = None,
+        student_filter: Optional[Callable[[str], bool]] = None,
+        admins: bool = True,
+    ):
+        """Fan an event out to matching subscribers (must run on the event loop)
+
+        Students receive it when their id is in ``student_ids`` or, if no ids
+        are given, when ``student_filter`` accepts them (everyone by default).
+        Admins receive it when ``admins`` is true.
+        """
+        if not self._subscribers:
+            return
+
+        event_id = next(self._ids)
+        message = (
+            f"id: {event_id}\nevent: {event_type}\ndata: ".encode()
+            + orjson.dumps({**data, "timestamp": datetime.utcnow().isoformat()})
+            + b"\n\n"
+        )
+        targets = set(student_ids) if student_ids is not None else None
+
+        for subscription in list(self._subscribers):
+            if subscription.is_admin:
+                wanted = admins
+            elif targets is not None:
+                wanted = subscription.user_id in targets
+            else:
+                wanted = student_filter is None or student_filter(subscription.user_id)
+
+            if wanted:
+                subscription.offer(message)
+
+        self.published += 1
+
+
+event_bus = EventBus(queue_size=settings.EVENTS_QUEUE_SIZE, max_subscribers=settings.EVENTS_MAX_CONNECTIONS)
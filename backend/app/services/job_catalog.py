@@ -0,0 +1,300 @@
+"""
+Cached catalog of open jobs.
+
+Holds every active job whose deadline has not passed, with the deadline and
+the eligibility rule (classic criteria plus ``eligibility_rule``) compiled
+once when a job enters the catalog. Requests read jobs and eligibility from
+here instead of querying and re-parsing on every call; the deadline
+scheduler removes jobs at the moment they expire.
+
+Each job's eligibility mask over the profile snapshot is cached per
+snapshot generation, so answering "which jobs can this student apply to"
+and "which students can apply to this job" needs no rule evaluation.
+
+With ``SHARED_CACHE_ENABLED`` the jobs are also kept in a shared snapshot
+(see ``app.utils.shared_snapshot``): every change made by one worker is
+published as a new generation, the other workers adopt it on their next
+read, and a worker whose peers loaded the catalog recently starts from
+their copy instead of querying Supabase. The shared lock is only held to
+compare generations and publish, never across a query.
+"""
+import time
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+import orjson
+
+from app.config.database import fetch_all_rows, get_supabase_client
+from app.config.settings import settings
+from app.services.eligibility import EligibilityRule, RuleSyntaxError, build_job_rule, profile_frames
+from app.services.replica import local_replica, replica_ready
+from app.utils.shared_snapshot import SharedSnapshot, open_snapshot
+
+# Reloads that keep racing other workers' changes adopt the peers' snapshot
+REFRESH_ATTEMPTS = 3
+
+
+def parse_deadline(deadline: Optional[str]) -> Optional[float]:
+    """ISO deadline -> POSIX timestamp (naive values are treated as UTC)"""
+    if not deadline:
+        return None
+    parsed = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class JobCatalog:
+    def __init__(self, shared: Optional[SharedSnapshot] = None, max_age: float = 300):
+        self._shared = shared
+        self._shared_generation = 0
+        # A shared snapshot older than this is reloaded from Supabase instead of adopted
+        self.max_age = max_age
+        self._lock = Lock()
+        self._jobs: Dict[str, dict] = {}
+        self._deadlines: Dict[str, Optional[float]] = {}
+        self._rules: Dict[str, EligibilityRule] = {}
+        # job id -> (profile frame generation, eligibility mask)
+        self._masks: Dict[str, Tuple[int, object]] = {}
+        self._active: List[dict] = []
+        self._listeners: List[Callable[[str, Optional[float]], None]] = []
+        self.loaded_at = 0.0
+        self.generation = 0
+
+    def on_job_added(self, callback: Callable[[str, Optional[float]], None]):
+        """Register ``callback(job_id, deadline_ts)`` for every job entering the catalog"""
+        self._listeners.append(callback)
+
+    def _publish(self):
+        # Rebuild the ordered list once per change; readers get an immutable
+        # snapshot. Jobs already past their deadline wait here only until the
+        # scheduler closes them, so they are never listed.
+        now = time.time()
+        open_jobs = [
+            job for job in self._jobs.values()
+            if self._deadlines[job['id']] is None or self._deadlines[job['id']] > now
+        ]
+        self._active = sorted(open_jobs, key=lambda job: job.get('created_at') or '', reverse=True)
+        self.generation += 1
+
+    def _insert(self, job: dict) -> Optional[float]:
+        deadline = parse_deadline(job.get('deadline'))
+        self._jobs[job['id']] = job
+        self._deadlines[job['id']] = deadline
+        self._masks.pop(job['id'], None)
+        try:
+            self._rules[job['id']] = build_job_rule(job)
+        except RuleSyntaxError as e:
+            # Stored rules are validated on create; a broken one matches nobody
+            self._rules.pop(job['id'], None)
+            print(f"❌ Invalid eligibility rule on job {job['id']}: {str(e)}")
+        return deadline
+
+    def _notify(self, scheduled: List[Tuple[str, Optional[float]]]):
+        for job_id, deadline in scheduled:
+            for callback in self._listeners:
+                callback(job_id, deadline)
+
+    def shared_metrics(self) -> Optional[dict]:
+        return self._shared.metrics() if self._shared is not None else None
+
+    def _shared_lock(self):
+        return self._shared.lock() if self._shared is not None else nullcontext()
+
+    def _share(self):
+        """Publish the current jobs as a new shared generation"""
+        if self._shared is None:
+            return
+        with self._lock:
+            payload = orjson.dumps({"published_at": time.time(), "jobs": list(self._jobs.values())})
+        try:
+            self._shared_generation = self._shared.publish(payload)
+        except OSError as e:
+            print(f"⚠️ Could not publish the shared job catalog: {str(e)}")
+
+    def _adopt(self, generation: int, snapshot: dict, notify_all: bool = False):
+        """Replace the catalog with a snapshot published by another worker"""
+        with self._lock:
+            jobs, deadlines, rules, masks = self._jobs, self._deadlines, self._rules, self._masks
+            self._jobs, self._deadlines, self._rules, self._masks = {}, {}, {}, {}
+            scheduled = []
+            for job in snapshot['jobs']:
+                job_id = job['id']
+                if jobs.get(job_id) == job and job_id in rules:
+                    # Unchanged: keep the compiled rule and cached mask
+                    self._jobs[job_id] = job
+                    self._deadlines[job_id] = deadlines[job_id]
+                    self._rules[job_id] = rules[job_id]
+                    if job_id in masks:
+                        self._masks[job_id] = masks[job_id]
+                    if notify_all:
+                        scheduled.append((job_id, deadlines[job_id]))
+                else:
+                    scheduled.append((job_id, self._insert(job)))
+            self._publish()
+            self._shared_generation = generation
+            self.loaded_at = time.monotonic() - max(0.0, time.time() - snapshot['published_at'])
+        self._notify(scheduled)
+
+    def _sync(self):
+        """Adopt a newer shared generation if another worker published one"""
+        if self._shared is None or self._shared.generation == self._shared_generation:
+            return
+        try:
+            generation, snapshot = self._shared.read(orjson.loads)
+        except (OSError, ValueError, RuntimeError) as e:
+            print(f"⚠️ Could not read the shared job catalog: {str(e)}")
+            return
+        if snapshot is not None:
+            self._adopt(generation, snapshot)
+
+    def _fetch(self) -> List[dict]:
+        if replica_ready():
+            # Pull only what changed since the last sync, then read locally
+            local_replica.sync()
+            return local_replica.jobs('active')
+        supabase = get_supabase_client()
+        return fetch_all_rows(lambda: supabase.table('jobs').select('*').eq('status', 'active').order('id'))
+
+    def refresh(self):
+        """Reload active jobs from Supabase.
+
+        The query runs without the shared lock. If another worker published a
+        change meanwhile, our read may predate it, so the query is retried;
+        after ``REFRESH_ATTEMPTS`` the peers' snapshot is adopted instead.
+        """
+        for _ in range(REFRESH_ATTEMPTS):
+            started = self._shared.generation if self._shared is not None else 0
+            jobs = self._fetch()
+            with self._shared_lock():
+                if self._shared is not None and self._shared.generation != started:
+                    continue
+                with self._lock:
+                    self._jobs, self._deadlines, self._rules, self._masks = {}, {}, {}, {}
+                    scheduled = [(job['id'], self._insert(job)) for job in jobs]
+                    self._publish()
+                    self.loaded_at = time.monotonic()
+                self._share()
+            break
+        else:
+            generation, snapshot = self._shared.read(orjson.loads)
+            self._adopt(generation, snapshot, notify_all=True)
+            print(f"💼 Adopted {len(snapshot['jobs'])} active jobs from the shared catalog (generation {generation})")
+            return
+
+        self._notify(scheduled)
+
+        print(f"💼 Loaded {len(jobs)} active jobs into the catalog (generation {self.generation})")
+
+    def reload(self):
+        """Refresh, or adopt the shared snapshot if another worker loaded it within ``max_age``"""
+        if self._shared is not None:
+            generation, snapshot = self._shared.read(orjson.loads)
+            if snapshot is not None and time.time() - snapshot['published_at'] < self.max_age:
+                self._adopt(generation, snapshot, notify_all=True)
+                print(f"💼 Adopted {len(snapshot['jobs'])} active jobs from the shared catalog (generation {generation})")
+                return
+        self.refresh()
+
+    def ensure_loaded(self):
+        """Load the catalog if the scheduler has not done so yet"""
+        if self.generation == 0:
+            self.reload()
+        else:
+            self._sync()
+
+    def add(self, job: dict):
+        """Add a newly created job (ignored unless it is active)"""
+        self.add_many([job])
+
+    def add_many(self, jobs: List[dict]):
+        """Add several new jobs with a single listing rebuild (blocks on the
+        shared lock; call it off the event loop)"""
+        jobs = [job for job in jobs if job.get('status', 'active') == 'active']
+        if not jobs:
+            return
+        with self._shared_lock():
+            self._sync()
+            with self._lock:
+                scheduled = [(job['id'], self._insert(job)) for job in jobs]
+                self._publish()
+            self._share()
+        self._notify(scheduled)
+
+    def remove(self, job_id: str):
+        """Drop a job (blocks on the shared lock; call it off the event loop)"""
+        with self._shared_lock():
+            self._sync()
+            with self._lock:
+                if self._jobs.pop(job_id, None) is None:
+                    return
+                self._deadlines.pop(job_id, None)
+                self._rules.pop(job_id, None)
+                self._masks.pop(job_id, None)
+                self._publish()
+            self._share()
+
+    def active_jobs(self) -> List[dict]:
+        """Open jobs, newest first"""
+        self._sync()
+        return self._active
+
+    def get(self, job_id: str) -> Optional[dict]:
+        self._sync()
+        return self._jobs.get(job_id)
+
+    def deadline(self, job_id: str) -> Optional[float]:
+        return self._deadlines.get(job_id)
+
+    def rule(self, job_id: str) -> Optional[EligibilityRule]:
+        self._sync()
+        return self._rules.get(job_id)
+
+    def mask(self, job_id: str, frame):
+        """Cached eligibility mask of a job over ``frame``"""
+        cached = self._masks.get(job_id)
+        if cached is not None and cached[0] == frame.generation:
+            return cached[1]
+        mask = self._rules[job_id].mask(frame)
+        self._masks[job_id] = (frame.generation, mask)
+        return mask
+
+    def eligible_jobs(self, profile: dict) -> List[dict]:
+        """Open jobs ``profile`` is eligible for (profile with derived fields)"""
+        self._sync()
+        rules = self._rules
+        frame = profile_frames.current()
+        position = frame.position(profile) if frame is not None else None
+        if position is None:
+            # Not in the snapshot or changed since: evaluate the compiled rules
+            return [job for job in self._active if job['id'] in rules and rules[job['id']].matches(profile)]
+        return [job for job in self._active if job['id'] in rules and self.mask(job['id'], frame)[position]]
+
+    def is_eligible(self, profile: dict, job_id: str) -> bool:
+        self._sync()
+        rule = self._rules.get(job_id)
+        if rule is None:
+            return False
+        frame = profile_frames.current()
+        position = frame.position(profile) if frame is not None else None
+        if position is None:
+            return rule.matches(profile)
+        return bool(self.mask(job_id, frame)[position])
+
+    def explain(self, profile: dict) -> List[dict]:
+        """Per-job eligibility with the reason for each rejection"""
+        self._sync()
+        rules = self._rules
+        return [
+            {"job": job, "reason": rules[job['id']].failure(profile)}
+            for job in self._active
+            if job['id'] in rules
+        ]
+
+
+job_catalog = JobCatalog(
+    open_snapshot(settings.SHARED_CACHE_DIR, 'jobs', enabled=settings.SHARED_CACHE_ENABLED),
+    max_age=settings.JOB_CATALOG_REFRESH_INTERVAL
+)
@@ -0,0 +1,210 @@
+"""
+Shortlist identifier matching.
+
+Company sheets rarely use our exact identifiers: USNs come in mixed case or
+with spaces, students give personal instead of institutional email, and some
+sheets only carry names. ``ProfileIndex`` normalizes every profile once
+(canonical USN, email and email local part, name trigrams) so each sheet row
+resolves with a few dictionary lookups. Rows that cannot be resolved
+confidently are reported as ambiguous (with ranked candidates) or unmatched
+instead of being dropped.
+"""
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.services.profiles import profile_directory
+
+# Name similarity (trigram Dice coefficient) needed to accept a match outright,
+# to list a profile as a candidate, and the lead the best candidate needs
+NAME_MATCH_SCORE = 0.85
+NAME_CANDIDATE_SCORE = 0.5
+NAME_MATCH_MARGIN = 0.1
+MAX_CANDIDATES = 5
+
+# Providers that ignore dots in the local part
+DOTLESS_EMAIL_DOMAINS = {'gmail.com', 'googlemail.com'}
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def canonical_usn(usn: Optional[str]) -> Optional[str]:
+    """``' 1rv21cs001 '`` -> ``'1RV21CS001'``"""
+    if not usn:
+        return None
+    return _NON_ALNUM.sub('', usn.lower()).upper() or None
+
+
+def email_local_part(email: Optional[str]) -> Optional[str]:
+    """``John.Doe@gmail.com`` -> ``johndoe``; dots are only ignored for Gmail"""
+    if not email or '@' not in email:
+        return None
+    local, domain = email.strip().lower().split('@', 1)
+    if domain in DOTLESS_EMAIL_DOMAINS:
+        local = local.replace('.', '')
+    return local or None
+
+
+def normalize_name(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    return ' '.join(_NON_ALNUM.sub(' ', name.lower()).split()) or None
+
+
+def name_trigrams(name: str) -> set:
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ProfileIndex:
+    """Normalized lookup tables over a profile snapshot"""
+
+    def __init__(self, profiles: Sequence[dict], generation: int = 0):
+        self.generation = generation
+        self.profiles: Dict[str, dict] = {}
+        self.by_email: Dict[str, str] = {}
+        self.by_usn: Dict[str, str] = {}
+        self.by_local_part: Dict[str, List[str]] = defaultdict(list)
+        self.trigrams: Dict[str, set] = {}
+        self.trigram_postings: Dict[str, List[str]] = defaultdict(list)
+
+        for profile in profiles:
+            profile_id = profile['id']
+            self.profiles[profile_id] = profile
+
+            email = (profile.get('email') or '').strip().lower()
+            if email:
+                self.by_email[email] = profile_id
+            local = email_local_part(email)
+            if local:
+                self.by_local_part[local].append(profile_id)
+
+            usn = canonical_usn(profile.get('usn'))
+            if usn:
+                self.by_usn[usn] = profile_id
+
+            name = normalize_name(profile.get('full_name'))
+            if name:
+                grams = name_trigrams(name)
+                self.trigrams[profile_id] = grams
+                for gram in grams:
+                    self.trigram_postings[gram].append(profile_id)
+
+    def rank_names(self, name: str, restrict_to: Optional[Sequence[str]] = None) -> List[Tuple[str, float]]:
+        """Profiles ranked by trigram similarity to ``name`` (best first)"""
+        grams = name_trigrams(name)
+        if restrict_to is not None:
+            shared = {pid: len(grams & self.trigrams.get(pid, set())) for pid in restrict_to}
+        else:
+            shared = Counter()
+            for gram in grams:
+                for pid in self.trigram_postings.get(gram, ()):
+                    shared[pid] += 1
+
+        scored = [
+            (pid, 2 * overlap / (len(grams) + len(self.trigrams[pid])))
+            for pid, overlap in shared.items()
+            if overlap and pid in self.trigrams
+        ]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored
+
+    def _candidate(self, profile_id: str, score: float) -> dict:
+        profile = self.profiles[profile_id]
+        return {
+            "id": profile_id,
+            "full_name": profile.get('full_name'),
+            "usn": profile.get('usn'),
+            "email": profile.get('email'),
+            "score": round(score, 3)
+        }
+
+    def resolve(self, email: Optional[str], usn: Optional[str], name: Optional[str]) -> Tuple[str, Optional[str], List[dict]]:
+        """Resolve one row to ``(outcome, profile_id, candidates)``
+
+        ``outcome`` is the method that matched (``email``, ``usn``,
+        ``email_local``, ``name``) or ``ambiguous`` / ``unmatched``.
+        """
+        if email and email in self.by_email:
+            return 'email', self.by_email[email], []
+
+        key = canonical_usn(usn)
+        if key and key in self.by_usn:
+            return 'usn', self.by_usn[key], []
+
+        normalized_name = normalize_name(name)
+
+        # The same local part at another domain is often a different person,
+        # so it only counts when the row's name agrees
+        local_matches = self.by_local_part.get(email_local_part(email), []) if email else []
+        if local_matches:
+            ranked = self.rank_names(normalized_name, restrict_to=local_matches) if normalized_name else []
+            if ranked and ranked[0][1] >= NAME_CANDIDATE_SCORE and (len(ranked) == 1 or ranked[0][1] - ranked[1][1] >= NAME_MATCH_MARGIN):
+                return 'email_local', ranked[0][0], []
+            scores = dict(ranked)
+            return 'ambiguous', None, [self._candidate(pid, scores.get(pid, 0.0)) for pid in local_matches[:MAX_CANDIDATES]]
+
+        if normalized_name:
+            ranked = self.rank_names(normalized_name)
+            if ranked:
+                best_id, best_score = ranked[0]
+                runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+                if best_score >= NAME_MATCH_SCORE and best_score - runner_up >= NAME_MATCH_MARGIN:
+                    return 'name', best_id, []
+                candidates = [
+                    self._candidate(pid, score)
+                    for pid, score in ranked[:MAX_CANDIDATES]
+                    if score >= NAME_CANDIDATE_SCORE
+                ]
+                if candidates:
+                    return 'ambiguous', None, candidates
+
+        return 'unmatched', None, []
+
+    def match(
+        self,
+        identifiers: Sequence[Tuple[Optional[str], Optional[str], Optional[str]]],
+        lines: Optional[Sequence[int]] = None
+    ) -> dict:
+        """Resolve ``(email, usn, name)`` rows into matches and a report of the rest.
+
+        ``lines`` are the spreadsheet line numbers reported for each row
+        (their position, counting from 1, when not given).
+        """
+        matched = {}
+        methods = Counter()
+        ambiguous = []
+        unmatched = []
+
+        if lines is None:
+            lines = range(1, len(identifiers) + 1)
+        for row_number, (email, usn, name) in zip(lines, identifiers):
+            outcome, profile_id, candidates = self.resolve(email, usn, name)
+            identifier = {"row": row_number, "email": email, "usn": usn, "name": name}
+
+            if profile_id:
+                methods[outcome] += 1
+                matched[profile_id] = self.profiles[profile_id]
+            elif outcome == 'ambiguous':
+                ambiguous.append({**identifier, "candidates": candidates})
+            else:
+                unmatched.append(identifier)
+
+        return {
+            "students": list(matched.values()),
+            "match_methods": dict(methods),
+            "ambiguous": ambiguous,
+            "unmatched": unmatched
+        }
+
+
+_index: Optional[ProfileIndex] = None
+
+
+def get_profile_index(max_age: Optional[float] = None) -> ProfileIndex:
+    """Index over the current profile snapshot, rebuilt when the snapshot changes"""
+    global _index
+    profile_directory.ensure_fresh(max_age)
+    if _index is None or _index.generation != profile_directory.generation:
+        _index = ProfileIndex(profile_directory.rows(), profile_directory.generation)
+    return _index
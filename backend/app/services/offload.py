@@ -0,0 +1,55 @@
+"""
+Managed process pool for CPU-heavy work.
+
+pandas/openpyxl parsing and CSV/XLSX building would otherwise run on the
+event loop and stall every other request. Work submitted through
+``cpu_pool.run`` executes in a lazily started ``ProcessPoolExecutor``; a
+semaphore bounds how many jobs each API process can have in flight so a
+burst of uploads queues here instead of piling up inside the pool.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.config.settings import settings
+
+
+class ProcessOffloader:
+    def __init__(self, max_workers: int, max_pending: int, start_method: str):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created on first use so preloaded/forked API workers each start their own pool
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.start_method)
+            )
+            print(f"⚙️ Started CPU process pool with {self.max_workers} workers")
+        return self._executor
+
+    async def run(self, func, *args):
+        """Run ``func(*args)`` in the pool; ``func`` and its arguments must be picklable"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+cpu_pool = ProcessOffloader(
+    max_workers=settings.CPU_POOL_WORKERS or min(4, multiprocessing.cpu_count()),
+    max_pending=settings.CPU_POOL_MAX_PENDING,
+    start_method=settings.CPU_POOL_START_METHOD
+)
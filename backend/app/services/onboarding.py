@@ -0,0 +1,449 @@
+"""
+Bulk student onboarding from the registrar's spreadsheet.
+
+An upload is spooled to a temporary file and imported in the background:
+rows are streamed from the file (``csv`` or openpyxl read-only mode, never
+the whole sheet in memory) in chunks of ``ONBOARDING_CHUNK_SIZE``. For each
+chunk the existing profiles are looked up with ``in`` queries of at most
+``LOOKUP_CHUNK`` values per key, and the profiles are written with one
+multi-row upsert.
+
+Students sign in through Supabase Auth and ``profiles.id`` references
+``auth.users``, so a new student first gets an Auth account from the admin
+API (needs the service role key): created with the row's password (or
+``default_password``) and a confirmed email, or invited by email to pick
+one when ``invite`` is set. The returned Auth id becomes the profile id.
+At most ``ONBOARDING_AUTH_CONCURRENCY`` of these calls run at once.
+Supabase Auth hashes the passwords itself; the legacy ``users`` table is
+not touched.
+
+Existing students are matched by email (or USN) and keep their profile id
+and, unless ``reset_passwords`` is set, their password; blank cells never
+overwrite values already stored. Progress is tracked per import and exposed
+through ``onboarding.get``.
+"""
+import asyncio
+import csv
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.config.database import get_supabase_client
+from app.config.settings import settings
+from app.services.profiles import profile_directory
+from app.services.spreadsheets import EMAIL_COLUMNS, NAME_COLUMNS, SpreadsheetError
+
+ALLOWED_EXTENSIONS = ['.csv', '.xlsx']
+
+COLUMN_ALIASES = {
+    'email': EMAIL_COLUMNS,
+    'usn': ['usn', 'roll_no', 'roll_number', 'roll no'],
+    'full_name': NAME_COLUMNS,
+    'branch': ['branch', 'department', 'dept'],
+    'cgpa': ['cgpa', 'gpa'],
+    'tenth': ['tenth', '10th', '10th %', 'sslc'],
+    'twelfth': ['twelfth', '12th', '12th %', 'puc', 'diploma'],
+    'graduation_year': ['graduation_year', 'graduation year', 'batch', 'passout year'],
+    'active_backlog': ['active_backlog', 'active backlogs', 'backlogs'],
+    'gender': ['gender', 'sex'],
+    'date_of_birth': ['date_of_birth', 'dob', 'date of birth'],
+    'password': ['password', 'initial_password', 'initial password']
+}
+
+PROFILE_FIELDS = ['email', 'usn', 'full_name', 'branch', 'cgpa', 'tenth', 'twelfth',
+                  'graduation_year', 'active_backlog', 'gender', 'date_of_birth']
+MAX_REPORTED_ERRORS = 200
+MAX_TRACKED_IMPORTS = 20
+# Values per ``in`` filter, keeping lookup URLs well under gateway limits
+LOOKUP_CHUNK = 100
+
+
+class RowError(ValueError):
+    """A spreadsheet row that cannot be imported"""
+
+
+def _header_map(header) -> Dict[int, str]:
+    """Column position -> student field, for the columns we recognise"""
+    positions = {}
+    for position, name in enumerate(header):
+        name = str(name or '').strip().lower()
+        for field, aliases in COLUMN_ALIASES.items():
+            if name in aliases and field not in positions.values():
+                positions[position] = field
+    if 'email' not in positions.values():
+        raise SpreadsheetError("File must contain an 'email' column")
+    if 'usn' not in positions.values():
+        raise SpreadsheetError("File must contain a 'usn' column")
+    return positions
+
+
+def _fields(row, positions: Dict[int, str]) -> Optional[dict]:
+    values = {field: row[position] for position, field in positions.items() if position < len(row)}
+    # Registrar exports often end with blank rows
+    return values if any(_text(value) for value in values.values()) else None
+
+
+def read_students(path: str, file_extension: str) -> Iterator[Tuple[int, dict]]:
+    """Stream ``(line number, {field: raw value})`` from a CSV or XLSX file"""
+    if file_extension == '.csv':
+        with open(path, newline='', encoding='utf-8-sig') as handle:
+            rows = csv.reader(handle)
+            positions = _header_map(next(rows, []))
+            for line, row in enumerate(rows, start=2):
+                values = _fields(row, positions)
+                if values is not None:
+                    yield line, values
+        return
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        positions = _header_map(next(rows, ()))
+        for line, row in enumerate(rows, start=2):
+            values = _fields(row, positions)
+            if values is not None:
+                yield line, values
+    finally:
+        workbook.close()
+
+
+def next_chunk(rows: Iterator[Tuple[int, dict]], size: int) -> List[Tuple[int, dict]]:
+    chunk = []
+    for item in rows:
+        chunk.append(item)
+        if len(chunk) >= size:
+            break
+    return chunk
+
+
+def _text(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _number(value, field: str, maximum: float, integer: bool = False):
+    value = _text(value)
+    if value is None:
+        return None
+    try:
+        number = float(value.rstrip('%'))
+    except ValueError:
+        raise RowError(f"{field} must be a number")
+    if number < 0 or number > maximum:
+        raise RowError(f"{field} must be between 0 and {maximum:g}")
+    return int(number) if integer else number
+
+
+def _flag(value, field: str) -> Optional[bool]:
+    """A yes/no cell; a count (e.g. of active backlogs) means yes when above 0"""
+    if isinstance(value, bool):
+        return value
+    value = _text(value)
+    if value is None:
+        return None
+    lowered = value.lower()
+    if lowered in ('yes', 'y', 'true'):
+        return True
+    if lowered in ('no', 'n', 'false', 'none', 'nil'):
+        return False
+    try:
+        count = float(lowered)
+    except ValueError:
+        raise RowError(f"{field} must be yes/no or a count")
+    if count < 0:
+        raise RowError(f"{field} cannot be negative")
+    return count > 0
+
+
+def _date(value) -> Optional[str]:
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    value = _text(value)
+    if value is None:
+        return None
+    for pattern in ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y'):
+        try:
+            return datetime.strptime(value, pattern).date().isoformat()
+        except ValueError:
+            continue
+    raise RowError("date_of_birth must be YYYY-MM-DD or DD/MM/YYYY")
+
+
+def normalize_student(raw: dict) -> dict:
+    """Validate one row; returns the non-blank fields only"""
+    email = (_text(raw.get('email')) or '').lower()
+    if '@' not in email:
+        raise RowError("Missing or invalid email")
+    usn = _text(raw.get('usn'))
+    if usn is None:
+        raise RowError("Missing USN")
+
+    student = {
+        'email': email,
+        'usn': usn.upper(),
+        'full_name': _text(raw.get('full_name')),
+        'branch': _text(raw.get('branch')),
+        'cgpa': _number(raw.get('cgpa'), 'cgpa', 10),
+        'tenth': _number(raw.get('tenth'), 'tenth', 100),
+        'twelfth': _number(raw.get('twelfth'), 'twelfth', 100),
+        'graduation_year': _number(raw.get('graduation_year'), 'graduation_year', 9999, integer=True),
+        'active_backlog': _flag(raw.get('active_backlog'), 'active_backlog'),
+        'gender': _text(raw.get('gender')),
+        'date_of_birth': _date(raw.get('date_of_birth')),
+        'password': _text(raw.get('password'))
+    }
+    return {field: value for field, value in student.items() if value is not None}
+
+
+class OnboardingImport:
+    def __init__(self, filename: str):
+        self.id = str(uuid.uuid4())
+        self.filename = filename
+        self.status = 'queued'
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.invited = 0
+        self.passwords_set = 0
+        self.errors: List[dict] = []
+        self.started_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self._started = time.monotonic()
+        self._elapsed = 0.0
+
+    def fail_row(self, line: int, message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def to_dict(self) -> dict:
+        elapsed = self._elapsed if self.finished_at else time.monotonic() - self._started
+        return {
+            "import_id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "rows_processed": self.rows,
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            "invited": self.invited,
+            "passwords_set": self.passwords_set,
+            "elapsed_seconds": round(elapsed, 2),
+            "rows_per_second": round(self.rows / elapsed, 1) if elapsed > 0 else 0.0,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "errors": self.errors
+        }
+
+
+class StudentOnboarding:
+    def __init__(self, chunk_size: int, auth_concurrency: int):
+        self.chunk_size = chunk_size
+        self.auth_concurrency = auth_concurrency
+        self._imports: "OrderedDict[str, OnboardingImport]" = OrderedDict()
+        self._tasks = set()
+
+    def get(self, import_id: str) -> Optional[OnboardingImport]:
+        return self._imports.get(import_id)
+
+    def start(
+        self,
+        path: str,
+        filename: str,
+        file_extension: str,
+        default_password: Optional[str] = None,
+        reset_passwords: bool = False,
+        invite: bool = False
+    ) -> OnboardingImport:
+        """Track a new import and run it in the background"""
+        job = OnboardingImport(filename)
+        self._imports[job.id] = job
+        while len(self._imports) > MAX_TRACKED_IMPORTS:
+            self._imports.popitem(last=False)
+
+        task = asyncio.create_task(self._run(job, path, file_extension, default_password, reset_passwords, invite))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: OnboardingImport, path: str, file_extension: str,
+                   default_password: Optional[str], reset_passwords: bool, invite: bool):
+        job.status = 'running'
+        try:
+            rows = read_students(path, file_extension)
+            while True:
+                chunk = await asyncio.to_thread(next_chunk, rows, self.chunk_size)
+                if not chunk:
+                    break
+                await self._import_chunk(job, chunk, default_password, reset_passwords, invite)
+            job.status = 'completed'
+            print(f"🎓 Onboarding import {job.id}: {job.created} created, {job.updated} updated, {job.failed} failed")
+        except Exception as e:
+            job.status = 'failed'
+            job.errors.append({"line": None, "error": str(e)})
+            print(f"❌ Onboarding import {job.id} failed: {str(e)}")
+        finally:
+            job._elapsed = time.monotonic() - job._started
+            job.finished_at = datetime.utcnow()
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+        if job.created or job.updated:
+            # New students should show up in eligibility and search right away
+            try:
+                await asyncio.to_thread(profile_directory.refresh)
+            except Exception as e:
+                print(f"⚠️ Could not refresh profiles after onboarding: {str(e)}")
+
+    async def _import_chunk(self, job: OnboardingImport, chunk: List[Tuple[int, dict]],
+                            default_password: Optional[str], reset_passwords: bool, invite: bool):
+        job.rows += len(chunk)
+
+        students: Dict[str, Tuple[int, dict]] = {}
+        for line, raw in chunk:
+            try:
+                student = normalize_student(raw)
+            except RowError as e:
+                job.fail_row(line, str(e))
+                continue
+            # A later row for the same student wins (one upsert cannot touch a row twice)
+            students[student['email']] = (line, student)
+        if not students:
+            return
+
+        try:
+            existing_profiles = await asyncio.to_thread(self._lookup, list(students.values()))
+        except Exception as e:
+            for line, _ in students.values():
+                job.fail_row(line, f"Lookup failed: {str(e)}")
+            return
+
+        by_email = {profile['email']: profile for profile in existing_profiles if profile.get('email')}
+        by_usn = {profile['usn']: profile for profile in existing_profiles if profile.get('usn')}
+
+        # (line, profile, password or None to invite, whether the account is new)
+        pending: List[Tuple[int, dict, Optional[str], bool]] = []
+        for email, (line, student) in students.items():
+            current = by_email.get(email)
+            usn_owner = by_usn.get(student['usn'])
+            if current is not None and usn_owner is not None and usn_owner['id'] != current['id']:
+                job.fail_row(line, f"USN {student['usn']} already belongs to another student")
+                continue
+            current = current or usn_owner
+
+            password = student.get('password') or default_password
+            if current is None and not password and not invite:
+                job.fail_row(line, "Missing password and no default_password given (or invite the students)")
+                continue
+            if current is not None and reset_passwords and not password:
+                job.fail_row(line, "Missing password to reset and no default_password given")
+                continue
+
+            profile = {field: (current or {}).get(field) for field in PROFILE_FIELDS}
+            profile.update({field: student[field] for field in PROFILE_FIELDS if field in student})
+            profile['id'] = current['id'] if current else None
+            profile['role'] = 'student'
+            if profile['active_backlog'] is None:
+                profile['active_backlog'] = False
+            pending.append((line, profile, password, current is None))
+
+        # Accounts first: a profile row can only exist for an Auth user
+        semaphore = asyncio.Semaphore(self.auth_concurrency)
+
+        async def prepare_account(profile: dict, password: Optional[str], is_new: bool):
+            async with semaphore:
+                if is_new:
+                    profile['id'] = await asyncio.to_thread(self._create_account, profile, password)
+                elif reset_passwords:
+                    await asyncio.to_thread(self._set_password, profile['id'], password)
+
+        results = await asyncio.gather(
+            *(prepare_account(profile, password, is_new) for _, profile, password, is_new in pending),
+            return_exceptions=True
+        )
+
+        profiles, accepted = [], []
+        for (line, profile, password, is_new), result in zip(pending, results):
+            if isinstance(result, Exception):
+                job.fail_row(line, f"Could not {'create' if is_new else 'update'} the sign-in account: {str(result)}")
+                continue
+            if is_new and not password:
+                job.invited += 1
+            elif is_new or reset_passwords:
+                job.passwords_set += 1
+            profiles.append(profile)
+            accepted.append((line, is_new))
+
+        if not profiles:
+            return
+
+        try:
+            await asyncio.to_thread(self._write, profiles)
+        except Exception as e:
+            # New accounts are already in Auth; re-running the import updates their profiles
+            for line, _ in accepted:
+                job.fail_row(line, f"Write failed: {str(e)}")
+            return
+
+        created = sum(1 for _, is_new in accepted if is_new)
+        job.created += created
+        job.updated += len(accepted) - created
+
+    @staticmethod
+    def _lookup(students: List[Tuple[int, dict]]) -> List[dict]:
+        supabase = get_supabase_client()
+        emails = [student['email'] for _, student in students]
+        usns = [student['usn'] for _, student in students]
+        columns = 'id, ' + ', '.join(PROFILE_FIELDS)
+
+        profiles: Dict[str, dict] = {}
+        for field, values in (('email', emails), ('usn', usns)):
+            for start in range(0, len(values), LOOKUP_CHUNK):
+                rows = supabase.table('profiles').select(columns).in_(
+                    field, values[start:start + LOOKUP_CHUNK]
+                ).execute().data or []
+                for profile in rows:
+                    profiles.setdefault(profile['id'], profile)
+        return list(profiles.values())
+
+    @staticmethod
+    def _create_account(profile: dict, password: Optional[str]) -> str:
+        """Create (or invite) the student's Supabase Auth user; returns its id"""
+        admin = get_supabase_client().auth.admin
+        metadata = {'full_name': profile.get('full_name') or ''}
+        if password:
+            response = admin.create_user({
+                'email': profile['email'],
+                'password': password,
+                'email_confirm': True,
+                'user_metadata': metadata
+            })
+        else:
+            response = admin.invite_user_by_email(profile['email'], {'data': metadata})
+        return response.user.id
+
+    @staticmethod
+    def _set_password(user_id: str, password: str):
+        get_supabase_client().auth.admin.update_user_by_id(user_id, {'password': password})
+
+    @staticmethod
+    def _write(profiles: List[dict]):
+        get_supabase_client().table('profiles').upsert(profiles).execute()
+
+
+onboarding = StudentOnboarding(
+    chunk_size=settings.ONBOARDING_CHUNK_SIZE,
+    auth_concurrency=settings.ONBOARDING_AUTH_CONCURRENCY
+)
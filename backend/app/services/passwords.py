@@ -0,0 +1,28 @@
+"""
+bcrypt password hashing.
+
+Used for the legacy ``users`` table behind ``/api/users``; students sign
+in through Supabase Auth, which hashes their passwords itself. Hashing is
+deliberately slow (about 0.2s at cost 12), so callers on the event loop go
+through ``cpu_pool.run(hash_password, ...)``. It is a top-level function so
+the process pool can pickle it; passlib is imported on first use.
+"""
+from typing import Optional
+
+_context = None
+
+
+def _crypt_context():
+    global _context
+    if _context is None:
+        from passlib.context import CryptContext
+
+        _context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _context
+
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    """bcrypt hash of ``password``; ``rounds`` is the log2 cost factor"""
+    if rounds is None:
+        return _crypt_context().hash(password)
+    return _crypt_context().hash(password, rounds=rounds)
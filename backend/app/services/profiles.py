@@ -0,0 +1,251 @@
+"""
+In-memory snapshot of student profiles.
+
+Shortlist matching (and anything else that needs to look students up in
+bulk) reads from this snapshot instead of issuing one query per row. The
+snapshot is refreshed when it is older than ``PROFILE_SNAPSHOT_TTL`` or on
+demand, and every refresh bumps ``generation`` so derived indexes know when
+to rebuild.
+
+With ``SHARED_CACHE_ENABLED`` refreshes are published to a shared snapshot,
+so one worker's load serves all of them and a stale snapshot is reloaded by
+whichever worker notices first. Placements recorded between refreshes go to
+a second, small shared snapshot holding only ``placed_ctc`` overrides, so a
+selection never republishes every profile. Queries run without the shared
+lock; it is only held to compare generations and publish.
+"""
+import asyncio
+import time
+from contextlib import nullcontext
+from threading import Lock
+from typing import Dict, List, Optional
+
+import orjson
+
+from app.config.database import fetch_all_rows, get_supabase_client
+from app.config.settings import settings
+from app.services.replica import local_replica, replica_ready
+from app.utils.shared_snapshot import SharedSnapshot, open_snapshot
+
+PROFILE_COLUMNS = 'id, email, usn, full_name, branch, cgpa, tenth, twelfth, graduation_year, active_backlog, gender, role, updated_at'
+
+
+class ProfileDirectory:
+    def __init__(
+        self, ttl: float, shared: Optional[SharedSnapshot] = None, placements: Optional[SharedSnapshot] = None
+    ):
+        self.ttl = ttl
+        self._shared = shared
+        self._shared_generation = 0
+        self._placements_shared = placements
+        self._placements_generation = 0
+        self._lock = Lock()
+        self._rows: List[dict] = []
+        self._by_id: Dict[str, dict] = {}
+        # student id -> highest CTC among jobs they were selected for
+        self._placed_ctc: Dict[str, float] = {}
+        # Selections recorded since the snapshot was loaded: student id -> [ctc, recorded at]
+        self._placements: Dict[str, list] = {}
+        self.loaded_at = 0.0
+        self.generation = 0
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.loaded_at
+
+    def shared_metrics(self) -> Optional[dict]:
+        return self._shared.metrics() if self._shared is not None else None
+
+    def placement_metrics(self) -> Optional[dict]:
+        return self._placements_shared.metrics() if self._placements_shared is not None else None
+
+    def _shared_lock(self):
+        return self._shared.lock() if self._shared is not None else nullcontext()
+
+    def _placements_lock(self):
+        return self._placements_shared.lock() if self._placements_shared is not None else nullcontext()
+
+    def _share(self):
+        """Publish the current snapshot as a new shared generation"""
+        if self._shared is None:
+            return
+        with self._lock:
+            payload = orjson.dumps({
+                "published_at": time.time() - self.age,
+                "rows": self._rows,
+                "placed_ctc": self._placed_ctc
+            })
+        try:
+            self._shared_generation = self._shared.publish(payload)
+        except OSError as e:
+            print(f"⚠️ Could not publish the shared profile snapshot: {str(e)}")
+
+    def _share_placements(self):
+        if self._placements_shared is None:
+            return
+        with self._lock:
+            payload = orjson.dumps({"placed_ctc": self._placements})
+        try:
+            self._placements_generation = self._placements_shared.publish(payload)
+        except OSError as e:
+            print(f"⚠️ Could not publish shared placements: {str(e)}")
+
+    def _sync(self):
+        """Adopt newer shared generations if another worker published them"""
+        self._sync_placements()
+        if self._shared is None or self._shared.generation == self._shared_generation:
+            return
+        try:
+            generation, snapshot = self._shared.read(orjson.loads)
+        except (OSError, ValueError, RuntimeError) as e:
+            print(f"⚠️ Could not read the shared profile snapshot: {str(e)}")
+            return
+        if snapshot is None:
+            return
+        with self._lock:
+            self._rows = snapshot['rows']
+            self._placed_ctc = snapshot['placed_ctc']
+            self._by_id = {row['id']: row for row in self._rows}
+            self.loaded_at = time.monotonic() - max(0.0, time.time() - snapshot['published_at'])
+            self.generation += 1
+            self._shared_generation = generation
+
+    def _sync_placements(self):
+        shared = self._placements_shared
+        if shared is None or shared.generation == self._placements_generation:
+            return
+        try:
+            generation, snapshot = shared.read(orjson.loads)
+        except (OSError, ValueError, RuntimeError) as e:
+            print(f"⚠️ Could not read shared placements: {str(e)}")
+            return
+        if snapshot is None:
+            return
+        with self._lock:
+            self._placements = snapshot['placed_ctc']
+            self._placements_generation = generation
+
+    def _fetch(self):
+        """``(student rows with placed_ctc, placed_ctc by student id, query start time)``"""
+        supabase = get_supabase_client()
+        started = time.time()
+        if replica_ready():
+            # Pull only what changed since the last sync, then read locally
+            local_replica.sync()
+            columns = [column.strip() for column in PROFILE_COLUMNS.split(',')]
+            rows = [{column: profile.get(column) for column in columns} for profile in local_replica.profiles(role='student')]
+        else:
+            rows = fetch_all_rows(
+                lambda: supabase.table('profiles').select(PROFILE_COLUMNS).eq('role', 'student').order('id')
+            )
+        selections = fetch_all_rows(
+            lambda: supabase.table('applications').select('student_id, jobs(ctc)').eq('status', 'selected').order('id')
+        )
+
+        placed_ctc = {}
+        for selection in selections:
+            ctc = float((selection.get('jobs') or {}).get('ctc') or 0)
+            placed_ctc[selection['student_id']] = max(ctc, placed_ctc.get(selection['student_id'], 0.0))
+        for row in rows:
+            row['placed_ctc'] = placed_ctc.get(row['id'], 0.0)
+        return rows, placed_ctc, started
+
+    def _install(self, rows: List[dict], placed_ctc: Dict[str, float], started: float):
+        with self._shared_lock():
+            with self._lock:
+                self._rows = rows
+                self._placed_ctc = placed_ctc
+                self._by_id = {row['id']: row for row in rows}
+                self.loaded_at = time.monotonic()
+                self.generation += 1
+            self._share()
+
+        # Placements recorded before the query started are in what it returned
+        with self._placements_lock():
+            self._sync_placements()
+            with self._lock:
+                placements = {
+                    student_id: placement for student_id, placement in self._placements.items()
+                    if placement[1] >= started
+                }
+                if len(placements) == len(self._placements):
+                    placements = None
+                else:
+                    self._placements = placements
+            if placements is not None:
+                self._share_placements()
+
+        print(f"👥 Loaded {len(rows)} student profiles (generation {self.generation})")
+
+    def refresh(self):
+        """Reload every student profile from Supabase"""
+        self._install(*self._fetch())
+
+    def ensure_fresh(self, max_age: Optional[float] = None):
+        """Refresh the snapshot if it is older than ``max_age`` (defaults to the TTL).
+
+        If the refresh fails but an older snapshot exists, keep serving it.
+        """
+        limit = self.ttl if max_age is None else max_age
+        self._sync()
+        if self.generation and self.age <= limit:
+            return
+        generation = self._shared_generation
+        try:
+            fetched = self._fetch()
+        except Exception as e:
+            if self.generation == 0:
+                raise
+            print(f"⚠️ Serving profile snapshot from {self.age:.0f}s ago: {str(e)}")
+            return
+
+        with self._shared_lock():
+            if self._shared is not None and self._shared.generation != generation:
+                # Another worker reloaded while we were querying; use theirs
+                self._sync()
+                return
+            self._install(*fetched)
+
+    def rows(self) -> List[dict]:
+        self._sync()
+        return self._rows
+
+    def get(self, student_id: str) -> Optional[dict]:
+        self._sync()
+        return self._by_id.get(student_id)
+
+    def record_placement(self, student_id: str, ctc) -> None:
+        """Note a selection so ``placed_ctc`` is current before the next refresh
+        (blocks on the shared lock; call it off the event loop)"""
+        ctc = float(ctc or 0)
+        with self._placements_lock():
+            self._sync_placements()
+            with self._lock:
+                if ctc <= self.placed_ctc(student_id):
+                    return
+                # Replaced, not mutated, so readers never need the lock
+                self._placements = {**self._placements, student_id: [ctc, time.time()]}
+            self._share_placements()
+
+    def placed_ctc(self, student_id: Optional[str]) -> float:
+        placement = self._placements.get(student_id)
+        return max(self._placed_ctc.get(student_id, 0.0), placement[0] if placement else 0.0)
+
+    def with_derived(self, profile: dict) -> dict:
+        """``profile`` plus derived fields eligibility rules can use (``placed_ctc``)"""
+        self._sync()
+        return {**profile, 'placed_ctc': self.placed_ctc(profile.get('id'))}
+
+    async def warm(self):
+        """Load the snapshot in the background at startup"""
+        try:
+            await asyncio.to_thread(self.ensure_fresh)
+        except Exception as e:
+            print(f"⚠️ Could not preload student profiles: {str(e)}")
+
+
+profile_directory = ProfileDirectory(
+    ttl=settings.PROFILE_SNAPSHOT_TTL,
+    shared=open_snapshot(settings.SHARED_CACHE_DIR, 'profiles', enabled=settings.SHARED_CACHE_ENABLED),
+    placements=open_snapshot(settings.SHARED_CACHE_DIR, 'placements', enabled=settings.SHARED_CACHE_ENABLED)
+)
@@ -0,0 +1,250 @@
+"""
+On-demand CPU profiles and allocation snapshots for diagnosing slow endpoints.
+
+``SamplingProfiler`` is a wall-clock sampler: a background thread reads
+every other thread's stack with ``sys._current_frames()`` at a fixed
+interval and counts identical stacks. The result is written in the
+collapsed-stack format (``root;caller;callee count`` per line) that
+flamegraph.pl, speedscope and inferno read directly. Frames are labelled
+``function (path:first line)`` so samples from different lines of the same
+function merge into one box.
+
+The sampler sees every thread of the worker, so a profile taken while other
+requests run on the same event loop includes them too; each thread's stacks
+sit under its own root (``MainThread``, ``asyncio_0`` ...). Work done in the
+CPU pool runs in other processes and shows up only as the wait for it.
+
+Profiles are written to ``PROFILING_DIR`` as ``<pid>-<profile id>.json``,
+like the audit log's per-worker files, so whichever worker serves
+``/api/debug/profiles`` sees the profiles every worker captured; each
+worker keeps its own ``PROFILING_KEEP`` newest.
+
+``MemoryTracer`` wraps ``tracemalloc``. Tracing stays off until an admin
+starts it, since it slows every allocation while it is on. It is inherently
+per process: with several workers, each call reaches whichever worker
+accepted the connection, so responses name the worker's pid.
+"""
+import glob
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional
+
+import orjson
+
+from app.config.settings import settings
+
+PROFILE_ID = re.compile(r'^[0-9a-f]{12}$')
+
+_PATH_PREFIXES = sorted(
+    {os.path.join(path, '') for path in sys.path if path and os.path.isdir(path)},
+    key=len,
+    reverse=True
+)
+
+
+def _short_path(filename: str) -> str:
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float, max_seconds: float):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._labels: Dict[object, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _sample(self, names: Dict[int, str]):
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident) or f"thread-{ident}")
+            self.samples[';'.join(reversed(stack))] += 1
+        self.sample_count += 1
+
+    def _run(self):
+        deadline = self.started_at + self.max_seconds
+        names = {}
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            if len(names) != threading.active_count():
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            self._sample(names)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.monotonic() - self.started_at
+
+    def collapsed(self) -> str:
+        """Stacks in collapsed format, most frequent first"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+class ProfileStore:
+    """The most recent request profiles of every worker, one JSON file each"""
+
+    def __init__(self, directory: str, keep: int):
+        self.directory = directory
+        self.keep = keep
+        # This worker's profile ids, oldest first
+        self._own: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = Lock()
+        # One profile at a time; overlapping samplers would sample each other's requests
+        self.active = Lock()
+
+    def add(self, profile_id: str, method: str, path: str, status: Optional[int], profiler: SamplingProfiler):
+        """Write a finished profile (file I/O; call it off the event loop)"""
+        profile = {
+            "id": profile_id,
+            "pid": os.getpid(),
+            "method": method,
+            "path": path,
+            "status": status,
+            "captured_at": time.time(),
+            "duration_ms": round(profiler.duration * 1000, 1),
+            "interval_ms": round(profiler.interval * 1000, 2),
+            "samples": profiler.sample_count,
+            "stacks": profiler.collapsed()
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{os.getpid()}-{profile_id}.json")
+        # Readers in other workers never see a half-written file
+        temporary = os.path.join(self.directory, f".{os.getpid()}-{profile_id}.json.tmp")
+        with open(temporary, 'wb') as output:
+            output.write(orjson.dumps(profile))
+        os.replace(temporary, path)
+
+        with self._lock:
+            self._own[profile_id] = path
+            expired = []
+            while len(self._own) > self.keep:
+                expired.append(self._own.popitem(last=False)[1])
+        for old in expired:
+            try:
+                os.remove(old)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _read(path: str) -> Optional[dict]:
+        try:
+            with open(path, 'rb') as profile:
+                return orjson.loads(profile.read())
+        except (FileNotFoundError, ValueError):
+            # Pruned by its worker, or not a profile
+            return None
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        if not PROFILE_ID.match(profile_id):
+            return None
+        for path in glob.glob(os.path.join(self.directory, f"*-{profile_id}.json")):
+            profile = self._read(path)
+            if profile is not None:
+                return profile
+        return None
+
+    def summaries(self) -> List[dict]:
+        """Every worker's profiles without their stacks, newest first"""
+        profiles = [self._read(path) for path in glob.glob(os.path.join(self.directory, '*.json'))]
+        profiles = sorted((profile for profile in profiles if profile), key=lambda profile: profile['captured_at'], reverse=True)
+        return [{key: value for key, value in profile.items() if key != 'stacks'} for profile in profiles]
+
+
+class MemoryTracer:
+    def __init__(self):
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._lock = Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1):
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                self._baseline = None
+                print(f"🔬 Started allocation tracing ({frames} frame{'s' if frames != 1 else ''} per allocation)")
+
+    def stop(self):
+        with self._lock:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+                self._baseline = None
+                print("🔬 Stopped allocation tracing")
+
+    def snapshot(self, top: int = 25, group_by: str = 'lineno', compare: bool = False) -> dict:
+        """Top allocation sites; with ``compare``, growth since the previous snapshot"""
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<unknown>')
+        ))
+        with self._lock:
+            baseline, self._baseline = self._baseline, snapshot
+
+        current, peak = tracemalloc.get_traced_memory()
+        result = {
+            "pid": os.getpid(),
+            "group_by": group_by,
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "compared": compare and baseline is not None,
+            "top": []
+        }
+        if result["compared"]:
+            for stat in snapshot.compare_to(baseline, group_by)[:top]:
+                result["top"].append({
+                    "site": self._site(stat.traceback),
+                    "size_bytes": stat.size,
+                    "size_diff_bytes": stat.size_diff,
+                    "count": stat.count,
+                    "count_diff": stat.count_diff
+                })
+        else:
+            for stat in snapshot.statistics(group_by)[:top]:
+                result["top"].append({
+                    "site": self._site(stat.traceback),
+                    "size_bytes": stat.size,
+                    "count": stat.count
+                })
+        return result
+
+    @staticmethod
+    def _site(traceback) -> List[str]:
+        return [f"{_short_path(frame.filename)}:{frame.lineno}" for frame in traceback]
+
+
+profile_store = ProfileStore(settings.PROFILING_DIR, keep=settings.PROFILING_KEEP)
+memory_tracer = MemoryTracer()
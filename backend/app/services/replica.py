@@ -0,0 +1,342 @@
+"""
+Local read replica of ``jobs`` and ``profiles`` in SQLite.
+
+Each table is mirrored into a SQLite file (``REPLICA_PATH``) holding the
+full row as JSON next to the indexed columns lookups use (id, email, usn,
+branch, cgpa; status and created_at for jobs). A background task keeps it
+current:
+
+* every ``REPLICA_SYNC_INTERVAL`` seconds it fetches only rows whose
+  ``updated_at`` is at or after the newest one it has, minus a small
+  overlap for transactions that committed late, and upserts them
+* every ``REPLICA_FULL_SYNC_INTERVAL`` seconds it reloads each table
+  completely, which also drops rows deleted upstream
+
+With several workers sharing the file, one of them is elected to sync by
+holding an ``flock`` on ``REPLICA_PATH.lock``; the others only follow its
+progress in ``sync_state`` and take over when it exits.
+
+Writes still go to Supabase. Rows the API itself writes are upserted here
+straight away so they can be read back at once. Once a sync has finished
+after this process started (its own, or the elected worker's), the read
+helpers below serve single-row lookups and profile joins from the replica
+in well under a millisecond; data left on disk by an earlier run is never
+served before that. Until then, or with ``REPLICA_ENABLED`` off, they
+query Supabase as before. If Supabase becomes unreachable the replica keeps
+serving its last state, and ``/health`` reports how far behind it is.
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import orjson
+
+from app.config.database import fetch, fetch_all_rows, get_supabase_client
+from app.config.settings import settings
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# table -> indexed columns (besides id and updated_at) with their SQLite types
+TABLES = {
+    'jobs': {'status': 'TEXT', 'created_at': 'TEXT'},
+    'profiles': {'email': 'TEXT', 'usn': 'TEXT', 'branch': 'TEXT', 'cgpa': 'REAL', 'role': 'TEXT'}
+}
+
+# Columns the application lists join from profiles
+PROFILE_JOIN_COLUMNS = 'id, full_name, usn, branch, cgpa, email'
+
+# SQLite's default limit on bound parameters is 999
+ID_CHUNK = 900
+
+
+def _schema() -> List[str]:
+    statements = ["CREATE TABLE IF NOT EXISTS sync_state (name TEXT PRIMARY KEY, cursor TEXT, synced_at REAL)"]
+    for table, columns in TABLES.items():
+        extra = ''.join(f", {column} {kind}" for column, kind in columns.items())
+        statements.append(f"CREATE TABLE IF NOT EXISTS {table} (id TEXT PRIMARY KEY, updated_at TEXT{extra}, doc BLOB NOT NULL)")
+        statements.append(f"CREATE INDEX IF NOT EXISTS {table}_updated_at ON {table} (updated_at)")
+        for column in columns:
+            statements.append(f"CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})")
+    return statements
+
+
+def _cursor_with_overlap(cursor: str, seconds: float) -> str:
+    try:
+        moment = datetime.fromisoformat(cursor.replace('Z', '+00:00'))
+    except ValueError:
+        return cursor
+    return (moment - timedelta(seconds=seconds)).isoformat()
+
+
+class LocalReplica:
+    def __init__(self, path: str, overlap: float = 5.0):
+        self.path = path
+        self.overlap = overlap
+        self._local = threading.local()
+        self._sync_lock = threading.Lock()
+        # Held by the worker elected to sync, for as long as it runs
+        self._election_fd: Optional[int] = None
+        self._opened_at = 0.0
+        self.ready = False
+        self.last_sync = 0.0
+        self.last_full_sync = 0.0
+        self.synced_rows = 0
+        self.errors = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            # Readers never block the syncing writer (and vice versa)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def open(self):
+        """Create the schema. Not ready until a sync finishes after this call"""
+        connection = self._connection()
+        for statement in _schema():
+            connection.execute(statement)
+        synced, oldest = connection.execute(
+            "SELECT COUNT(*), MIN(synced_at) FROM sync_state WHERE name LIKE 'full:%'"
+        ).fetchone()
+        if synced == len(TABLES):
+            # Another worker (or the previous run) did the full load; continue incrementally
+            self.last_full_sync = oldest
+        self._opened_at = time.time()
+        self.ready = False
+
+    @property
+    def syncing(self) -> bool:
+        """Whether this worker pulls from Supabase (always, where flock is unavailable)"""
+        return fcntl is None or self._election_fd is not None
+
+    def _elect(self) -> bool:
+        """Try to become the worker that syncs; the flock is released when it exits"""
+        if self.syncing:
+            return True
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._election_fd = fd
+        print(f"🗃️ Worker {os.getpid()} syncs the replica")
+        return True
+
+    def _follow(self):
+        """Pick up the elected worker's progress from ``sync_state``"""
+        states = dict(self._connection().execute("SELECT name, synced_at FROM sync_state").fetchall())
+        synced = [states.get(table) for table in TABLES]
+        full = [states.get(f"full:{table}") for table in TABLES]
+        if None in synced or None in full:
+            return
+        self.last_sync = min(synced)
+        self.last_full_sync = min(full)
+        if self.last_sync >= self._opened_at:
+            self.ready = True
+
+    def _state(self, name: str) -> Optional[str]:
+        row = self._connection().execute("SELECT cursor FROM sync_state WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, connection: sqlite3.Connection, name: str, cursor: Optional[str]):
+        connection.execute(
+            "INSERT INTO sync_state (name, cursor, synced_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET cursor = excluded.cursor, synced_at = excluded.synced_at",
+            (name, cursor, time.time())
+        )
+
+    def _upsert_rows(self, connection: sqlite3.Connection, table: str, rows: Iterable[dict]):
+        columns = list(TABLES[table])
+        statement = (
+            f"INSERT OR REPLACE INTO {table} (id, updated_at, {', '.join(columns)}, doc) "
+            f"VALUES (?, ?, {', '.join('?' for _ in columns)}, ?)"
+        )
+        connection.executemany(statement, [
+            (str(row['id']), row.get('updated_at'), *[row.get(column) for column in columns], orjson.dumps(row))
+            for row in rows
+        ])
+
+    def upsert(self, table: str, rows: List[dict]):
+        """Write rows the API just wrote upstream, so they read back at once"""
+        if not rows:
+            return
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN")
+            self._upsert_rows(connection, table, rows)
+
+    def _sync_table(self, table: str, full: bool) -> int:
+        supabase = get_supabase_client()
+        cursor = None if full else self._state(table)
+        if cursor is None:
+            rows = fetch_all_rows(lambda: supabase.table(table).select('*').order('id'))
+        else:
+            since = _cursor_with_overlap(cursor, self.overlap)
+            rows = fetch_all_rows(
+                lambda: supabase.table(table).select('*').gte('updated_at', since).order('updated_at,id')
+            )
+
+        newest = max((row['updated_at'] for row in rows if row.get('updated_at')), default=cursor)
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN")
+            if cursor is None:
+                connection.execute(f"DELETE FROM {table}")
+            self._upsert_rows(connection, table, rows)
+            self._set_state(connection, table, newest)
+            if cursor is None:
+                self._set_state(connection, f"full:{table}", newest)
+        return len(rows)
+
+    def sync(self, full: bool = False) -> int:
+        """Pull changes from Supabase; returns the number of rows applied.
+
+        In a worker that was not elected to sync this only catches up with
+        the elected worker's progress and returns 0.
+        """
+        with self._sync_lock:
+            if not self._elect():
+                self._follow()
+                return 0
+            started = time.monotonic()
+            # Tables without a cursor are loaded in full either way
+            count = sum(self._sync_table(table, full) for table in TABLES)
+            self.last_sync = time.time()
+            if full:
+                self.last_full_sync = self.last_sync
+                print(f"🗃️ Full replica sync: {count} rows in {time.monotonic() - started:.2f}s")
+            self.synced_rows += count
+            self.ready = True
+            return count
+
+    async def run_sync(self, interval: float, full_interval: float):
+        """Background loop keeping the replica current"""
+        while True:
+            try:
+                full = time.time() - self.last_full_sync >= full_interval
+                await asyncio.to_thread(self.sync, full)
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ Replica sync failed, serving data from {self.lag:.0f}s ago: {str(e)}")
+            await asyncio.sleep(interval)
+
+    @property
+    def lag(self) -> float:
+        return time.time() - self.last_sync if self.last_sync else float('inf')
+
+    def job(self, job_id: str) -> Optional[dict]:
+        row = self._connection().execute("SELECT doc FROM jobs WHERE id = ?", (str(job_id),)).fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    def jobs(self, status: Optional[str] = None) -> List[dict]:
+        """Jobs newest first, optionally with one status"""
+        if status is None:
+            rows = self._connection().execute("SELECT doc FROM jobs ORDER BY created_at DESC")
+        else:
+            rows = self._connection().execute("SELECT doc FROM jobs WHERE status = ? ORDER BY created_at DESC", (status,))
+        return [orjson.loads(doc) for doc, in rows]
+
+    def jobs_raw(self):
+        """All jobs newest first as an encoded JSON array, and their count"""
+        docs = [doc for doc, in self._connection().execute("SELECT doc FROM jobs ORDER BY created_at DESC")]
+        return b'[' + b','.join(docs) + b']', len(docs)
+
+    def profile(self, student_id: str) -> Optional[dict]:
+        row = self._connection().execute("SELECT doc FROM profiles WHERE id = ?", (str(student_id),)).fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    def profiles(self, ids: Optional[List[str]] = None, role: Optional[str] = None) -> List[dict]:
+        """Profiles by id (any order), or all of them (optionally with one role) ordered by id"""
+        connection = self._connection()
+        if ids is None:
+            if role is None:
+                rows = connection.execute("SELECT doc FROM profiles ORDER BY id")
+            else:
+                rows = connection.execute("SELECT doc FROM profiles WHERE role = ? ORDER BY id", (role,))
+            return [orjson.loads(doc) for doc, in rows]
+
+        ids = list({str(student_id) for student_id in ids})
+        profiles = []
+        for start in range(0, len(ids), ID_CHUNK):
+            chunk = ids[start:start + ID_CHUNK]
+            rows = connection.execute(
+                f"SELECT doc FROM profiles WHERE id IN ({', '.join('?' for _ in chunk)})", chunk
+            )
+            profiles.extend(orjson.loads(doc) for doc, in rows)
+        return profiles
+
+    def metrics(self) -> dict:
+        return {
+            "ready": self.ready,
+            "syncing": self.syncing,
+            "lag_seconds": round(self.lag, 1) if self.last_sync else None,
+            "synced_rows": self.synced_rows,
+            "errors": self.errors
+        }
+
+
+local_replica = LocalReplica(settings.REPLICA_PATH, overlap=settings.REPLICA_SYNC_OVERLAP)
+
+
+def replica_ready() -> bool:
+    return settings.REPLICA_ENABLED and local_replica.ready
+
+
+async def read_job(job_id: str) -> Optional[dict]:
+    """A job by id, from the replica when it is ready"""
+    if replica_ready():
+        job = local_replica.job(job_id)
+        if job is not None:
+            return job
+    supabase = get_supabase_client()
+    response = await fetch(supabase.table('jobs').select('*').eq('id', job_id))
+    return response.data[0] if response.data else None
+
+
+async def read_profile(student_id: str) -> Optional[dict]:
+    """A full profile row by id, from the replica when it is ready"""
+    if replica_ready():
+        profile = local_replica.profile(student_id)
+        if profile is not None:
+            return profile
+    supabase = get_supabase_client()
+    response = await fetch(supabase.table('profiles').select('*').eq('id', student_id))
+    return response.data[0] if response.data else None
+
+
+async def read_profiles_by_id(student_ids: List[str], columns: str = PROFILE_JOIN_COLUMNS) -> Dict[str, dict]:
+    """Profiles for the given ids keyed by id, limited to ``columns``.
+
+    Ids missing from the replica (students who signed up since the last
+    sync) are fetched from Supabase.
+    """
+    profiles: Dict[str, dict] = {}
+    missing = list(dict.fromkeys(student_ids))
+    if replica_ready():
+        wanted = [column.strip() for column in columns.split(',')]
+        for profile in local_replica.profiles(missing):
+            profiles[profile['id']] = {column: profile.get(column) for column in wanted}
+        missing = [student_id for student_id in missing if student_id not in profiles]
+
+    if missing:
+        supabase = get_supabase_client()
+        response = await fetch(supabase.table('profiles').select(columns).in_('id', missing))
+        profiles.update({profile['id']: profile for profile in response.data or []})
+    return profiles
@@ -0,0 +1,388 @@
+"""
+Background resume processing and keyword index.
+
+``create_application`` only hands the saved file to ``resume_pipeline``,
+which queues it and returns at once. A background task then:
+
+1. hashes the file (SHA-256); a resume whose hash is already indexed is a
+   duplicate and is only linked to the new upload
+2. extracts its text in the CPU pool: PDFs with the optional ``pypdf``
+   package, DOCX by reading ``word/document.xml`` straight from the zip
+3. stores the text and its keywords in a SQLite index keyed by hash
+   (``RESUME_INDEX_PATH``), together with the upload URL -> hash mapping
+
+Files that do not parse, or whose contents do not match their extension,
+are recorded as ``corrupt``. Legacy ``.doc`` files are recorded as
+``unsupported``. PDFs seen while pypdf is missing are recorded as
+``unavailable`` and retried by the startup backfill, which also queues any
+upload that has not been indexed yet. Only one worker backfills at a time:
+it holds an ``flock`` on ``RESUME_INDEX_PATH.backfill.lock`` until what it
+queued has been processed, and workers that find it held skip the backfill.
+
+``matching_urls`` answers the skills filter on ``/jobs/{job_id}/applications``:
+terms are tokenized like the search index, and multi-word terms must also
+appear as a phrase in the resume text.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zipfile
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from xml.etree import ElementTree
+
+from app.config.settings import settings
+from app.services.offload import cpu_pool
+from app.services.search import tokenize
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+RESUME_URL_PREFIX = "/uploads/resumes/"
+
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_SPACES = re.compile(r"\s+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it of on or the to was were will with
+i me my we our you your he she they their this that these those
+""".split())
+
+# SQLite's default limit on bound parameters is 999
+URL_CHUNK = 900
+
+
+def _docx_text(path: str) -> str:
+    with zipfile.ZipFile(path) as archive:
+        with archive.open('word/document.xml') as document:
+            paragraphs, words = [], []
+            for _, element in ElementTree.iterparse(document):
+                if element.tag == _WORD_NS + 't' and element.text:
+                    words.append(element.text)
+                elif element.tag == _WORD_NS + 'tab':
+                    words.append(' ')
+                elif element.tag == _WORD_NS + 'p':
+                    paragraphs.append(''.join(words))
+                    words = []
+                    element.clear()
+    return '\n'.join(paragraphs)
+
+
+def _pdf_text(path: str, max_pages: int) -> Tuple[str, int]:
+    import pypdf
+
+    reader = pypdf.PdfReader(path)
+    pages = reader.pages
+    return '\n'.join(page.extract_text() or '' for page in pages[:max_pages]), len(pages)
+
+
+def extract_resume(path: str, max_pages: int, max_chars: int) -> dict:
+    """Text and keywords of a resume file (runs in the CPU pool)"""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, 'rb') as handle:
+        head = handle.read(8)
+
+    result = {"status": "ok", "kind": extension.lstrip('.'), "pages": None, "text": "", "keywords": [], "error": None}
+    try:
+        if extension == '.pdf':
+            if not head.startswith(PDF_MAGIC):
+                raise ValueError("not a PDF file")
+            try:
+                import pypdf  # noqa: F401
+            except ImportError:
+                return {**result, "status": "unavailable", "error": "PDF text extraction needs pypdf (pip install pypdf)"}
+            text, result["pages"] = _pdf_text(path, max_pages)
+        elif extension == '.docx':
+            if not head.startswith(ZIP_MAGIC):
+                raise ValueError("not a DOCX file")
+            text = _docx_text(path)
+        elif extension == '.doc':
+            status = "unsupported" if head.startswith(OLE_MAGIC) else "corrupt"
+            return {**result, "status": status, "error": "Legacy .doc files are not indexed" if status == "unsupported" else "not a Word document"}
+        else:
+            return {**result, "status": "unsupported", "error": f"Unsupported file type '{extension}'"}
+    except Exception as e:
+        # Truncated zips, malformed XML and unreadable PDFs all end up here
+        return {**result, "status": "corrupt", "error": f"{type(e).__name__}: {str(e)}"[:500]}
+
+    text = _SPACES.sub(' ', text).strip()[:max_chars]
+    if not text:
+        return {**result, "status": "no_text", "error": "No extractable text (scanned or image-only document?)"}
+    keywords = {token for token in tokenize(text) if token not in STOPWORDS and (len(token) > 1 or token in ('c', 'r'))}
+    return {**result, "text": text, "keywords": sorted(keywords)}
+
+
+def file_hash(path: str) -> Tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+            size += len(block)
+    return digest.hexdigest(), size
+
+
+def parse_terms(value: Optional[str]) -> List[str]:
+    """Comma-separated skills -> normalized terms ("Node.js, machine learning")"""
+    if not value:
+        return []
+    terms = []
+    for part in value.split(','):
+        term = ' '.join(tokenize(part))
+        if term and term not in terms:
+            terms.append(term)
+    return terms
+
+
+class ResumeIndex:
+    """SQLite store of extracted resumes, keyed by content hash"""
+
+    SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS resumes (hash TEXT PRIMARY KEY, status TEXT NOT NULL, kind TEXT, pages INTEGER, "
+        "chars INTEGER, text TEXT, error TEXT, extracted_at REAL)",
+        "CREATE TABLE IF NOT EXISTS resume_files (url TEXT PRIMARY KEY, hash TEXT NOT NULL, size INTEGER, indexed_at REAL)",
+        "CREATE INDEX IF NOT EXISTS resume_files_hash ON resume_files (hash)",
+        "CREATE TABLE IF NOT EXISTS resume_keywords (keyword TEXT NOT NULL, hash TEXT NOT NULL, PRIMARY KEY (keyword, hash)) WITHOUT ROWID"
+    ]
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._ready = False
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+            with self._schema_lock:
+                if not self._ready:
+                    for statement in self.SCHEMA:
+                        connection.execute(statement)
+                    self._ready = True
+        return connection
+
+    def status(self, content_hash: str) -> Optional[str]:
+        row = self._connection().execute("SELECT status FROM resumes WHERE hash = ?", (content_hash,)).fetchone()
+        return row[0] if row else None
+
+    def link(self, url: str, content_hash: str, size: int):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO resume_files (url, hash, size, indexed_at) VALUES (?, ?, ?, ?)",
+            (url, content_hash, size, time.time())
+        )
+
+    def store(self, content_hash: str, result: dict):
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN")
+            connection.execute(
+                "INSERT OR REPLACE INTO resumes (hash, status, kind, pages, chars, text, error, extracted_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (content_hash, result['status'], result['kind'], result['pages'], len(result['text']),
+                 result['text'] or None, result['error'], time.time())
+            )
+            connection.execute("DELETE FROM resume_keywords WHERE hash = ?", (content_hash,))
+            connection.executemany(
+                "INSERT INTO resume_keywords (keyword, hash) VALUES (?, ?)",
+                [(keyword, content_hash) for keyword in result['keywords']]
+            )
+
+    def indexed_urls(self) -> Set[str]:
+        """Uploads already linked to a resume that needs no further work"""
+        rows = self._connection().execute(
+            "SELECT f.url FROM resume_files f JOIN resumes r ON r.hash = f.hash WHERE r.status != 'unavailable'"
+        )
+        return {url for url, in rows}
+
+    def _hashes_with(self, term: str) -> Set[str]:
+        connection = self._connection()
+        tokens = term.split(' ')
+        hashes = None
+        for token in tokens:
+            found = {content_hash for content_hash, in connection.execute(
+                "SELECT hash FROM resume_keywords WHERE keyword = ?", (token,)
+            )}
+            hashes = found if hashes is None else hashes & found
+            if not hashes:
+                return set()
+        if len(tokens) > 1:
+            # Every word is present; keep resumes where they also appear together
+            phrase = re.compile(r'\b' + r'\W+'.join(re.escape(token) for token in tokens) + r'\b', re.IGNORECASE)
+            hashes = {
+                content_hash for content_hash in hashes
+                if phrase.search(connection.execute("SELECT text FROM resumes WHERE hash = ?", (content_hash,)).fetchone()[0] or '')
+            }
+        return hashes
+
+    def matching_urls(self, urls: Iterable[str], terms: List[str], match_all: bool = True) -> Tuple[Dict[str, List[str]], Set[str]]:
+        """Which of ``urls`` match ``terms``.
+
+        Returns ``{url: matched terms}`` for the matches and the set of URLs
+        that have not been processed yet.
+        """
+        urls = [url for url in dict.fromkeys(urls) if url]
+        connection = self._connection()
+        hash_of: Dict[str, str] = {}
+        for start in range(0, len(urls), URL_CHUNK):
+            chunk = urls[start:start + URL_CHUNK]
+            rows = connection.execute(
+                f"SELECT f.url, f.hash FROM resume_files f JOIN resumes r ON r.hash = f.hash "
+                f"WHERE r.status != 'unavailable' AND f.url IN ({', '.join('?' for _ in chunk)})", chunk
+            )
+            hash_of.update(rows)
+        pending = set(urls) - set(hash_of)
+
+        matched_by_term = {term: self._hashes_with(term) for term in terms}
+        matches = {}
+        for url, content_hash in hash_of.items():
+            matched = [term for term in terms if content_hash in matched_by_term[term]]
+            if matched and (not match_all or len(matched) == len(terms)):
+                matches[url] = matched
+        return matches, pending
+
+    def counts(self) -> dict:
+        connection = self._connection()
+        statuses = dict(connection.execute("SELECT status, COUNT(*) FROM resumes GROUP BY status"))
+        files, distinct = connection.execute("SELECT COUNT(*), COUNT(DISTINCT hash) FROM resume_files").fetchone()
+        return {"files": files, "duplicates": files - distinct, "by_status": statuses}
+
+
+class ResumePipeline:
+    def __init__(self, index: ResumeIndex, upload_dir: str, queue_size: int, max_pages: int, max_chars: int):
+        self.index = index
+        self.upload_dir = upload_dir
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self._queue: Optional[asyncio.Queue] = None
+        self._queue_size = queue_size
+        self._worker: Optional[asyncio.Task] = None
+        self._backfill: Optional[asyncio.Task] = None
+        self.processed = 0
+        self.duplicates = 0
+        self.dropped = 0
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.upload_dir, os.path.basename(url))
+
+    def submit(self, resume_url: Optional[str]):
+        """Queue an upload for processing; never blocks the request"""
+        if not resume_url or self._queue is None:
+            return
+        try:
+            self._queue.put_nowait(resume_url)
+        except asyncio.QueueFull:
+            # The next startup backfill picks it up
+            self.dropped += 1
+
+    async def _process(self, url: str):
+        path = self._path(url)
+        if not os.path.exists(path):
+            return
+        content_hash, size = await asyncio.to_thread(file_hash, path)
+        status = await asyncio.to_thread(self.index.status, content_hash)
+        if status is not None and status != 'unavailable':
+            self.duplicates += 1
+        else:
+            result = await cpu_pool.run(extract_resume, path, self.max_pages, self.max_chars)
+            await asyncio.to_thread(self.index.store, content_hash, result)
+            if result['status'] != 'ok':
+                print(f"⚠️ Resume {os.path.basename(path)}: {result['status']} ({result['error']})")
+        await asyncio.to_thread(self.index.link, url, content_hash, size)
+        self.processed += 1
+
+    async def _run(self, queue: asyncio.Queue):
+        # The queue is passed in: stop() drops self._queue while a cancelled item unwinds
+        while True:
+            url = await queue.get()
+            try:
+                await self._process(url)
+            except Exception as e:
+                print(f"❌ Error processing resume {url}: {str(e)}")
+            finally:
+                queue.task_done()
+
+    def _claim_backfill(self) -> Tuple[bool, Optional[int]]:
+        """``(claimed, lock descriptor)``; not claimed while another worker backfills"""
+        if fcntl is None:
+            return True, None
+        directory = os.path.dirname(self.index.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(f"{self.index.path}.backfill.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False, None
+        return True, fd
+
+    async def backfill(self, queue: asyncio.Queue):
+        """Queue every upload that has not been indexed yet, unless another worker is"""
+        claimed, lock_fd = await asyncio.to_thread(self._claim_backfill)
+        if not claimed:
+            print("📄 Another worker is backfilling resumes; skipping")
+            return
+        try:
+            indexed = await asyncio.to_thread(self.index.indexed_urls)
+            names = await asyncio.to_thread(os.listdir, self.upload_dir) if os.path.isdir(self.upload_dir) else []
+            queued = 0
+            for name in sorted(names):
+                url = RESUME_URL_PREFIX + name
+                if url not in indexed and os.path.splitext(name)[1].lower() in ('.pdf', '.doc', '.docx'):
+                    await queue.put(url)
+                    queued += 1
+            if queued:
+                print(f"📄 Queued {queued} unindexed resumes for processing")
+                # Hold the claim until they are indexed, so no other worker queues them again
+                await queue.join()
+        except Exception as e:
+            print(f"⚠️ Resume backfill failed: {str(e)}")
+        finally:
+            if lock_fd is not None:
+                # Closing the descriptor releases the lock
+                os.close(lock_fd)
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self._queue_size)
+        self._worker = asyncio.create_task(self._run(self._queue))
+        self._backfill = asyncio.create_task(self.backfill(self._queue))
+
+    def stop(self):
+        for task in (self._worker, self._backfill):
+            if task is not None:
+                task.cancel()
+        self._worker = self._backfill = None
+        self._queue = None
+
+    def metrics(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "processed": self.processed,
+            "duplicates": self.duplicates,
+            "dropped": self.dropped
+        }
+
+
+resume_index = ResumeIndex(settings.RESUME_INDEX_PATH)
+resume_pipeline = ResumePipeline(
+    resume_index,
+    upload_dir="uploads/resumes",
+    queue_size=settings.RESUME_QUEUE_SIZE,
+    max_pages=settings.RESUME_MAX_PAGES,
+    max_chars=settings.RESUME_MAX_TEXT_CHARS
+)
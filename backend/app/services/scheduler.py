@@ -0,0 +1,102 @@
+"""
+Deadline scheduler.
+
+Keeps every open job in a min-heap ordered by deadline and sleeps until the
+earliest one. When a deadline passes the job is flipped to ``closed`` in
+Supabase and dropped from the job catalog right away, so the active set
+really is active and no request has to parse deadlines. The same loop
+refreshes the catalog periodically to pick up jobs written elsewhere (or,
+with the shared cache, adopts a peer worker's recent load).
+"""
+import asyncio
+import heapq
+import time
+from datetime import datetime
+from threading import Lock
+from typing import List, Optional, Tuple
+
+from app.config.database import get_supabase_client
+from app.config.settings import settings
+from app.services.job_catalog import JobCatalog, job_catalog
+from app.services.search import search_catalog
+
+CLOSED_STATUS = 'closed'
+
+
+class DeadlineScheduler:
+    def __init__(self, catalog: JobCatalog, refresh_interval: float):
+        self.catalog = catalog
+        self.refresh_interval = refresh_interval
+        self._heap: List[Tuple[float, str]] = []
+        # The catalog may schedule jobs from a refresh thread
+        self._heap_lock = Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        catalog.on_job_added(self.schedule)
+
+    def schedule(self, job_id: str, deadline: Optional[float]):
+        """Track ``job_id``; safe to call from any thread"""
+        if deadline is None:
+            return
+        with self._heap_lock:
+            heapq.heappush(self._heap, (deadline, job_id))
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _close_job(self, job_id: str):
+        get_supabase_client().table('jobs').update({
+            'status': CLOSED_STATUS,
+            'updated_at': datetime.utcnow().isoformat()
+        }).eq('id', job_id).eq('status', 'active').execute()
+
+    async def _close_due(self):
+        now = time.time()
+        while True:
+            with self._heap_lock:
+                if not self._heap or self._heap[0][0] > now:
+                    return
+                deadline, job_id = heapq.heappop(self._heap)
+
+            # Skip stale entries (job already gone or its deadline was changed)
+            if self.catalog.deadline(job_id) != deadline:
+                continue
+
+            await asyncio.to_thread(self.catalog.remove, job_id)
+            try:
+                await asyncio.to_thread(self._close_job, job_id)
+                search_catalog.set_job_status(job_id, CLOSED_STATUS)
+                print(f"⏰ Closed job {job_id}: deadline passed")
+            except Exception as e:
+                print(f"❌ Error closing expired job {job_id}: {str(e)}")
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        next_refresh = 0.0
+
+        while True:
+            if time.monotonic() >= next_refresh:
+                try:
+                    # Rebuild the heap from a fresh catalog load
+                    with self._heap_lock:
+                        self._heap = []
+                    await asyncio.to_thread(self.catalog.reload)
+                except Exception as e:
+                    print(f"❌ Error refreshing job catalog: {str(e)}")
+                next_refresh = time.monotonic() + self.refresh_interval
+
+            await self._close_due()
+
+            timeout = next_refresh - time.monotonic()
+            with self._heap_lock:
+                if self._heap:
+                    timeout = min(timeout, self._heap[0][0] - time.time())
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0))
+            except asyncio.TimeoutError:
+                pass
+
+
+deadline_scheduler = DeadlineScheduler(job_catalog, refresh_interval=settings.JOB_CATALOG_REFRESH_INTERVAL)
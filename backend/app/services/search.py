@@ -0,0 +1,344 @@
+"""
+In-process full-text and faceted search over jobs and applicants.
+
+Each ``SearchIndex`` keeps an inverted index (token -> document -> field
+weight) over a few text fields, sorted value lists for numeric range
+facets and exact-match keyword fields. Query tokens match whole words and,
+at a lower score, word prefixes, so "bang" finds "Bangalore".
+
+``SearchCatalog`` owns a job index (company, role, location, description;
+``ctc`` range) and an applicant index with one document per application
+(student name, USN, email, branch; ``cgpa`` range; job and status filters).
+Both are built lazily from Supabase and then updated in place by the write
+paths; updates that arrive while a rebuild is running are replayed onto the
+new index before it is swapped in.
+"""
+import re
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, defaultdict
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.config.database import fetch_all_rows, get_supabase_client
+from app.config.settings import settings
+from app.services.profiles import profile_directory
+
+_TOKEN = re.compile(r"[a-z0-9+#.]+")
+MIN_PREFIX = 2
+PREFIX_WEIGHT = 0.5
+
+
+def tokenize(text) -> List[str]:
+    if text is None:
+        return []
+    return [token.strip('.') for token in _TOKEN.findall(str(text).lower()) if token.strip('.')]
+
+
+def _number(value) -> Optional[float]:
+    try:
+        return float(value) if value is not None and value != '' else None
+    except (TypeError, ValueError):
+        return None
+
+
+class SearchIndex:
+    def __init__(
+        self,
+        text_fields: Dict[str, float],
+        numeric_fields: Iterable[str] = (),
+        keyword_fields: Iterable[str] = ()
+    ):
+        self.text_fields = text_fields
+        self.numeric_fields = tuple(numeric_fields)
+        self.keyword_fields = tuple(keyword_fields)
+        self._docs: Dict[str, dict] = {}
+        self._doc_tokens: Dict[str, Dict[str, float]] = {}
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._vocabulary: List[str] = []
+        self._numeric: Dict[str, List[Tuple[float, str]]] = {field: [] for field in self.numeric_fields}
+        self._keywords: Dict[str, Dict[str, set]] = {field: defaultdict(set) for field in self.keyword_fields}
+
+    def __len__(self):
+        return len(self._docs)
+
+    def get(self, doc_id: str) -> Optional[dict]:
+        return self._docs.get(doc_id)
+
+    def add(self, doc_id: str, doc: dict):
+        """Index ``doc`` (replacing any previous version)"""
+        if doc_id in self._docs:
+            self.remove(doc_id)
+        self._docs[doc_id] = doc
+
+        weights = Counter()
+        for field, weight in self.text_fields.items():
+            for token in set(tokenize(doc.get(field))):
+                weights[token] += weight
+        self._doc_tokens[doc_id] = weights
+        for token, weight in weights.items():
+            if not self._postings.get(token):
+                insort(self._vocabulary, token)
+            self._postings[token][doc_id] = weight
+
+        for field in self.numeric_fields:
+            value = _number(doc.get(field))
+            if value is not None:
+                insort(self._numeric[field], (value, doc_id))
+
+        for field in self.keyword_fields:
+            value = doc.get(field)
+            if value is not None:
+                self._keywords[field][str(value).lower()].add(doc_id)
+
+    def remove(self, doc_id: str):
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+
+        for token in self._doc_tokens.pop(doc_id, {}):
+            postings = self._postings[token]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[token]
+                position = bisect_left(self._vocabulary, token)
+                if position < len(self._vocabulary) and self._vocabulary[position] == token:
+                    del self._vocabulary[position]
+
+        for field in self.numeric_fields:
+            value = _number(doc.get(field))
+            if value is not None:
+                values = self._numeric[field]
+                position = bisect_left(values, (value, doc_id))
+                if position < len(values) and values[position] == (value, doc_id):
+                    del values[position]
+
+        for field in self.keyword_fields:
+            value = doc.get(field)
+            if value is not None:
+                self._keywords[field][str(value).lower()].discard(doc_id)
+
+    def update(self, doc_id: str, **changes):
+        """Re-index a document with some fields changed"""
+        doc = self._docs.get(doc_id)
+        if doc is not None:
+            self.add(doc_id, {**doc, **changes})
+
+    def _token_scores(self, token: str) -> Dict[str, float]:
+        scores = dict(self._postings.get(token, {}))
+        if len(token) >= MIN_PREFIX:
+            position = bisect_right(self._vocabulary, token)
+            while position < len(self._vocabulary) and self._vocabulary[position].startswith(token):
+                for doc_id, weight in self._postings[self._vocabulary[position]].items():
+                    scores[doc_id] = max(scores.get(doc_id, 0), weight * PREFIX_WEIGHT)
+                position += 1
+        return scores
+
+    def _in_range(self, field: str, minimum: Optional[float], maximum: Optional[float]) -> set:
+        values = self._numeric[field]
+        start = 0 if minimum is None else bisect_left(values, (minimum, ''))
+        end = len(values) if maximum is None else bisect_right(values, (maximum, '\uffff'))
+        return {doc_id for _, doc_id in values[start:end]}
+
+    def search(
+        self,
+        query: str = '',
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+        filters: Optional[Dict[str, str]] = None,
+        limit: int = 20,
+        offset: int = 0,
+        facet_fields: Iterable[str] = ()
+    ) -> dict:
+        """Documents matching every query token, range and filter, best first"""
+        scores: Optional[Dict[str, float]] = None
+        for token in tokenize(query):
+            token_scores = self._token_scores(token)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {doc_id: score + token_scores[doc_id] for doc_id, score in scores.items() if doc_id in token_scores}
+            if not scores:
+                break
+
+        candidates = set(self._docs) if scores is None else set(scores)
+        for field, (minimum, maximum) in (ranges or {}).items():
+            if minimum is not None or maximum is not None:
+                candidates &= self._in_range(field, minimum, maximum)
+        for field, value in (filters or {}).items():
+            if value is not None:
+                candidates &= self._keywords[field].get(str(value).lower(), set())
+
+        ranked = sorted(candidates, key=lambda doc_id: (-(scores or {}).get(doc_id, 0), doc_id))
+
+        facets = {}
+        for field in facet_fields:
+            if field in self._keywords:
+                counts = Counter(self._docs[doc_id].get(field) for doc_id in candidates)
+                counts.pop(None, None)
+                facets[field] = dict(counts.most_common())
+            elif field in self._numeric:
+                values = [_number(self._docs[doc_id].get(field)) for doc_id in candidates]
+                values = [value for value in values if value is not None]
+                facets[field] = {"min": min(values), "max": max(values)} if values else {"min": None, "max": None}
+
+        return {
+            "total": len(ranked),
+            "results": [
+                {**self._docs[doc_id], "score": round((scores or {}).get(doc_id, 0), 3)}
+                for doc_id in ranked[offset:offset + limit]
+            ],
+            "facets": facets
+        }
+
+
+def job_document(job: dict) -> dict:
+    return {
+        "id": job['id'],
+        "company_name": job.get('company_name'),
+        "role": job.get('role'),
+        "location": job.get('location'),
+        "job_type": job.get('job_type'),
+        "job_description": job.get('job_description'),
+        "ctc": job.get('ctc'),
+        "min_cgpa": job.get('min_cgpa'),
+        "deadline": job.get('deadline'),
+        "status": job.get('status'),
+        "created_at": job.get('created_at')
+    }
+
+
+def applicant_document(application: dict, profile: Optional[dict]) -> dict:
+    profile = profile or {}
+    return {
+        "application_id": application['id'],
+        "job_id": application.get('job_id'),
+        "student_id": application.get('student_id'),
+        "status": application.get('status') or 'applied',
+        "applied_at": application.get('applied_at'),
+        "full_name": profile.get('full_name'),
+        "usn": profile.get('usn'),
+        "email": profile.get('email'),
+        "branch": profile.get('branch'),
+        "cgpa": profile.get('cgpa')
+    }
+
+
+def new_job_index() -> SearchIndex:
+    return SearchIndex(
+        text_fields={"role": 3.0, "company_name": 3.0, "location": 2.0, "job_type": 1.0, "job_description": 1.0},
+        numeric_fields=("ctc", "min_cgpa"),
+        keyword_fields=("status", "job_type", "location")
+    )
+
+
+def new_applicant_index() -> SearchIndex:
+    return SearchIndex(
+        text_fields={"full_name": 3.0, "usn": 3.0, "email": 2.0, "branch": 1.0},
+        numeric_fields=("cgpa",),
+        keyword_fields=("job_id", "status", "branch")
+    )
+
+
+class _ManagedIndex:
+    """An index that is rebuilt from a loader and patched in place between rebuilds"""
+
+    def __init__(self, factory: Callable[[], SearchIndex], loader: Callable[[SearchIndex], None], ttl: float):
+        self.factory = factory
+        self.loader = loader
+        self.ttl = ttl
+        self.index: Optional[SearchIndex] = None
+        self.loaded_at = 0.0
+        self._lock = Lock()
+        self._rebuild_lock = Lock()
+        self._replay: Optional[List[Callable[[SearchIndex], None]]] = None
+
+    def apply(self, change: Callable[[SearchIndex], None]):
+        with self._lock:
+            if self.index is not None:
+                change(self.index)
+            if self._replay is not None:
+                self._replay.append(change)
+
+    def rebuild(self):
+        with self._rebuild_lock:
+            with self._lock:
+                self._replay = []
+            try:
+                index = self.factory()
+                self.loader(index)
+            except Exception:
+                with self._lock:
+                    self._replay = None
+                raise
+            with self._lock:
+                for change in self._replay:
+                    change(index)
+                self._replay = None
+                self.index = index
+                self.loaded_at = time.monotonic()
+
+    def ensure_loaded(self, stale: bool = False):
+        if self.index is None or stale or time.monotonic() - self.loaded_at > self.ttl:
+            self.rebuild()
+
+    def search(self, **kwargs) -> dict:
+        with self._lock:
+            return self.index.search(**kwargs)
+
+
+class SearchCatalog:
+    def __init__(self, ttl: float):
+        self.jobs = _ManagedIndex(new_job_index, self._load_jobs, ttl)
+        self.applicants = _ManagedIndex(new_applicant_index, self._load_applicants, ttl)
+        self._profile_generation = 0
+
+    def _load_jobs(self, index: SearchIndex):
+        supabase = get_supabase_client()
+        jobs = fetch_all_rows(lambda: supabase.table('jobs').select('*').order('id'))
+        for job in jobs:
+            index.add(job['id'], job_document(job))
+        print(f"🔍 Indexed {len(jobs)} jobs for search")
+
+    def _load_applicants(self, index: SearchIndex):
+        supabase = get_supabase_client()
+        profile_directory.ensure_fresh()
+        self._profile_generation = profile_directory.generation
+        applications = fetch_all_rows(
+            lambda: supabase.table('applications').select('id, job_id, student_id, status, applied_at').order('id')
+        )
+        for application in applications:
+            index.add(application['id'], applicant_document(application, profile_directory.get(application['student_id'])))
+        print(f"🔍 Indexed {len(applications)} applications for applicant search")
+
+    def ensure_jobs(self):
+        self.jobs.ensure_loaded()
+
+    def ensure_applicants(self):
+        # Profile edits arrive through snapshot refreshes, so rebuild when it moves
+        self.applicants.ensure_loaded(stale=profile_directory.generation != self._profile_generation)
+
+    def add_job(self, job: dict):
+        document = job_document(job)
+        self.jobs.apply(lambda index: index.add(document['id'], document))
+
+    def set_job_status(self, job_id: str, status: str):
+        self.jobs.apply(lambda index: index.update(job_id, status=status))
+
+    def add_application(self, application: dict, profile: Optional[dict] = None):
+        document = applicant_document(application, profile or profile_directory.get(application['student_id']))
+        self.applicants.apply(lambda index: index.add(document['application_id'], document))
+
+    def set_application_status(self, application_id: str, status: str):
+        self.applicants.apply(lambda index: index.update(application_id, status=status))
+
+    def remove_applications(self, application_ids: Iterable[str]):
+        application_ids = list(application_ids)
+
+        def remove(index: SearchIndex):
+            for application_id in application_ids:
+                index.remove(application_id)
+
+        self.applicants.apply(remove)
+
+
+search_catalog = SearchCatalog(ttl=settings.SEARCH_INDEX_TTL)
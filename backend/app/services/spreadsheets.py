@@ -0,0 +1,157 @@
+"""
+CPU-bound spreadsheet work executed in the process pool.
+
+These functions run in child processes (see ``app.services.offload``), so
+they only take and return compact, picklable values: raw file bytes in,
+identifier tuples or encoded bytes out. Heavy libraries are imported inside
+the functions so the API process never pays for them.
+"""
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+from typing import List, Optional, Sequence, Tuple
+
+EMAIL_COLUMNS = ['email', 'e-mail', 'mail']
+USN_COLUMNS = ['usn', 'roll_no', 'roll_number', 'roll no', 'student_id']
+NAME_COLUMNS = ['name', 'full_name', 'full name', 'student name', 'student_name', 'candidate name']
+
+
+class SpreadsheetError(ValueError):
+    """The uploaded file cannot be used (reported to the client as a 400)"""
+
+
+def parse_shortlist(
+    content: bytes, file_extension: str
+) -> Tuple[List[int], List[Tuple[Optional[str], Optional[str], Optional[str]]]]:
+    """Parse a shortlist file into normalized ``(email, usn, name)`` tuples,
+    with the spreadsheet line number of each"""
+    import pandas as pd
+
+    if file_extension == '.csv':
+        # Keep blank lines so the index still maps to the line in the file
+        df = pd.read_csv(io.StringIO(content.decode('utf-8')), dtype=str, skip_blank_lines=False)
+    else:
+        df = pd.read_excel(io.BytesIO(content), dtype=str)
+
+    if df.empty:
+        raise SpreadsheetError("The uploaded file is empty")
+
+    def find_column(candidates):
+        return next((col for col in df.columns if str(col).strip().lower() in candidates), None)
+
+    email_col = find_column(EMAIL_COLUMNS)
+    usn_col = find_column(USN_COLUMNS)
+    name_col = find_column(NAME_COLUMNS)
+
+    if email_col is None and usn_col is None and name_col is None:
+        raise SpreadsheetError("File must contain an 'email', 'usn' or 'name' column for student identification")
+
+    def column(col, lower=False):
+        # Column-wise normalization instead of a per-row Python loop
+        if col is None:
+            return [None] * len(df)
+        values = df[col].str.strip()
+        if lower:
+            values = values.str.lower()
+        return values.where(values.notna() & (values != ''), None).tolist()
+
+    lines, identifiers = [], []
+    for position, email, usn, name in zip(df.index, column(email_col, lower=True), column(usn_col), column(name_col)):
+        if email is not None or usn is not None or name is not None:
+            # Line 1 is the header
+            lines.append(int(position) + 2)
+            identifiers.append((email, usn, name))
+    return lines, identifiers
+
+
+def build_export(header: Sequence[str], rows: List[tuple], export_format: str) -> bytes:
+    """Encode projected export rows as CSV or XLSX bytes"""
+    if export_format == 'xlsx':
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Applications")
+        sheet.append(list(header))
+        for row in rows:
+            sheet.append(list(row))
+
+        output = io.BytesIO()
+        workbook.save(output)
+        return output.getvalue()
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return output.getvalue().encode('utf-8')
+
+
+JOB_COLUMN_ALIASES = {
+    'company': 'company_name', 'company name': 'company_name',
+    'job role': 'role', 'designation': 'role', 'position': 'role',
+    'type': 'job_type', 'job type': 'job_type', 'category': 'job_type',
+    'branches': 'eligible_branches', 'eligible branches': 'eligible_branches',
+    'cgpa': 'min_cgpa', 'min cgpa': 'min_cgpa', 'cgpa cutoff': 'min_cgpa',
+    'backlogs': 'max_active_backlogs', 'max backlogs': 'max_active_backlogs',
+    'last date': 'deadline', 'apply by': 'deadline',
+    'description': 'job_description', 'job description': 'job_description',
+    'process': 'process_details', 'selection process': 'process_details',
+    'rule': 'eligibility_rule', 'eligibility rule': 'eligibility_rule'
+}
+
+# jobs.ctc is in ₹/year; columns labelled in lakhs per annum are converted
+LPA_COLUMNS = {'ctc (lpa)', 'ctc lpa', 'ctc in lpa', 'package (lpa)', 'package lpa', 'package in lpa', 'lpa'}
+RUPEES_PER_LAKH = 100000
+
+
+def _lpa_to_rupees(value: str):
+    """``'12.5'`` LPA -> ``1250000``; anything else is left for validation to report"""
+    try:
+        rupees = Decimal(value.replace(',', '').strip()) * RUPEES_PER_LAKH
+    except InvalidOperation:
+        return value
+    return int(rupees) if rupees == rupees.to_integral_value() else float(rupees)
+
+
+def parse_job_sheet(content: bytes, file_extension: str) -> Tuple[List[int], List[dict]]:
+    """Rows of a job posting CSV/XLSX as dicts keyed by ``jobs`` column name,
+    with the spreadsheet line number of each row"""
+    import pandas as pd
+
+    if file_extension == '.csv':
+        # Keep blank lines so the index still maps to the line in the file
+        df = pd.read_csv(
+            io.StringIO(content.decode('utf-8-sig')), dtype=str, keep_default_na=False, skip_blank_lines=False
+        )
+    else:
+        df = pd.read_excel(io.BytesIO(content), dtype=str, keep_default_na=False)
+
+    if df.empty:
+        raise SpreadsheetError("The uploaded file is empty")
+
+    def normalize(col):
+        return ' '.join(str(col).strip().lower().replace('_', ' ').split())
+
+    def column_name(name):
+        if name in LPA_COLUMNS:
+            return 'ctc'
+        return JOB_COLUMN_ALIASES.get(name, name.replace(' ', '_'))
+
+    names = [normalize(col) for col in df.columns]
+    if 'package' in names:
+        raise SpreadsheetError("Ambiguous 'package' column: name it 'ctc' (₹/year) or 'ctc (lpa)' (lakhs per annum)")
+    df.columns = [column_name(name) for name in names]
+    if 'company_name' not in df.columns or 'role' not in df.columns:
+        raise SpreadsheetError("File must contain 'company_name' and 'role' columns")
+
+    lpa = next((name in LPA_COLUMNS for name, col in zip(names, df.columns) if col == 'ctc'), False)
+    df = df.loc[:, ~df.columns.duplicated()]
+    # Drop fully blank rows; empty cells become None so model defaults apply
+    df = df[(df.apply(lambda col: col.str.strip()) != '').any(axis=1)]
+    if lpa:
+        df['ctc'] = df['ctc'].map(lambda value: _lpa_to_rupees(value) if value.strip() else value)
+    lines = [int(position) + 2 for position in df.index]
+    return lines, [
+        {key: (value if not isinstance(value, str) or value.strip() else None) for key, value in row.items()}
+        for row in df.to_dict(orient='records')
+    ]
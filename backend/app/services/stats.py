@@ -0,0 +1,179 @@
+"""
+Incrementally maintained placement counters.
+
+The admin dashboard needs applications per job, per status and per branch
+plus the overall placement rate. Instead of downloading every application
+and counting on each load, the write paths (new applications, status
+updates, shortlist uploads) bump these counters in place and a periodic
+reconciliation rebuilds them from Supabase to correct any drift.
+"""
+import asyncio
+from collections import Counter, defaultdict
+from datetime import datetime
+from threading import Lock
+from typing import Optional
+
+from app.config.database import fetch_all_rows, get_supabase_client
+from app.services.profiles import profile_directory
+from app.services.replica import local_replica, read_profile, replica_ready
+
+PLACED_STATUS = 'selected'
+UNKNOWN_BRANCH = 'Unknown'
+
+
+class PlacementStats:
+    """In-memory counters keyed by job, status and branch"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._reset()
+        self.reconciled_at: Optional[str] = None
+
+    def _reset(self):
+        # application id -> (job_id, student_id, status)
+        self._applications = {}
+        # student id -> branch
+        self._branches = {}
+        self._per_job = defaultdict(Counter)
+        self._per_branch = defaultdict(Counter)
+        self._per_status = Counter()
+        # student id -> number of applications in the placed status
+        self._placed = Counter()
+        self._total_students = 0
+
+    def _add(self, job_id, student_id, status, delta):
+        branch = self._branches.get(student_id) or UNKNOWN_BRANCH
+        self._per_job[job_id][status] += delta
+        self._per_branch[branch][status] += delta
+        self._per_status[status] += delta
+        if status == PLACED_STATUS:
+            self._placed[student_id] += delta
+            if self._placed[student_id] <= 0:
+                del self._placed[student_id]
+
+    def _known_branch(self, student_id: str) -> Optional[str]:
+        """A student's branch from memory, the profile snapshot or the replica (never the network)"""
+        branch = self._branches.get(student_id)
+        if branch is not None:
+            return branch
+        profile = profile_directory.get(student_id)
+        if profile is None and replica_ready():
+            profile = local_replica.profile(student_id)
+        return profile.get('branch') or UNKNOWN_BRANCH if profile else None
+
+    async def resolve_branch(self, student_id: str) -> str:
+        """A student's branch for a new application, fetched without blocking the event loop"""
+        branch = self._known_branch(student_id)
+        if branch is not None:
+            return branch
+        try:
+            profile = await read_profile(student_id)
+        except Exception as e:
+            print(f"⚠️ Could not resolve branch for student {student_id}: {str(e)}")
+            return UNKNOWN_BRANCH
+        return (profile.get('branch') if profile else None) or UNKNOWN_BRANCH
+
+    def record_application(self, application: dict, branch: Optional[str] = None):
+        """Count a newly created application.
+
+        Without ``branch`` only local lookups are tried; a student they do
+        not know is counted under ``Unknown`` until the next reconciliation.
+        """
+        if branch is None:
+            branch = self._known_branch(application['student_id']) or UNKNOWN_BRANCH
+        with self._lock:
+            if application['student_id'] not in self._branches:
+                self._total_students += 1
+            self._branches[application['student_id']] = branch
+
+        with self._lock:
+            previous = self._applications.get(application['id'])
+            if previous:
+                self._add(*previous, -1)
+            entry = (application['job_id'], application['student_id'], application.get('status') or 'applied')
+            self._applications[application['id']] = entry
+            self._add(*entry, 1)
+
+    def status_of(self, application_id: str) -> Optional[str]:
+        """Last known status of an application, if it has been seen"""
+        with self._lock:
+            entry = self._applications.get(application_id)
+        return entry[2] if entry else None
+
+    def record_status_change(self, application_id: str, status: str, application: Optional[dict] = None):
+        """Move an application from its previous status to ``status``"""
+        with self._lock:
+            previous = self._applications.get(application_id)
+            if previous is not None:
+                job_id, student_id, old_status = previous
+                if old_status != status:
+                    self._add(job_id, student_id, old_status, -1)
+                    self._applications[application_id] = (job_id, student_id, status)
+                    self._add(job_id, student_id, status, 1)
+                return
+
+        # Not seen yet (e.g. created after the last reconciliation on another worker)
+        if application:
+            self.record_application({**application, 'id': application_id, 'status': status})
+
+    def reconcile(self):
+        """Rebuild every counter from Supabase"""
+        supabase = get_supabase_client()
+
+        profiles = fetch_all_rows(
+            lambda: supabase.table('profiles').select('id, branch').eq('role', 'student').order('id')
+        )
+        applications = fetch_all_rows(
+            lambda: supabase.table('applications').select('id, job_id, student_id, status').order('id')
+        )
+
+        with self._lock:
+            self._reset()
+            self._branches = {profile['id']: profile.get('branch') or UNKNOWN_BRANCH for profile in profiles}
+            self._total_students = len(self._branches)
+            for application in applications:
+                entry = (application['job_id'], application['student_id'], application.get('status') or 'applied')
+                self._applications[application['id']] = entry
+                self._add(*entry, 1)
+            self.reconciled_at = datetime.utcnow().isoformat()
+
+        print(f"📊 Reconciled placement stats: {len(applications)} applications, {len(profiles)} students")
+
+    async def run_reconciliation(self, interval: float):
+        """Reconcile on startup and then every ``interval`` seconds"""
+        while True:
+            try:
+                await asyncio.to_thread(self.reconcile)
+            except Exception as e:
+                print(f"❌ Error reconciling placement stats: {str(e)}")
+            await asyncio.sleep(interval)
+
+    def snapshot(self) -> dict:
+        """Current aggregates in a JSON-friendly shape"""
+        with self._lock:
+            per_job = {
+                job_id: {"total": sum(statuses.values()), "by_status": dict(+statuses)}
+                for job_id, statuses in self._per_job.items()
+                if sum(statuses.values()) > 0
+            }
+            per_branch = {
+                branch: {"total": sum(statuses.values()), "by_status": dict(+statuses)}
+                for branch, statuses in self._per_branch.items()
+                if sum(statuses.values()) > 0
+            }
+            placed_students = len(self._placed)
+            total_students = self._total_students
+
+            return {
+                "total_applications": len(self._applications),
+                "by_status": dict(+self._per_status),
+                "by_job": per_job,
+                "by_branch": per_branch,
+                "placed_students": placed_students,
+                "total_students": total_students,
+                "placement_rate": round(placed_students / total_students, 4) if total_students else 0.0,
+                "reconciled_at": self.reconciled_at
+            }
+
+
+placement_stats = PlacementStats()
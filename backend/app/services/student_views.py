@@ -0,0 +1,121 @@
+"""
+Versioned cache of each student's rendered applications list.
+
+A student's applications only change when they apply, when an admin
+updates a status or when a shortlist is uploaded; those write paths call
+``bump``. The rendered payload is cached per student together with the
+version it was built for and a content ETag, so dashboard reloads are
+answered from memory (or with a 304) without touching Supabase.
+
+Versions are per process. Entries also expire after ``ttl`` seconds, which
+bounds how stale a worker that did not see the write can be.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from email.utils import formatdate
+from threading import Lock
+from typing import Dict, NamedTuple, Optional
+
+from app.config.database import fetch_raw, get_supabase_client
+from app.config.settings import settings
+from app.utils.responses import raw_json_envelope
+
+# Applications with the job details the dashboard shows
+APPLICATIONS_SELECT = '''
+    *,
+    jobs (
+        id,
+        company_name,
+        role,
+        location,
+        ctc,
+        deadline
+    )
+'''
+
+
+class CachedView(NamedTuple):
+    version: int
+    payload: bytes
+    etag: str
+    last_modified: str
+    cached_at: float
+
+
+class StudentViewCache:
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = Lock()
+        self._versions: Dict[str, int] = {}
+        self._modified: Dict[str, float] = {}
+        self._views: "OrderedDict[str, CachedView]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, student_id: str) -> int:
+        return self._versions.get(student_id, 0)
+
+    def bump(self, *student_ids: str):
+        """Mark the students' applications as changed"""
+        now = time.time()
+        with self._lock:
+            for student_id in student_ids:
+                if not student_id:
+                    continue
+                self._versions[student_id] = self._versions.get(student_id, 0) + 1
+                self._modified[student_id] = now
+                self._views.pop(student_id, None)
+
+    def get(self, student_id: str) -> Optional[CachedView]:
+        with self._lock:
+            view = self._views.get(student_id)
+            if (
+                view is None
+                or view.version != self._versions.get(student_id, 0)
+                or time.monotonic() - view.cached_at > self.ttl
+            ):
+                self.misses += 1
+                return None
+            self._views.move_to_end(student_id)
+            self.hits += 1
+            return view
+
+    def store(self, student_id: str, version: int, payload: bytes) -> CachedView:
+        """Cache ``payload`` rendered for ``version`` (read before fetching)"""
+        etag = f'W/"{hashlib.blake2b(payload, digest_size=12).hexdigest()}"'
+        modified = self._modified.get(student_id, time.time())
+        view = CachedView(version, payload, etag, formatdate(modified, usegmt=True), time.monotonic())
+
+        with self._lock:
+            # A write landed while we were fetching: serve this payload once but don't cache it
+            if version != self._versions.get(student_id, 0):
+                return view
+            self._views[student_id] = view
+            self._views.move_to_end(student_id)
+            while len(self._views) > self.max_entries:
+                self._views.popitem(last=False)
+        return view
+
+    async def load(self, student_id: str) -> CachedView:
+        """Cached view, or fetch the student's applications and cache them"""
+        view = self.get(student_id)
+        if view is not None:
+            return view
+
+        # Read the version first so a write racing with this fetch is not cached
+        version = self.version(student_id)
+
+        # Passed through undecoded; the payload is the response body as is
+        raw_applications, _ = await fetch_raw(
+            get_supabase_client().table('applications').select(APPLICATIONS_SELECT)
+            .eq('student_id', student_id).order('applied_at.desc')
+        )
+        return self.store(student_id, version, raw_json_envelope(raw_applications))
+
+
+student_views = StudentViewCache(
+    max_entries=settings.STUDENT_VIEW_CACHE_SIZE,
+    ttl=settings.STUDENT_VIEW_CACHE_TTL
+)
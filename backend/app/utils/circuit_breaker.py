@@ -0,0 +1,111 @@
+"""
+Circuit breaker for the Supabase connection.
+
+After ``failure_threshold`` consecutive failures (timeouts, connection
+errors, 5xx responses) the breaker opens and calls fail immediately for
+``reset_timeout`` seconds instead of piling up on a struggling upstream.
+It then lets a single probe through (half-open): success closes it again,
+failure re-opens it for another period.
+
+Also keeps recent call latencies for the health endpoint.
+"""
+import time
+from collections import deque
+from threading import Lock
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"Upstream unavailable, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, latency_window: int = 200):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._latencies = deque(maxlen=latency_window)
+        self.last_error = None
+        self.rejected = 0
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def before_call(self) -> bool:
+        """Raise ``CircuitOpenError`` unless a call may go upstream now.
+
+        Returns True when the call is the half-open probe; the caller must
+        then ``end_probe()`` once it finishes, however it finishes.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return False
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if remaining <= 0 and not self._probe_in_flight:
+                self._state = HALF_OPEN
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            raise CircuitOpenError(max(remaining, 1.0))
+
+    def end_probe(self):
+        """Let the next call probe again if this probe ended without a verdict"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+            self._failures = 0
+            self._state = CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self, error: str, latency: float = None):
+        with self._lock:
+            if latency is not None:
+                self._latencies.append(latency)
+            self.last_error = error
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.trips += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def metrics(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            failures = self._failures
+            last_error = self.last_error
+
+        def percentile(fraction):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000, 1) if latencies else None
+
+        return {
+            "state": self.state,
+            "consecutive_failures": failures,
+            "trips": self.trips,
+            "rejected_calls": self.rejected,
+            "last_error": last_error,
+            "latency_ms": {
+                "samples": len(latencies),
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(latencies[-1] * 1000, 1) if latencies else None
+            }
+        }
@@ -0,0 +1,41 @@
+"""
+Response helpers for the JSON fast path.
+
+Routes return ``ORJSONResponse`` so payloads are encoded with orjson instead
+of the stdlib encoder. List endpoints that hand PostgREST rows back
+unchanged can skip decoding entirely and splice the raw body into the usual
+``{"success": true, "data": ...}`` envelope with ``raw_json_response``.
+"""
+from typing import Optional
+
+import orjson
+from fastapi.responses import Response
+
+
+class RawJSONResponse(Response):
+    """Response whose body is already-encoded JSON bytes"""
+    media_type = "application/json"
+
+
+def raw_json_envelope(raw_data: bytes, **fields) -> bytes:
+    """Encode the envelope with pre-encoded JSON ``raw_data`` as its ``data`` member"""
+    head = orjson.dumps({"success": True, **fields})
+    return head[:-1] + b',"data":' + raw_data + b'}'
+
+
+def raw_json_response(raw_data: bytes, status_code: int = 200, **fields) -> RawJSONResponse:
+    """Wrap pre-encoded JSON ``raw_data`` as the ``data`` member of the envelope"""
+    return RawJSONResponse(content=raw_json_envelope(raw_data, **fields), status_code=status_code)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches ``etag`` (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    return any(
+        (candidate[2:] if candidate.startswith('W/') else candidate) == opaque
+        for candidate in (part.strip() for part in if_none_match.split(','))
+    )
@@ -0,0 +1,142 @@
+"""
+Memory-mapped snapshots shared by all worker processes on a host.
+
+Each snapshot has a tiny header file holding its current generation (a
+64-bit counter) and one data file per generation::
+
+    SHARED_CACHE_DIR/jobs.gen
+    SHARED_CACHE_DIR/jobs.42.snap
+
+A writer takes an exclusive ``flock`` on the header, writes the next
+generation's data under a temporary name, renames it into place and only
+then stores the new generation in the header, so a reader can never see a
+generation whose data is incomplete. Writers that derive the new value
+from the current one hold ``lock()`` across the read and the publish, so
+concurrent updates from different workers are not lost.
+
+Readers keep the header mapped, so checking for a newer generation is one
+8-byte read from shared memory with no system call. When it moved, the new
+data file is mapped read-only and decoded straight from the mapping,
+without copying it into a bytes object. Superseded data files are unlinked
+a few generations later; mappings already open stay valid.
+
+``flock`` is POSIX only; ``available`` is False elsewhere and callers keep
+their per-process caches.
+"""
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from threading import Lock, RLock
+from typing import Any, Callable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+HEADER = struct.Struct('<Q')
+KEEP_GENERATIONS = 3
+
+available = fcntl is not None
+
+
+class SharedSnapshot:
+    def __init__(self, directory: str, name: str):
+        self.directory = directory
+        self.name = name
+        self._fd: Optional[int] = None
+        self._header: Optional[mmap.mmap] = None
+        self._open_lock = Lock()
+        self._write_lock = RLock()
+        self._depth = 0
+        self.published = 0
+        self.loaded = 0
+
+    def _header_map(self) -> mmap.mmap:
+        if self._header is None:
+            with self._open_lock:
+                if self._header is None:
+                    os.makedirs(self.directory, exist_ok=True)
+                    fd = os.open(os.path.join(self.directory, f"{self.name}.gen"), os.O_RDWR | os.O_CREAT, 0o600)
+                    if os.fstat(fd).st_size < HEADER.size:
+                        os.ftruncate(fd, HEADER.size)
+                    self._header = mmap.mmap(fd, HEADER.size)
+                    self._fd = fd
+        return self._header
+
+    def _data_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"{self.name}.{generation}.snap")
+
+    @property
+    def generation(self) -> int:
+        """Latest published generation (0 if nothing was published yet)"""
+        return HEADER.unpack_from(self._header_map(), 0)[0]
+
+    @contextmanager
+    def lock(self):
+        """Exclusive writer lock across worker processes (re-entrant within one)"""
+        self._header_map()
+        # flock does not exclude threads sharing the descriptor, so pair it with an RLock
+        with self._write_lock:
+            self._depth += 1
+            if self._depth == 1:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def publish(self, payload: bytes) -> int:
+        """Store ``payload`` as the next generation; returns that generation"""
+        header = self._header_map()
+        with self.lock():
+            generation = HEADER.unpack_from(header, 0)[0] + 1
+            path = self._data_path(generation)
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, 'wb') as data:
+                data.write(payload)
+            os.replace(temporary, path)
+            HEADER.pack_into(header, 0, generation)
+
+            stale = self._data_path(generation - KEEP_GENERATIONS)
+            if os.path.exists(stale):
+                os.remove(stale)
+        self.published += 1
+        return generation
+
+    def read(self, decode: Callable[[memoryview], Any]) -> Tuple[int, Any]:
+        """``(generation, decode(data))`` for the latest generation, ``(0, None)`` if none"""
+        for _ in range(KEEP_GENERATIONS):
+            generation = self.generation
+            if generation == 0:
+                return 0, None
+            try:
+                with open(self._data_path(generation), 'rb') as data:
+                    with mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        view = memoryview(mapped)
+                        try:
+                            value = decode(view)
+                        finally:
+                            view.release()
+                self.loaded += 1
+                return generation, value
+            except FileNotFoundError:
+                # Superseded and cleaned up between reading the header and opening it
+                continue
+        raise RuntimeError(f"Shared snapshot {self.name} keeps changing, giving up")
+
+    def metrics(self) -> dict:
+        return {"generation": self.generation, "published": self.published, "loaded": self.loaded}
+
+
+def open_snapshot(directory: str, name: str, enabled: bool = True) -> Optional[SharedSnapshot]:
+    """The snapshot ``name`` under ``directory``, or None when sharing is off or unsupported"""
+    if not enabled:
+        return None
+    if not available:
+        print(f"⚠️ Shared {name} cache needs flock, which this platform lacks; keeping it per worker")
+        return None
+    return SharedSnapshot(directory, name)
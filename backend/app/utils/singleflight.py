@@ -0,0 +1,46 @@
+"""
+Single-flight request coalescing.
+
+When many requests ask for the same thing at the same moment (hundreds of
+students opening a freshly announced job), only the first caller runs the
+upstream call; everyone else awaits that same result. Keys are dropped as
+soon as the call finishes, so this never serves stale data; it only merges
+calls that overlap in time.
+
+Results are shared between callers and must be treated as read-only.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.executed += 1
+            # Run as its own task so one caller disconnecting does not cancel
+            # the call everybody else is waiting on
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    def metrics(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+            "coalesced_ratio": round(self.coalesced / self.calls, 4) if self.calls else 0.0
+        }
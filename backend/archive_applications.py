@@ -0,0 +1,23 @@
+"""
+Move closed jobs' old applications into the Parquet season archive.
+
+Usage (from the backend directory):
+    python archive_applications.py [--cutoff 2025-06-01] [--dry-run]
+"""
+if __name__ == "__main__":
+    import argparse
+    import json
+    from app.config.database import init_supabase
+    from app.services.archive import application_archive, default_cutoff
+
+    parser = argparse.ArgumentParser(description="Archive applications of closed jobs submitted before a cutoff")
+    parser.add_argument("--cutoff", default=None, help="YYYY-MM-DD (defaults to ARCHIVE_RETENTION_DAYS ago)")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be archived")
+    parser.add_argument("--summary", action="store_true", help="Print the archive contents and exit")
+    args = parser.parse_args()
+
+    if args.summary:
+        print(json.dumps(application_archive.summary(), indent=2))
+    else:
+        init_supabase()
+        print(json.dumps(application_archive.run(args.cutoff or default_cutoff(), args.dry_run), indent=2))
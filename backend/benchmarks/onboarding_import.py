@@ -0,0 +1,115 @@
+"""
+Bulk student onboarding throughput benchmark.
+
+Generates a registrar-style CSV from a fixed seed and measures the
+CPU-bound stage of ``app.services.onboarding`` on it: streaming parse and
+row validation (rows/s).
+
+Supabase is not involved. The number of upstream requests an import makes
+only depends on the row count and the chunk size, plus one Supabase Auth
+admin call per new student, so those are reported together with the time
+the Auth calls take at a given latency and concurrency.
+
+Usage (from the backend directory):
+    python benchmarks/onboarding_import.py [--rows 3000] [--auth-latency-ms 150] [--auth-concurrency 8]
+"""
+import argparse
+import csv
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# Settings only need to parse; nothing connects during the benchmark
+os.environ.setdefault('SUPABASE_URL', 'http://localhost')
+os.environ.setdefault('SUPABASE_KEY', 'benchmark')
+
+from app.services.onboarding import LOOKUP_CHUNK, next_chunk, normalize_student, read_students  # noqa: E402
+
+BRANCHES = ['CSE', 'ISE', 'ECE', 'EEE', 'ME', 'CV', 'AIML', 'CH', 'BT', 'IEM']
+HEADER = ['USN', 'Name', 'Email', 'Branch', 'CGPA', '10th', '12th', 'Batch', 'Backlogs', 'DOB', 'Password']
+
+
+def write_registrar_csv(path: str, rows: int, seed: int):
+    rng = random.Random(seed)
+    with open(path, 'w', newline='', encoding='utf-8') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(HEADER)
+        for number in range(1, rows + 1):
+            branch = rng.choice(BRANCHES)
+            writer.writerow([
+                f"1RV22{branch[:2]}{number:04d}",
+                f"Student {number}",
+                f"student{number}.{branch.lower()}22@rvce.edu.in",
+                branch,
+                f"{rng.uniform(5.5, 10):.2f}",
+                f"{rng.uniform(60, 100):.1f}",
+                f"{rng.uniform(60, 100):.1f}",
+                2026,
+                rng.choice([0, 0, 0, 0, 1, 2]),
+                f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2004",
+                ''.join(rng.choice('abcdefghjkmnpqrstuvwxyz23456789') for _ in range(10))
+            ])
+
+
+def parse_file(path: str, chunk_size: int) -> int:
+    """Stream and validate every row the way the importer does; returns the valid row count"""
+    valid = 0
+    rows = read_students(path, '.csv')
+    while True:
+        chunk = next_chunk(rows, chunk_size)
+        if not chunk:
+            break
+        for _, raw in chunk:
+            normalize_student(raw)
+            valid += 1
+    return valid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure onboarding parse throughput and upstream work")
+    parser.add_argument('--rows', type=int, default=3000, help="Rows in the generated registrar file")
+    parser.add_argument('--seed', type=int, default=43)
+    parser.add_argument('--chunk-size', type=int, default=int(os.getenv('ONBOARDING_CHUNK_SIZE', 500)))
+    parser.add_argument('--auth-latency-ms', type=float, default=150.0, help="Assumed Supabase Auth admin call latency")
+    parser.add_argument('--auth-concurrency', type=int, default=int(os.getenv('ONBOARDING_AUTH_CONCURRENCY', 8)))
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'registrar.csv')
+        write_registrar_csv(path, args.rows, args.seed)
+
+        parse_file(path, args.chunk_size)
+        timings = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            valid = parse_file(path, args.chunk_size)
+            timings.append(time.perf_counter() - started)
+
+    parse_seconds = statistics.median(timings)
+    print(f"file: {args.rows} rows (seed {args.seed}), {valid} valid")
+    print(f"parse + validate: {valid / parse_seconds:,.0f} rows/s (median of {args.runs})")
+
+    chunks = math.ceil(valid / args.chunk_size)
+    lookups = 2 * sum(
+        math.ceil(min(args.chunk_size, valid - start) / LOOKUP_CHUNK) for start in range(0, valid, args.chunk_size)
+    )
+    print(
+        f"database requests: {lookups + chunks} ({chunks} chunks of {args.chunk_size}: "
+        f"{lookups} lookups of up to {LOOKUP_CHUNK} values, {chunks} upserts)"
+    )
+    auth_seconds = math.ceil(valid / args.auth_concurrency) * args.auth_latency_ms / 1000
+    print(
+        f"auth admin calls for a first import: {valid}, about {auth_seconds:.0f}s "
+        f"at {args.auth_latency_ms:g} ms each, {args.auth_concurrency} at a time"
+    )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Startup import-time benchmark.
+
+Imports ``app.main`` in fresh interpreters, reports the median wall time and
+the slowest modules (from ``python -X importtime``), and fails when the
+median exceeds the budget or when a heavy optional dependency is imported
+at startup instead of on first use.
+
+Usage (from the backend directory):
+    python benchmarks/startup_import.py [--runs 5] [--budget-ms 1500]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported by ``import app.main``; they load on first use
+LAZY_MODULES = ['pandas', 'numpy', 'pyarrow', 'openpyxl', 'passlib', 'supabase', 'postgrest', 'gotrue', 'realtime', 'storage3']
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+
+def child_env():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = BACKEND_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    # Settings only need to parse; nothing connects during import
+    env.setdefault('SUPABASE_URL', 'http://localhost')
+    env.setdefault('SUPABASE_KEY', 'benchmark')
+    return env
+
+
+def run_once(importtime: bool = False):
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', CHILD.format(lazy=LAZY_MODULES)]
+    result = subprocess.run(command, cwd=BACKEND_DIR, env=child_env(), capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def slowest_modules(importtime_output: str, top: int):
+    """(self us, cumulative us, module) for the ``top`` slowest modules by self time"""
+    rows = []
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((int(self_us), int(cumulative_us), module.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app.main import time against a budget")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('STARTUP_IMPORT_BUDGET_MS', 1500)))
+    parser.add_argument('--top', type=int, default=10, help="Slowest modules to list")
+    args = parser.parse_args()
+
+    # Warm the filesystem and bytecode caches once
+    run_once()
+
+    timings = []
+    loaded = set()
+    for _ in range(args.runs):
+        result, _ = run_once()
+        timings.append(result['ms'])
+        loaded.update(result['loaded'])
+
+    _, importtime_output = run_once(importtime=True)
+
+    median = statistics.median(timings)
+    print(f"import app.main: median {median:.0f} ms, min {min(timings):.0f} ms, max {max(timings):.0f} ms over {args.runs} runs")
+    print(f"budget: {args.budget_ms:.0f} ms")
+    print("slowest modules (self / cumulative ms):")
+    for self_us, cumulative_us, module in slowest_modules(importtime_output, args.top):
+        print(f"  {self_us / 1000:8.1f} {cumulative_us / 1000:8.1f}  {module}")
+
+    failed = False
+    if loaded:
+        print(f"❌ Heavy modules imported at startup: {', '.join(sorted(loaded))}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"❌ Import time {median:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print("✅ Startup import within budget")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
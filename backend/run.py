@@ -1,10 +1,16 @@
 if __name__ == "__main__":
-    import uvicorn
+    import argparse
     from app.config.settings import settings
-    
-    uvicorn.run(
-        "app.main:app",
-        host=settings.API_HOST,
-        port=settings.API_PORT,
-        reload=settings.DEBUG
-    )
+    from app.config.server import default_workers, run_development, run_production
+
+    parser = argparse.ArgumentParser(description="Start the placement management API")
+    parser.add_argument("--production", action="store_true", help="Start multiple preloaded workers")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (production only)")
+    parser.add_argument("--host", default=settings.API_HOST)
+    parser.add_argument("--port", type=int, default=settings.API_PORT)
+    args = parser.parse_args()
+
+    if args.production or settings.SERVER_MODE == "production":
+        run_production(args.host, args.port, args.workers or default_workers())
+    else:
+        run_development(args.host, args.port)
@@ -0,0 +1,112 @@
+import os
+
+# Settings only need to parse; queries are built but never sent
+os.environ.setdefault('SUPABASE_URL', 'http://localhost')
+os.environ.setdefault('SUPABASE_KEY', 'test')
+
+from postgrest import SyncPostgrestClient
+
+from app.services import applicants
+from app.services.applicants import CursorError, _quote, applicant_page_query, decode_cursor, encode_cursor
+
+
+def _page(**kwargs):
+    """``(query params, Prefer header, order)`` of a page query"""
+    client = SyncPostgrestClient('http://localhost/rest/v1')
+    original = applicants.get_supabase_client
+    applicants.get_supabase_client = lambda: client
+    try:
+        query, order = applicant_page_query('j1', **kwargs)
+    finally:
+        applicants.get_supabase_client = original
+    return dict(query.params.multi_items()), query.headers.get('prefer'), order
+
+
+def _raises(cursor, sort, order, message):
+    try:
+        decode_cursor(cursor, sort, order)
+    except CursorError as e:
+        assert message in str(e), str(e)
+    else:
+        raise AssertionError(f"accepted {cursor!r}")
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor('cgpa', 'desc', {'id': 'a7', 'cgpa': 8.25})
+    assert '=' not in cursor
+    assert decode_cursor(cursor, 'cgpa', 'desc') == (8.25, 'a7')
+    assert decode_cursor(encode_cursor('cgpa', 'asc', {'id': 'a9'}), 'cgpa', 'asc') == (None, 'a9')
+
+
+def test_bad_cursors():
+    _raises('not a cursor!', 'cgpa', 'desc', 'Invalid cursor')
+    _raises(encode_cursor('cgpa', 'desc', {'id': 'a7', 'cgpa': 8.25}), 'cgpa', 'asc', 'different sort order')
+    _raises(encode_cursor('usn', 'asc', {'id': 'a7', 'usn': 'X'}), 'cgpa', 'asc', 'different sort order')
+
+
+def test_quote():
+    assert _quote(True) == 'true'
+    assert _quote(8.5) == '8.5'
+    assert _quote(7) == '7'
+    assert _quote('Rao, "Asha"\\') == '"Rao, \\"Asha\\"\\\\"'
+
+
+def test_first_page():
+    params, prefer, order = _page(status='applied, shortlisted', branch='CSE', min_cgpa=7, search='asha', limit=20)
+    assert order == 'desc'
+    assert 'count=exact' in prefer
+    assert params['job_id'] == 'eq.j1'
+    assert params['status'] == 'in.(applied,shortlisted)'
+    assert params['branch'] == 'in.(CSE)'
+    assert params['cgpa'] == 'gte.7'
+    assert params['or'] == '(full_name.ilike."*asha*",usn.ilike."*asha*",email.ilike."*asha*")'
+    assert params['order'] == 'applied_at.desc.nullslast,id.desc'
+    assert params['limit'] == '21'
+
+
+def test_next_page_continues_after_the_cursor():
+    cursor = encode_cursor('cgpa', 'asc', {'id': 'a7', 'cgpa': 8.25})
+    params, prefer, _ = _page(sort='cgpa', order='asc', cursor=cursor)
+    assert 'count=exact' not in (prefer or '')
+    # Later values, ties with a later id, then the NULL tail
+    assert params['or'] == '(cgpa.gt.8.25,and(cgpa.eq.8.25,id.gt."a7"),cgpa.is.null)'
+    assert params['order'] == 'cgpa.asc.nullslast,id.asc'
+
+
+def test_next_page_with_a_search_combines_both_trees():
+    cursor = encode_cursor('full_name', 'asc', {'id': 'a7', 'full_name': 'Asha'})
+    params, _, _ = _page(sort='full_name', search='a', cursor=cursor)
+    assert 'or' not in params
+    assert params['and'] == (
+        '(or(full_name.ilike."*a*",usn.ilike."*a*",email.ilike."*a*"),'
+        'or(full_name.gt."Asha",and(full_name.eq."Asha",id.gt."a7"),full_name.is.null))'
+    )
+
+
+def test_next_page_inside_the_null_tail():
+    cursor = encode_cursor('cgpa', 'desc', {'id': 'a7', 'cgpa': None})
+    params, _, _ = _page(sort='cgpa', cursor=cursor)
+    assert params['cgpa'] == 'is.null'
+    assert params['id'] == 'lt.a7'
+    assert 'or' not in params
+
+
+def test_invalid_sort_and_status():
+    for kwargs in ({'sort': 'email'}, {'status': 'applied,hired'}):
+        try:
+            _page(**kwargs)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {kwargs}")
+
+
+if __name__ == "__main__":
+    test_cursor_round_trip()
+    test_bad_cursors()
+    test_quote()
+    test_first_page()
+    test_next_page_continues_after_the_cursor()
+    test_next_page_with_a_search_combines_both_trees()
+    test_next_page_inside_the_null_tail()
+    test_invalid_sort_and_status()
+    print("✅ Applicant pages")
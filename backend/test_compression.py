@@ -0,0 +1,84 @@
+import asyncio
+import zlib
+
+from app.middleware import compression
+from app.middleware.compression import CompressionMiddleware, negotiate_encoding
+
+
+def _respond(messages, accept_encoding='gzip', headers=()):
+    """Run ``messages`` (body chunks) through the middleware; returns what was sent"""
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": list(headers)})
+        for body, more_body in messages:
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=100)(scope, None, send))
+    return sent
+
+
+def test_negotiate_encoding():
+    original = compression.brotli
+    try:
+        compression.brotli = object()
+        assert negotiate_encoding('gzip, deflate, br') == 'br'
+        assert negotiate_encoding('br;q=0.5, gzip') == 'gzip'
+        assert negotiate_encoding('*') == 'br'
+        assert negotiate_encoding('br;q=0, gzip;q=0') is None
+        assert negotiate_encoding('identity') is None
+        compression.brotli = None
+        assert negotiate_encoding('br, gzip;q=0.1') == 'gzip'
+        assert negotiate_encoding('br') is None
+        assert negotiate_encoding('*;q=0.5') == 'gzip'
+        # An unreadable quality refuses the encoding, even over a wildcard
+        assert negotiate_encoding('gzip;q=bogus, *;q=0.5') is None
+    finally:
+        compression.brotli = original
+
+
+def test_small_and_excluded_bodies_pass_through():
+    sent = _respond([(b'x' * 10, False)])
+    assert dict(sent[0]['headers']).get(b'content-encoding') is None
+    assert sent[1]['body'] == b'x' * 10
+
+    sent = _respond([(b'%PDF' * 100, False)], headers=[(b'content-type', b'application/pdf')])
+    assert dict(sent[0]['headers']).get(b'content-encoding') is None
+
+
+def test_whole_body_gets_a_content_length():
+    body = b'{"success": true}' * 50
+    sent = _respond([(body, False)], headers=[(b'content-length', str(len(body)).encode())])
+    headers = dict(sent[0]['headers'])
+    assert headers[b'content-encoding'] == b'gzip'
+    assert int(headers[b'content-length']) == len(sent[1]['body'])
+    assert zlib.decompress(sent[1]['body'], 16 + zlib.MAX_WBITS) == body
+
+
+def test_streamed_chunks_are_decodable_as_they_arrive():
+    rows = [f"a{i},Asha,1RV22CS{i:03d}\n".encode() * 20 for i in range(5)]
+    sent = _respond([(row, True) for row in rows] + [(b'', False)])
+    headers = dict(sent[0]['headers'])
+    assert headers[b'content-encoding'] == b'gzip'
+    assert b'content-length' not in headers
+
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    bodies = [message['body'] for message in sent[1:]]
+    # Each chunk was flushed, so it decodes without waiting for the rest
+    for row, body in zip(rows, bodies):
+        assert decoder.decompress(body) == row
+    assert sent[-1]['more_body'] is False
+    decoder.decompress(bodies[-1])
+    assert decoder.eof
+
+
+if __name__ == "__main__":
+    test_negotiate_encoding()
+    test_small_and_excluded_bodies_pass_through()
+    test_whole_body_gets_a_content_length()
+    test_streamed_chunks_are_decodable_as_they_arrive()
+    print("✅ Response compression")
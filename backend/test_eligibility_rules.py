@@ -0,0 +1,35 @@
+from app.services.eligibility import normalize_rule, parse_rule
+
+# Rules as admins write them, including CTCs in rupees per year
+RULES = [
+    "tenth >= 60 and twelfth >= 60 and graduation_year == 2025 and not placed_ctc > 1200000",
+    "placed_ctc <= 1234567 or cgpa >= 8.75",
+    "cgpa > 7.5 and (gender == 'F' or branch in ['ECE', 'EEE'])",
+    "branch not in ['ME', 'CV'] and active_backlog == 0",
+    "placed_ctc < 1.5e6 and cgpa >= 0.00001",
+    "not (cgpa < 6 or tenth < 50)",
+]
+
+
+def test_normalized_rules_are_stable():
+    for rule in RULES:
+        normalized = normalize_rule(rule)
+        assert normalize_rule(normalized) == normalized, rule
+
+
+def test_normalization_keeps_values():
+    for rule in RULES:
+        assert parse_rule(normalize_rule(rule)) == parse_rule(rule), rule
+
+
+def test_large_ctc_is_written_in_full():
+    assert normalize_rule("not placed_ctc > 1200000") == "not placed_ctc > 1200000"
+    assert normalize_rule("placed_ctc <= 1234567") == "placed_ctc <= 1234567"
+    assert normalize_rule("placed_ctc < 1.5e6") == "placed_ctc < 1500000"
+
+
+if __name__ == "__main__":
+    test_normalized_rules_are_stable()
+    test_normalization_keeps_values()
+    test_large_ctc_is_written_in_full()
+    print("✅ Eligibility rules normalize stably")
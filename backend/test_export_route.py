@@ -0,0 +1,91 @@
+import os
+
+# Settings only need to parse; the database calls below are stubbed
+os.environ.setdefault('SUPABASE_URL', 'http://localhost')
+os.environ.setdefault('SUPABASE_KEY', 'test')
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes import applications
+
+APPLICATIONS = [
+    {
+        'id': 'a1', 'student_id': 's1', 'status': 'shortlisted', 'applied_at': '2026-02-01T10:00:00',
+        'cover_letter': 'Hello', 'jobs': {'company_name': 'Acme', 'role': 'SDE', 'location': 'Bengaluru',
+                                          'ctc': 1200000, 'deadline': '2026-03-01'}
+    }
+]
+
+
+class _Query:
+    """Stands in for a PostgREST query: records filters, returns fixed rows"""
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def __getattr__(self, name):
+        def chain(*args, **kwargs):
+            self.calls.append((name, args))
+            return self
+        return chain
+
+    def execute(self):
+        return type('Response', (), {'data': [dict(row) for row in APPLICATIONS]})()
+
+
+class _Client:
+    def __init__(self):
+        self.calls = []
+
+    def table(self, name):
+        self.calls.append(('table', (name,)))
+        return _Query(self.calls)
+
+
+async def _profiles(student_ids):
+    return {'s1': {'full_name': 'Asha', 'usn': '1RV22CS001', 'branch': 'CSE', 'cgpa': 9.1, 'email': 'asha@rvce.edu.in'}}
+
+
+async def _inline(func, *args):
+    return func(*args)
+
+
+def _export(params):
+    client = _Client()
+    patched = {'supabase': client, 'read_profiles_by_id': _profiles}
+    original = {name: getattr(applications, name) for name in patched}
+    original_run = applications.cpu_pool.run
+    try:
+        for name, value in patched.items():
+            setattr(applications, name, value)
+        applications.cpu_pool.run = _inline
+        response = TestClient(app).get('/api/applications/export', params=params)
+    finally:
+        for name, value in original.items():
+            setattr(applications, name, value)
+        applications.cpu_pool.run = original_run
+    return response, client.calls
+
+
+def test_export_is_routed_to_the_export_handler():
+    response, calls = _export({'status_filter': 'shortlisted'})
+    assert response.status_code == 200, response.text
+    assert response.headers['content-type'].startswith('text/csv')
+    assert 'attachment; filename=applications_shortlisted_' in response.headers['content-disposition']
+    lines = response.content.decode().splitlines()
+    assert lines[0].startswith('Application ID,Applied Date,Status,Student Name')
+    assert lines[1].startswith('a1,2026-02-01T10:00:00,shortlisted,Asha,1RV22CS001,CSE')
+    assert ('table', ('applications',)) in calls
+    assert ('eq', ('status', 'shortlisted')) in calls
+
+
+def test_export_rejects_unknown_formats():
+    response, _ = _export({'format': 'pdf'})
+    assert response.status_code == 400
+
+
+if __name__ == "__main__":
+    test_export_is_routed_to_the_export_handler()
+    test_export_rejects_unknown_formats()
+    print("✅ Export route reachable")
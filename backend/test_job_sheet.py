@@ -0,0 +1,62 @@
+import os
+
+# Settings only need to parse; nothing here talks to the database
+os.environ.setdefault('SUPABASE_URL', 'http://localhost')
+os.environ.setdefault('SUPABASE_KEY', 'test')
+
+from app.models.job import validate_jobs
+from app.services.spreadsheets import SpreadsheetError, parse_job_sheet
+
+
+def test_lpa_columns_are_stored_in_rupees():
+    content = (
+        "Company,Job Role,Type,CTC (LPA),Branches,Last Date\n"
+        "Acme,SDE,FTE,12.5,\"CSE, ISE\",2026-03-01\n"
+        "\n"
+        "Globex,Analyst,FTE,8,ECE,2026-03-01\n"
+        "Initech,Intern,Internship,,CSE,2026-03-01\n"
+    ).encode()
+    lines, rows = parse_job_sheet(content, '.csv')
+    assert lines == [2, 4, 5]
+    assert [row['ctc'] for row in rows] == [1250000, 800000, None]
+    jobs, errors = validate_jobs(rows, lines)
+    assert errors == []
+    assert [job.ctc for job in jobs] == [1250000, 800000, None]
+    assert jobs[0].eligible_branches == ['CSE', 'ISE']
+
+
+def test_ctc_column_is_already_rupees():
+    lines, rows = parse_job_sheet(b"company_name,role,job_type,ctc,deadline\nAcme,SDE,FTE,\"12,00,000\",2026-03-01\n", '.csv')
+    jobs, errors = validate_jobs(rows, lines)
+    assert errors == [] and jobs[0].ctc == 1200000
+
+
+def test_unlabelled_package_is_rejected():
+    try:
+        parse_job_sheet(b"company,role,package\nAcme,SDE,12\n", '.csv')
+    except SpreadsheetError as e:
+        assert 'ctc (lpa)' in str(e)
+    else:
+        raise AssertionError("an unlabelled package column was accepted")
+
+
+def test_validation_errors_name_the_spreadsheet_line():
+    content = (
+        b"company,role,type,ctc lpa,deadline\n"
+        b"Acme,SDE,FTE,ten,2026-03-01\n"
+        b"\n"
+        b"Globex,,FTE,5,2026-03-01\n"
+        b"Initech,QA,FTE,4,2026-03-01\n"
+    )
+    lines, rows = parse_job_sheet(content, '.csv')
+    jobs, errors = validate_jobs(rows, lines)
+    assert [job.company_name for job in jobs] == ['Initech']
+    assert sorted((error['row'], error['field']) for error in errors) == [(2, 'ctc'), (4, 'role')]
+
+
+if __name__ == "__main__":
+    test_lpa_columns_are_stored_in_rupees()
+    test_ctc_column_is_already_rupees()
+    test_unlabelled_package_is_rejected()
+    test_validation_errors_name_the_spreadsheet_line()
+    print("✅ Job sheet import")
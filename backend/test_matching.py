@@ -0,0 +1,72 @@
+import os
+
+# Settings only need to parse; nothing here talks to the database
+os.environ.setdefault('SUPABASE_URL', 'http://localhost')
+os.environ.setdefault('SUPABASE_KEY', 'test')
+
+from app.services.matching import ProfileIndex, canonical_usn, email_local_part
+from app.services.spreadsheets import parse_shortlist
+
+PROFILES = [
+    {'id': 'p1', 'email': 'asha.rao@rvce.edu.in', 'usn': '1RV22CS001', 'full_name': 'Asha Rao'},
+    {'id': 'p2', 'email': 'john@rvce.edu.in', 'usn': '1RV22CS002', 'full_name': 'John Mathew'},
+    {'id': 'p3', 'email': 'priya.k@gmail.com', 'usn': '1RV22EC003', 'full_name': 'Priya K'},
+    {'id': 'p4', 'email': 'ravi.kumar@rvce.edu.in', 'usn': '1RV22ME004', 'full_name': 'Ravi Kumar'},
+    {'id': 'p5', 'email': 'ravi.kumar2@rvce.edu.in', 'usn': '1RV22ME005', 'full_name': 'Ravi Kumaran'},
+]
+
+
+def test_normalizers():
+    assert canonical_usn(' 1rv22 cs-001 ') == '1RV22CS001'
+    assert email_local_part('Priya.K@Gmail.com') == 'priyak'
+    assert email_local_part('asha.rao@rvce.edu.in') == 'asha.rao'
+    assert email_local_part('no-at-sign') is None
+
+
+def test_exact_and_normalized_identifiers():
+    index = ProfileIndex(PROFILES)
+    assert index.resolve('asha.rao@rvce.edu.in', None, None) == ('email', 'p1', [])
+    assert index.resolve(None, '1rv22 cs 002', None) == ('usn', 'p2', [])
+    assert index.resolve('priyak@gmail.com', None, 'Priya K') == ('email_local', 'p3', [])
+
+
+def test_local_part_at_another_domain_needs_the_name():
+    index = ProfileIndex(PROFILES)
+    outcome, profile_id, candidates = index.resolve('john@gmail.com', None, 'Someone Else')
+    assert (outcome, profile_id) == ('ambiguous', None)
+    assert [candidate['id'] for candidate in candidates] == ['p2']
+    assert index.resolve('john@gmail.com', None, 'John Mathew') == ('email_local', 'p2', [])
+
+
+def test_names():
+    index = ProfileIndex(PROFILES)
+    assert index.resolve(None, None, 'asha  RAO') == ('name', 'p1', [])
+    outcome, profile_id, candidates = index.resolve(None, None, 'Ravi Kuma')
+    assert (outcome, profile_id) == ('ambiguous', None)
+    assert {candidate['id'] for candidate in candidates} == {'p4', 'p5'}
+    assert index.resolve(None, None, 'Zed Unknown')[0] == 'unmatched'
+
+
+def test_report_uses_spreadsheet_lines():
+    content = (
+        b"Email,USN,Name\n"
+        b"asha.rao@rvce.edu.in,,\n"
+        b"\n"
+        b",,\n"
+        b"nobody@example.com,,Zed Unknown\n"
+    )
+    lines, identifiers = parse_shortlist(content, '.csv')
+    assert lines == [2, 5]
+    report = ProfileIndex(PROFILES).match(identifiers, lines)
+    assert [student['id'] for student in report['students']] == ['p1']
+    assert report['match_methods'] == {'email': 1}
+    assert report['unmatched'] == [{"row": 5, "email": 'nobody@example.com', "usn": None, "name": 'Zed Unknown'}]
+
+
+if __name__ == "__main__":
+    test_normalizers()
+    test_exact_and_normalized_identifiers()
+    test_local_part_at_another_domain_needs_the_name()
+    test_names()
+    test_report_uses_spreadsheet_lines()
+    print("✅ Shortlist matching")
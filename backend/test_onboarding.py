@@ -0,0 +1,87 @@
+import os
+
+# Settings only need to parse; the database calls below are stubbed
+os.environ.setdefault('SUPABASE_URL', 'http://localhost')
+os.environ.setdefault('SUPABASE_KEY', 'test')
+
+from datetime import datetime
+
+from app.services import onboarding
+from app.services.onboarding import LOOKUP_CHUNK, RowError, StudentOnboarding, normalize_student
+
+
+def _rejects(raw, message):
+    try:
+        normalize_student(raw)
+    except RowError as e:
+        assert message in str(e), str(e)
+    else:
+        raise AssertionError(f"accepted {raw}")
+
+
+def test_normalize_student():
+    student = normalize_student({
+        'email': ' Asha.Rao@RVCE.edu.in ', 'usn': '1rv22cs001', 'full_name': 'Asha Rao', 'branch': '',
+        'cgpa': '9.1', 'tenth': '92%', 'graduation_year': '2026.0', 'active_backlog': 'No',
+        'date_of_birth': '05/03/2004', 'password': None
+    })
+    assert student == {
+        'email': 'asha.rao@rvce.edu.in', 'usn': '1RV22CS001', 'full_name': 'Asha Rao', 'cgpa': 9.1,
+        'tenth': 92.0, 'graduation_year': 2026, 'active_backlog': False, 'date_of_birth': '2004-03-05'
+    }
+    assert normalize_student({'email': 'a@b.c', 'usn': 'x', 'date_of_birth': datetime(2004, 3, 5)})['date_of_birth'] == '2004-03-05'
+
+
+def test_active_backlog_flag():
+    for value, expected in (('yes', True), ('Y', True), ('nil', False), ('2', True), ('0', False), (True, True)):
+        assert normalize_student({'email': 'a@b.c', 'usn': 'x', 'active_backlog': value})['active_backlog'] is expected
+    _rejects({'email': 'a@b.c', 'usn': 'x', 'active_backlog': '-1'}, 'cannot be negative')
+    _rejects({'email': 'a@b.c', 'usn': 'x', 'active_backlog': 'maybe'}, 'yes/no or a count')
+
+
+def test_invalid_rows():
+    _rejects({'email': 'not-an-email', 'usn': 'x'}, 'invalid email')
+    _rejects({'email': 'a@b.c', 'usn': ' '}, 'Missing USN')
+    _rejects({'email': 'a@b.c', 'usn': 'x', 'cgpa': '11'}, 'between 0 and 10')
+    _rejects({'email': 'a@b.c', 'usn': 'x', 'twelfth': 'A+'}, 'must be a number')
+    _rejects({'email': 'a@b.c', 'usn': 'x', 'date_of_birth': '2004.03.05'}, 'date_of_birth')
+
+
+class _Query:
+    def __init__(self, requests):
+        self.requests = requests
+
+    def select(self, columns):
+        return self
+
+    def in_(self, field, values):
+        self.requests.append((field, len(values)))
+        self.rows = [{'id': value, field: value} for value in values]
+        return self
+
+    def execute(self):
+        return type('Response', (), {'data': self.rows})()
+
+
+def test_lookup_is_split_into_small_in_filters():
+    requests = []
+    client = type('Client', (), {'table': lambda self, name: _Query(requests)})()
+    students = [(line, {'email': f's{line}@rvce.edu.in', 'usn': f's{line}@rvce.edu.in'})
+                for line in range(2, 2 + LOOKUP_CHUNK * 2 + 5)]
+    original = onboarding.get_supabase_client
+    onboarding.get_supabase_client = lambda: client
+    try:
+        profiles = StudentOnboarding._lookup(students)
+    finally:
+        onboarding.get_supabase_client = original
+    assert requests == [(field, size) for field in ('email', 'usn') for size in (LOOKUP_CHUNK, LOOKUP_CHUNK, 5)]
+    # A student found by both email and USN is returned once
+    assert len(profiles) == len(students)
+
+
+if __name__ == "__main__":
+    test_normalize_student()
+    test_active_backlog_flag()
+    test_invalid_rows()
+    test_lookup_is_split_into_small_in_filters()
+    print("✅ Student onboarding rows")
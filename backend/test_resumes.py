@@ -0,0 +1,89 @@
+import os
+
+# Settings only need to parse; nothing here talks to the database
+os.environ.setdefault('SUPABASE_URL', 'http://localhost')
+os.environ.setdefault('SUPABASE_KEY', 'test')
+
+import asyncio
+import tempfile
+import zipfile
+
+from app.services.resumes import ResumeIndex, ResumePipeline, extract_resume, fcntl, parse_terms
+
+DOCUMENT = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+    '<w:p><w:r><w:t>Skills: Java,</w:t><w:tab/><w:t>Spring Boot</w:t></w:r></w:p>'
+    '<w:p><w:r><w:t>Machine-Learning and C++ with the R language</w:t></w:r></w:p>'
+    '</w:body></w:document>'
+)
+
+
+def _file(directory, name, content):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as handle:
+        handle.write(content)
+    return path
+
+
+def test_parse_terms():
+    assert parse_terms(None) == []
+    assert parse_terms("Python, machine  learning,, python") == ['python', 'machine learning']
+
+
+def test_docx_text_and_keywords():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'resume.docx')
+        with zipfile.ZipFile(path, 'w') as archive:
+            archive.writestr('word/document.xml', DOCUMENT)
+        result = extract_resume(path, max_pages=5, max_chars=10000)
+    assert result['status'] == 'ok' and result['kind'] == 'docx'
+    assert result['text'] == 'Skills: Java, Spring Boot Machine-Learning and C++ with the R language'
+    assert {'java', 'spring', 'boot', 'machine', 'learning', 'r'} <= set(result['keywords'])
+    # Stopwords are not indexed
+    assert 'and' not in result['keywords'] and 'the' not in result['keywords']
+
+
+def test_bad_files_are_classified():
+    with tempfile.TemporaryDirectory() as directory:
+        statuses = {
+            name: extract_resume(_file(directory, name, content), 5, 10000)['status']
+            for name, content in (
+                ('fake.pdf', b'hello, not a pdf'),
+                ('broken.docx', b'PK\x03\x04truncated'),
+                ('renamed.docx', b'%PDF-1.4'),
+                ('legacy.doc', b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1rest'),
+                ('text.doc', b'plain text'),
+                ('notes.txt', b'notes')
+            )
+        }
+    assert statuses == {
+        'fake.pdf': 'corrupt', 'broken.docx': 'corrupt', 'renamed.docx': 'corrupt',
+        'legacy.doc': 'unsupported', 'text.doc': 'corrupt', 'notes.txt': 'unsupported'
+    }
+
+
+def test_only_one_worker_backfills():
+    if fcntl is None:
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        # Two pipelines stand in for two workers sharing the index
+        first, second = (
+            ResumePipeline(ResumeIndex(os.path.join(directory, 'index.sqlite3')), directory, 10, 5, 1000)
+            for _ in range(2)
+        )
+        claimed, fd = first._claim_backfill()
+        assert claimed
+        assert second._claim_backfill() == (False, None)
+        asyncio.run(second.backfill(asyncio.Queue()))
+        os.close(fd)
+        claimed, fd = second._claim_backfill()
+        assert claimed
+        os.close(fd)
+
+
+if __name__ == "__main__":
+    test_parse_terms()
+    test_docx_text_and_keywords()
+    test_bad_files_are_classified()
+    test_only_one_worker_backfills()
+    print("✅ Resume extraction")
@@ -0,0 +1,10 @@
+-- Migration: Declarative eligibility rules
+-- Jobs can carry an eligibility rule expression evaluated by the backend on
+-- top of min_cgpa / eligible_branches / max_active_backlogs, e.g.
+--   tenth >= 60 and twelfth >= 60 and graduation_year == 2025 and not placed_ctc > 1200000
+-- (placed_ctc is in rupees per year, like jobs.ctc)
+
+ALTER TABLE public.jobs ADD COLUMN IF NOT EXISTS eligibility_rule TEXT;
+
+-- Used by gender-specific drives (rules such as gender == 'F')
+ALTER TABLE public.profiles ADD COLUMN IF NOT EXISTS gender TEXT;
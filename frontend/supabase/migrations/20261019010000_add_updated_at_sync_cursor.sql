@@ -0,0 +1,29 @@
+-- Migration: updated_at as a sync cursor for jobs and profiles
+-- The backend's local read replica fetches rows changed since the newest
+-- updated_at it has seen, so every write must move updated_at forward,
+-- including writes from the frontend that do not set it.
+
+ALTER TABLE public.jobs ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE;
+UPDATE public.jobs SET updated_at = COALESCE(created_at, TIMEZONE('utc'::text, NOW())) WHERE updated_at IS NULL;
+ALTER TABLE public.jobs ALTER COLUMN updated_at SET DEFAULT TIMEZONE('utc'::text, NOW());
+ALTER TABLE public.jobs ALTER COLUMN updated_at SET NOT NULL;
+
+CREATE OR REPLACE FUNCTION public.touch_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.updated_at = TIMEZONE('utc'::text, NOW());
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER jobs_touch_updated_at
+  BEFORE UPDATE ON public.jobs
+  FOR EACH ROW EXECUTE FUNCTION public.touch_updated_at();
+
+CREATE OR REPLACE TRIGGER profiles_touch_updated_at
+  BEFORE UPDATE ON public.profiles
+  FOR EACH ROW EXECUTE FUNCTION public.touch_updated_at();
+
+-- Incremental sync reads "updated_at >= cursor ORDER BY updated_at, id"
+CREATE INDEX IF NOT EXISTS jobs_updated_at_idx ON public.jobs (updated_at, id);
+CREATE INDEX IF NOT EXISTS profiles_updated_at_idx ON public.profiles (updated_at, id);
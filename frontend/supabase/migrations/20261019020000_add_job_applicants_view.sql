@@ -0,0 +1,37 @@
+-- Migration: job_applicants view for the admin applicant table
+-- Applications joined with the profile columns the table shows, so the
+-- backend can filter, sort and page a job's applicants in one PostgREST
+-- query instead of fetching every application and profile. Cover letters
+-- are left out; the detail view still reads them from applications.
+-- security_invoker keeps the RLS policies of applications and profiles
+-- in force for whoever queries the view.
+
+CREATE OR REPLACE VIEW public.job_applicants
+WITH (security_invoker = true) AS
+SELECT
+  a.id,
+  a.job_id,
+  a.student_id,
+  a.status,
+  a.applied_at,
+  a.updated_at,
+  a.resume_url,
+  p.full_name,
+  p.usn,
+  p.email,
+  p.branch,
+  p.cgpa,
+  p.active_backlog,
+  p.graduation_year
+FROM public.applications a
+LEFT JOIN public.profiles p ON p.id = a.student_id;
+
+-- The default page is "job_id = ? ORDER BY applied_at DESC, id DESC"
+CREATE INDEX IF NOT EXISTS applications_job_applied_at_idx
+  ON public.applications (job_id, applied_at DESC, id DESC);
+
+-- Status filters within a job
+CREATE INDEX IF NOT EXISTS applications_job_status_idx
+  ON public.applications (job_id, status);
+
+GRANT SELECT ON public.job_applicants TO authenticated, service_role;
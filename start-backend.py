@@ -7,6 +7,7 @@ import sys
 import subprocess
 
 def main():
+    production = "--prod" in sys.argv or "--production" in sys.argv
     print("🚀 Starting RVCE LevelHub Backend Server...")
 
     # Change to backend directory
@@ -23,7 +24,12 @@ def main():
     print("🔄 Press Ctrl+C to stop the server")
 
     try:
-        subprocess.run([sys.executable, "-m", "uvicorn", "app.main:app", "--host", "0.0.0.0", "--port", "8001", "--reload"], check=True)
+        if production:
+            # Multiple preloaded workers, tuned from the backend Settings
+            print("🏭 Production mode: one worker per CPU core (override with WEB_CONCURRENCY)")
+            subprocess.run([sys.executable, "run.py", "--production", "--host", "0.0.0.0", "--port", "8001"], check=True)
+        else:
+            subprocess.run([sys.executable, "-m", "uvicorn", "app.main:app", "--host", "0.0.0.0", "--port", "8001", "--reload"], check=True)
     except KeyboardInterrupt:
         print("\n👋 Server stopped by user")
     except subprocess.CalledProcessError as e: